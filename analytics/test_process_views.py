@@ -0,0 +1,75 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from defects.models import Defect
+from operations.models import Operation, ProcessRecord
+from serials.models import AuthorizedPart, SerialNumber
+
+
+class ProcessDecisionViewsTests(TestCase):
+    """complete_process / reject_process endpoints of the process page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('operador1', password='clave-segura')
+        cls.operations = [
+            Operation.objects.create(name='Ensamble', sequence_number=1),
+            Operation.objects.create(name='Prueba', sequence_number=2),
+        ]
+        part = AuthorizedPart.objects.create(part_number='P-100', sku='SKU-P-100', description='Parte')
+        cls.serial = SerialNumber.objects.create(
+            serial_number='KA001-001M',
+            order_number='ORD-1',
+            authorized_part=part,
+            created_by=cls.user
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.record = ProcessRecord.objects.get(serial_number=self.serial, operation=self.operations[0])
+        ProcessRecord.objects.filter(pk=self.record.pk).update(
+            status='IN_PROGRESS', assigned_operator=self.user
+        )
+
+    def test_reject_process_creates_defect(self):
+        response = self.client.post(reverse('analytics:reject_process'), {
+            'process_record_id': self.record.pk,
+            'password': 'clave-segura',
+            'reject_reason': 'Soldadura fría',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        defect = Defect.objects.get(serial_number=self.serial)
+        self.assertEqual(defect.reported_by, self.user)
+        self.assertEqual(defect.status, 'OPEN')
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.status, 'REJECTED')
+        self.assertIsNotNone(self.record.completed_at)
+        self.serial.refresh_from_db()
+        self.assertEqual(self.serial.status, 'DEFECTIVE')
+
+    def test_reject_process_invalid_id_returns_json_error(self):
+        response = self.client.post(reverse('analytics:reject_process'), {
+            'process_record_id': 'x',
+            'password': 'clave-segura',
+            'reject_reason': 'Soldadura fría',
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+    def test_complete_process_approves_record(self):
+        response = self.client.post(reverse('analytics:complete_process'), {
+            'process_record_id': self.record.pk,
+            'password': 'clave-segura',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.status, 'APPROVED')
+        self.assertIsNotNone(self.record.completed_at)
+        self.serial.refresh_from_db()
+        self.assertEqual(self.serial.status, 'IN_PROCESS')
@@ -2,11 +2,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db.models import Count, Avg, Q, F
+from django.db.models import Count, Avg, Q, F, ExpressionWrapper, DurationField
 from django.db.models.functions import TruncDate
 from django.views.decorators.http import require_http_methods
 import json
 from django.utils import timezone
+from django.core.cache import cache
 from django.contrib.auth import authenticate
 from datetime import datetime, timedelta
 
@@ -15,38 +16,82 @@ from operations.models import Operation, ProcessRecord
 from defects.models import Defect
 from .models import ProductionAlert
 from operators.models import UserProfile
+from operators.decorators import clean_fields, json_errors
+from operators.services import AvailableOperationsCache
+from operators.utils import load_json_body
 from .utils import get_shift_from_datetime, get_shift_display, get_current_shift
 
 
+# Cache lifetimes (seconds) for the aggregate statistics
+STATISTICS_CACHE_TIMEOUT = 15
+DAILY_PRODUCTION_CACHE_TIMEOUT = 300
+
+
+def _serial_status_counts():
+    """Serial totals per status in a single aggregate query"""
+    return SerialNumber.objects.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='COMPLETED')),
+        in_process=Count('id', filter=Q(status='IN_PROCESS')),
+        pending=Count('id', filter=Q(status='CREATED')),
+        scrapped=Count('id', filter=Q(status='SCRAPPED')),
+    )
+
+
+def _daily_production(start_date, end_date):
+    """Serials created per local date within the given range"""
+    daily_production = SerialNumber.objects.filter(
+        created_at__date__gte=start_date,
+        created_at__date__lte=end_date
+    ).annotate(
+        date=TruncDate('created_at')
+    ).values('date').annotate(
+        count=Count('id')
+    ).order_by('date')
+    return {item['date']: item['count'] for item in daily_production}
+
+
+def _defect_status_counts():
+    """Defect totals per status plus affected serials in a single aggregate query"""
+    return Defect.objects.aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q(status='OPEN')),
+        in_repair=Count('id', filter=Q(status='IN_REPAIR')),
+        resolved=Count('id', filter=Q(status='REPAIRED')),
+        serials_with_defects=Count('serial_number', distinct=True),
+    )
+
+
 @login_required
 def dashboard(request):
     """Main dashboard view with FPY, cycle time, and defects metrics by shift"""
     # Get recent serial numbers
     recent_serials = SerialNumber.objects.select_related(
-        'authorized_part', 'created_by'
-    ).order_by('-created_at')[:10]
+        'authorized_part'
+    ).only(
+        'serial_number', 'order_number', 'status', 'created_at',
+        'authorized_part__part_number', 'authorized_part__description'
+    ).with_completion().order_by('-created_at')[:10]
     
     # Basic statistics
-    total_serials = SerialNumber.objects.count()
-    completed_serials = SerialNumber.objects.filter(status='COMPLETED').count()
-    in_process_serials = SerialNumber.objects.filter(status='IN_PROCESS').count()
-    pending_serials = SerialNumber.objects.filter(status='CREATED').count()
-    scrapped_serials = SerialNumber.objects.filter(status='SCRAPPED').count()
+    status_counts = _serial_status_counts()
+    defect_counts = _defect_status_counts()
+    total_serials = status_counts['total']
+    completed_serials = status_counts['completed']
+    in_process_serials = status_counts['in_process']
+    pending_serials = status_counts['pending']
+    scrapped_serials = status_counts['scrapped']
     
     # FPY: Percentage of serial numbers that pass all operations without defects
-    serials_with_defects = Defect.objects.values('serial_number').distinct().count()
+    serials_with_defects = defect_counts['serials_with_defects']
     fpy = round(((total_serials - serials_with_defects) / total_serials * 100) if total_serials > 0 else 0, 1)
     
     # Average time from creation to completion
-    completed_serials_with_time = SerialNumber.objects.filter(
+    avg_cycle_time_seconds = SerialNumber.objects.filter(
         status='COMPLETED',
         updated_at__isnull=False
-    ).annotate(
-        cycle_time=F('updated_at') - F('created_at')
-    )
-    
-    avg_cycle_time_seconds = completed_serials_with_time.aggregate(
-        avg_time=Avg('cycle_time')
+    ).order_by().aggregate(
+        avg_time=Avg(ExpressionWrapper(F('updated_at') - F('created_at'), output_field=DurationField()))
     )['avg_time']
     
     avg_cycle_time_hours = 0
@@ -69,10 +114,10 @@ def dashboard(request):
         elif shift == 2:
             shift_2_defects += 1
     
-    total_defects = Defect.objects.count()
-    open_defects = Defect.objects.filter(status='OPEN').count()
-    in_repair_defects = Defect.objects.filter(status='IN_REPAIR').count()
-    resolved_defects = Defect.objects.filter(status='REPAIRED').count()
+    total_defects = defect_counts['total']
+    open_defects = defect_counts['open']
+    in_repair_defects = defect_counts['in_repair']
+    resolved_defects = defect_counts['resolved']
     
     # Defects by operation
     defects_by_operation = Defect.objects.values(
@@ -118,64 +163,51 @@ def dashboard(request):
 def statistics_view(request):
     """Statistics and charts view"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.can_view_statistics)):
+            getattr(request.user_profile, 'can_view_statistics', False)):
         messages.error(request, 'No tienes permisos para ver las estadísticas')
         return redirect('analytics:dashboard')
     
     # Basic statistics
-    total_serials = SerialNumber.objects.count()
-    completed_serials = SerialNumber.objects.filter(status='COMPLETED').count()
-    in_process_serials = SerialNumber.objects.filter(status='IN_PROCESS').count()
-    pending_serials = SerialNumber.objects.filter(status='CREATED').count()
-    scrapped_serials = SerialNumber.objects.filter(status='SCRAPPED').count()
+    status_counts = _serial_status_counts()
+    defect_counts = _defect_status_counts()
+    total_serials = status_counts['total']
+    completed_serials = status_counts['completed']
+    in_process_serials = status_counts['in_process']
+    pending_serials = status_counts['pending']
+    scrapped_serials = status_counts['scrapped']
     completion_rate = round((completed_serials / total_serials * 100) if total_serials > 0 else 0, 1)
     
     # FPY: Percentage of serial numbers that pass all operations without defects
-    serials_with_defects = Defect.objects.values('serial_number').distinct().count()
+    serials_with_defects = defect_counts['serials_with_defects']
     fpy = round(((total_serials - serials_with_defects) / total_serials * 100) if total_serials > 0 else 0, 1)
     
-    # Operations statistics
-    operations = Operation.objects.all().order_by('sequence_number')
+    # Operations statistics, counted per operation in a single grouped query
+    operations = Operation.objects.only('id', 'name', 'sequence_number').order_by('sequence_number')
+    stats_by_operation = {
+        row['operation_id']: row
+        for row in ProcessRecord.objects.order_by().values('operation_id').annotate(
+            completed=Count('id', filter=Q(status='COMPLETED')),
+            pending=Count('id', filter=Q(status__in=['PENDING', 'IN_PROCESS'])),
+        )
+    }
     operations_labels = [op.name for op in operations]
-    operations_completed = []
-    operations_pending = []
-    
-    for operation in operations:
-        completed_count = ProcessRecord.objects.filter(
-            operation=operation, 
-            status='COMPLETED'
-        ).count()
-        pending_count = ProcessRecord.objects.filter(
-            operation=operation, 
-            status__in=['PENDING', 'IN_PROCESS']
-        ).count()
-        
-        operations_completed.append(completed_count)
-        operations_pending.append(pending_count)
+    operations_completed = [stats_by_operation.get(op.id, {}).get('completed', 0) for op in operations]
+    operations_pending = [stats_by_operation.get(op.id, {}).get('pending', 0) for op in operations]
     
-    # Production by day (last 30 days)
-    end_date = timezone.now().date()
+    # Production by day (last 30 days), in local dates to match TruncDate
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=30)
     
-    daily_production = SerialNumber.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date
-    ).annotate(
-        date=TruncDate('created_at')
-    ).values('date').annotate(
-        count=Count('id')
-    ).order_by('date')
+    production_dict = cache.get_or_set(
+        f'analytics:daily_production:{start_date}:{end_date}',
+        lambda: _daily_production(start_date, end_date),
+        DAILY_PRODUCTION_CACHE_TIMEOUT
+    )
     
     # Fill missing dates with 0
-    production_dates = []
-    production_counts = []
-    current_date = start_date
-    production_dict = {item['date']: item['count'] for item in daily_production}
-    
-    while current_date <= end_date:
-        production_dates.append(current_date.strftime('%d/%m'))
-        production_counts.append(production_dict.get(current_date, 0))
-        current_date += timedelta(days=1)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    production_dates = [day.strftime('%d/%m') for day in days]
+    production_counts = [production_dict.get(day, 0) for day in days]
     
     # Active alerts
     alerts = ProductionAlert.objects.filter(
@@ -183,10 +215,10 @@ def statistics_view(request):
         is_resolved=False
     ).order_by('-priority', '-created_at')[:10]
     
-    total_defects = Defect.objects.count()
-    open_defects = Defect.objects.filter(status='OPEN').count()
-    in_repair_defects = Defect.objects.filter(status='IN_REPAIR').count()
-    resolved_defects = Defect.objects.filter(status='REPAIRED').count()
+    total_defects = defect_counts['total']
+    open_defects = defect_counts['open']
+    in_repair_defects = defect_counts['in_repair']
+    resolved_defects = defect_counts['resolved']
     
     # Defects by operation
     defects_by_operation = Defect.objects.values(
@@ -223,20 +255,29 @@ def statistics_view(request):
 @require_http_methods(["GET"])
 def api_statistics(request):
     """API endpoint for statistics data with enhanced metrics"""
-    total_serials = SerialNumber.objects.count()
-    completed_serials = SerialNumber.objects.filter(status='COMPLETED').count()
-    in_process_serials = SerialNumber.objects.filter(status='IN_PROCESS').count()
-    pending_serials = SerialNumber.objects.filter(status='CREATED').count()
-    scrapped_serials = SerialNumber.objects.filter(status='SCRAPPED').count()
+    # Dashboards poll this endpoint; a short TTL serves repeated polls from cache
+    data = cache.get_or_set('analytics:api_statistics', _statistics_payload, STATISTICS_CACHE_TIMEOUT)
+    return JsonResponse(data)
+
+
+def _statistics_payload():
+    """Build the api_statistics payload"""
+    status_counts = _serial_status_counts()
+    defect_counts = _defect_status_counts()
+    total_serials = status_counts['total']
+    completed_serials = status_counts['completed']
+    in_process_serials = status_counts['in_process']
+    pending_serials = status_counts['pending']
+    scrapped_serials = status_counts['scrapped']
     completion_rate = round((completed_serials / total_serials * 100) if total_serials > 0 else 0, 1)
     
-    serials_with_defects = Defect.objects.values('serial_number').distinct().count()
+    serials_with_defects = defect_counts['serials_with_defects']
     fpy = round(((total_serials - serials_with_defects) / total_serials * 100) if total_serials > 0 else 0, 1)
     
-    total_defects = Defect.objects.count()
-    open_defects = Defect.objects.filter(status='OPEN').count()
-    in_repair_defects = Defect.objects.filter(status='IN_REPAIR').count()
-    resolved_defects = Defect.objects.filter(status='REPAIRED').count()
+    total_defects = defect_counts['total']
+    open_defects = defect_counts['open']
+    in_repair_defects = defect_counts['in_repair']
+    resolved_defects = defect_counts['resolved']
     
     today = timezone.now().date()
     current_shift = get_current_shift()
@@ -252,7 +293,7 @@ def api_statistics(request):
         elif shift == 2:
             shift_2_defects += 1
     
-    return JsonResponse({
+    return {
         'total_serials': total_serials,
         'completed_serials': completed_serials,
         'in_process_serials': in_process_serials,
@@ -267,43 +308,54 @@ def api_statistics(request):
         'current_shift': current_shift,
         'shift_1_defects': shift_1_defects,
         'shift_2_defects': shift_2_defects,
-    })
+    }
 
 
 @login_required
 @require_http_methods(["GET"])
 def api_dashboard_data(request):
     """API endpoint for dashboard real-time data"""
-    # Recent serial numbers
-    recent_serials = SerialNumber.objects.select_related(
-        'authorized_part', 'created_by'
+    # Recent serial numbers, with progress counted in the same query
+    recent_serials = SerialNumber.objects.values(
+        'serial_number', 'order_number', 'status', 'created_at',
+        'authorized_part__part_number'
+    ).annotate(
+        done_ops=Count('process_records', filter=Q(process_records__status='APPROVED')),
     ).order_by('-created_at')[:10]
     
     # Active alerts
     active_alerts = ProductionAlert.objects.filter(
         is_active=True, 
         is_resolved=False
+    ).values(
+        'alert_type', 'message', 'priority', 'created_at'
     ).order_by('-priority', '-created_at')[:5]
     
-    serials_data = []
-    for serial in recent_serials:
-        serials_data.append({
-            'serial_number': serial.serial_number,
-            'order_number': serial.order_number,
-            'part_number': serial.authorized_part.part_number,
-            'status': serial.get_status_display(),
-            'created_at': serial.created_at.strftime('%d/%m/%Y %H:%M'),
-            'progress': serial.get_completion_percentage(),
-        })
-    
-    alerts_data = []
-    for alert in active_alerts:
-        alerts_data.append({
-            'type': alert.get_alert_type_display(),
-            'message': alert.message,
-            'priority': alert.get_priority_display(),
-            'created_at': alert.created_at.strftime('%d/%m/%Y %H:%M'),
-        })
+    status_display = dict(SerialNumber.STATUS_CHOICES)
+    total_operations = Operation.active_count()
+    serials_data = [
+        {
+            'serial_number': serial['serial_number'],
+            'order_number': serial['order_number'],
+            'part_number': serial['authorized_part__part_number'],
+            'status': status_display.get(serial['status'], serial['status']),
+            'created_at': serial['created_at'].strftime('%d/%m/%Y %H:%M'),
+            'progress': round(serial['done_ops'] / total_operations * 100, 2) if total_operations else 0,
+        }
+        for serial in recent_serials
+    ]
+    
+    alert_type_display = dict(ProductionAlert.ALERT_TYPES)
+    priority_display = dict(ProductionAlert.PRIORITY_CHOICES)
+    alerts_data = [
+        {
+            'type': alert_type_display.get(alert['alert_type'], alert['alert_type']),
+            'message': alert['message'],
+            'priority': priority_display.get(alert['priority'], alert['priority']),
+            'created_at': alert['created_at'].strftime('%d/%m/%Y %H:%M'),
+        }
+        for alert in active_alerts
+    ]
     
     return JsonResponse({
         'recent_serials': serials_data,
@@ -329,7 +381,7 @@ def assign_operator(request):
             existing_assignment = ProcessRecord.objects.filter(
                 assigned_operator=request.user,
                 status='IN_PROGRESS'
-            ).first()
+            ).select_related('operation').first()
             
             if existing_assignment:
                 return JsonResponse({
@@ -337,8 +389,11 @@ def assign_operator(request):
                     'error': f'Ya tienes una operación en progreso: {existing_assignment.operation.name}. Debes completarla o liberarla primero.'
                 })
             
-            # Find a free operation (pending without assigned operator)
-            free_operation = ProcessRecord.objects.filter(
+            # Find and lock a free operation (pending without assigned operator);
+            # rows already locked by a concurrent assigner are skipped
+            free_operation = ProcessRecord.objects.select_for_update(
+                skip_locked=True, of=('self',)
+            ).select_related('serial_number').filter(
                 operation=operation,
                 status='PENDING',
                 assigned_operator__isnull=True
@@ -350,17 +405,33 @@ def assign_operator(request):
                     'error': 'No hay operaciones libres disponibles para esta operación.'
                 })
             
-            # Assign the operation
-            free_operation.assigned_operator = request.user
-            free_operation.status = 'IN_PROGRESS'
-            free_operation.started_at = timezone.now()
-            free_operation.assigned_at = timezone.now()
-            free_operation.save()
+            # Assign the operation; the status guard keeps the write safe on
+            # databases without row locks
+            now = timezone.now()
+            assigned = ProcessRecord.objects.filter(
+                pk=free_operation.pk,
+                status='PENDING',
+                assigned_operator__isnull=True
+            ).update(
+                assigned_operator=request.user,
+                status='IN_PROGRESS',
+                started_at=now,
+                assigned_at=now,
+                updated_at=now
+            )
+            
+            if not assigned:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'La operación fue tomada por otro operador, intenta de nuevo.'
+                })
+            AvailableOperationsCache.invalidate()
             
             # Update serial number status if needed
-            if free_operation.serial_number.status == 'CREATED':
-                free_operation.serial_number.status = 'IN_PROCESS'
-                free_operation.serial_number.save()
+            serial_number = free_operation.serial_number
+            if serial_number.status == 'CREATED':
+                serial_number.status = 'IN_PROCESS'
+                serial_number.save(update_fields=['status', 'updated_at'])
             
             return JsonResponse({
                 'success': True,
@@ -381,8 +452,7 @@ def change_operator(request):
     try:
         # Check permissions
         if not (request.user.is_superuser or 
-                (hasattr(request.user, 'userprofile') and 
-                 request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
+                request.user_role in UserProfile.ELEVATED_ROLES):
             return JsonResponse({
                 'success': False,
                 'error': 'No tienes permisos para cambiar asignaciones de operadores.'
@@ -401,7 +471,7 @@ def change_operator(request):
             new_operator = get_object_or_404(User, id=new_operator_id)
             
             # Validate new operator
-            if not hasattr(new_operator, 'userprofile') or new_operator.userprofile.role not in ['OPERATOR', 'SUPERVISOR', 'ADMIN']:
+            if not hasattr(new_operator, 'userprofile') or new_operator.userprofile.role not in UserProfile.FLOOR_ROLES:
                 return JsonResponse({
                     'success': False,
                     'error': 'El usuario seleccionado no es un operador válido.'
@@ -453,220 +523,218 @@ def change_operator(request):
 
 @login_required
 @require_http_methods(["POST"])
+@json_errors('Error al iniciar proceso')
 def start_process(request):
     """Start a process that is assigned to the current user"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
+    data = load_json_body(request)
+    process_record_id = data.get('process_record_id')
+    
+    from django.db import transaction
+    
+    with transaction.atomic():
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation', 'serial_number'),
+            id=process_record_id
+        )
         
-        from django.db import transaction
+        # Verify the process is assigned to current user
+        if process_record.assigned_operator_id != request.user.id:
+            return JsonResponse({
+                'success': False,
+                'message': 'No tienes permisos para iniciar este proceso.'
+            })
         
-        with transaction.atomic():
-            process_record = get_object_or_404(ProcessRecord, id=process_record_id)
-            
-            # Verify the process is assigned to current user
-            if process_record.assigned_operator != request.user:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'No tienes permisos para iniciar este proceso.'
-                })
-            
-            # Verify the process is in correct status
-            if process_record.status != 'PENDING':
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Este proceso no está en estado pendiente.'
-                })
-            
-            # Start the process
-            process_record.status = 'IN_PROGRESS'
-            process_record.started_at = timezone.now()
-            process_record.save()
-            
-            # Update serial number status if needed
-            if process_record.serial_number.status == 'CREATED':
-                process_record.serial_number.status = 'IN_PROCESS'
-                process_record.serial_number.save()
-            
+        # Verify the process is in correct status
+        if process_record.status != 'PENDING':
             return JsonResponse({
-                'success': True,
-                'message': f'Proceso {process_record.operation.name} iniciado exitosamente.'
+                'success': False,
+                'message': 'Este proceso no está en estado pendiente.'
             })
-            
-    except Exception as e:
+        
+        # Start the process
+        process_record.status = 'IN_PROGRESS'
+        process_record.started_at = timezone.now()
+        process_record.save()
+        
+        # Update serial number status if needed
+        if process_record.serial_number.status == 'CREATED':
+            process_record.serial_number.status = 'IN_PROCESS'
+            process_record.serial_number.save(update_fields=['status', 'updated_at'])
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al iniciar proceso: {str(e)}'
+            'success': True,
+            'message': f'Proceso {process_record.operation.name} iniciado exitosamente.'
         })
 
 
 @login_required
 @require_http_methods(["POST"])
+@json_errors('Error al completar proceso')
 def complete_process(request):
     """Complete a process with password validation"""
-    try:
-        process_record_id = request.POST.get('process_record_id')
-        password = request.POST.get('password')
-        notes = request.POST.get('notes', '')
+    fields = clean_fields(request.POST.dict(), {
+        'process_record_id': int, 'password': (str, ''), 'notes': (str, '')
+    })
+    process_record_id = fields['process_record_id']
+    password = fields['password']
+    notes = fields['notes']
+    
+    # Validate password
+    if not password:
+        return JsonResponse({
+            'success': False,
+            'message': 'Debes ingresar tu contraseña para completar el proceso.'
+        })
+    
+    # Authenticate user with provided password
+    user = authenticate(username=request.user.username, password=password)
+    if not user:
+        return JsonResponse({
+            'success': False,
+            'message': 'Contraseña incorrecta. No se puede completar el proceso.'
+        })
+    
+    from django.db import transaction
+    
+    with transaction.atomic():
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation', 'serial_number'),
+            id=process_record_id
+        )
         
-        # Validate password
-        if not password:
+        # Verify the process is assigned to current user
+        if process_record.assigned_operator_id != request.user.id:
             return JsonResponse({
                 'success': False,
-                'message': 'Debes ingresar tu contraseña para completar el proceso.'
+                'message': 'No tienes permisos para completar este proceso.'
             })
         
-        # Authenticate user with provided password
-        user = authenticate(username=request.user.username, password=password)
-        if not user:
+        # Verify the process is in progress
+        if process_record.status != 'IN_PROGRESS':
             return JsonResponse({
                 'success': False,
-                'message': 'Contraseña incorrecta. No se puede completar el proceso.'
+                'message': 'Este proceso no está en progreso.'
             })
         
-        from django.db import transaction
+        # Complete the process
+        process_record.status = 'APPROVED'
+        process_record.completed_at = timezone.now()
+        process_record.processed_by = request.user
+        process_record.notes = notes
+        process_record.save()
+        
+        # Check if this was the last operation for the serial number
+        serial_number = process_record.serial_number
+        remaining_operations = ProcessRecord.objects.filter(
+            serial_number=serial_number,
+            status__in=['PENDING', 'IN_PROGRESS']
+        ).count()
+        
+        new_status = serial_number.status
+        if remaining_operations == 0:
+            # All operations completed, mark serial as completed
+            new_status = 'COMPLETED'
+        elif ProcessRecord.objects.filter(
+            serial_number=serial_number,
+            status='PENDING',
+            operation_sequence__gt=process_record.operation.sequence_number
+        ).exists():
+            # Serial continues to next operation
+            new_status = 'IN_PROCESS'
+        
+        # The post_save signal usually set this status already; skip the no-op write
+        if new_status != serial_number.status:
+            serial_number.status = new_status
+            serial_number.save(update_fields=['status', 'updated_at'])
         
-        with transaction.atomic():
-            process_record = get_object_or_404(ProcessRecord, id=process_record_id)
-            
-            # Verify the process is assigned to current user
-            if process_record.assigned_operator != request.user:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'No tienes permisos para completar este proceso.'
-                })
-            
-            # Verify the process is in progress
-            if process_record.status != 'IN_PROGRESS':
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Este proceso no está en progreso.'
-                })
-            
-            # Complete the process
-            process_record.status = 'APPROVED'
-            process_record.processed_at = timezone.now()
-            process_record.processed_by = request.user
-            process_record.notes = notes
-            process_record.save()
-            
-            # Check if this was the last operation for the serial number
-            serial_number = process_record.serial_number
-            remaining_operations = ProcessRecord.objects.filter(
-                serial_number=serial_number,
-                status__in=['PENDING', 'IN_PROGRESS']
-            ).count()
-            
-            if remaining_operations == 0:
-                # All operations completed, mark serial as completed
-                serial_number.status = 'COMPLETED'
-                serial_number.save()
-            else:
-                # Move to next operation
-                next_operation = ProcessRecord.objects.filter(
-                    serial_number=serial_number,
-                    status='PENDING',
-                    operation__sequence_number__gt=process_record.operation.sequence_number
-                ).order_by('operation__sequence_number').first()
-                
-                if next_operation:
-                    # Serial continues to next operation
-                    serial_number.status = 'IN_PROCESS'
-                    serial_number.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Proceso {process_record.operation.name} completado exitosamente.'
-            })
-            
-    except Exception as e:
         return JsonResponse({
-            'success': False,
-            'message': f'Error al completar proceso: {str(e)}'
+            'success': True,
+            'message': f'Proceso {process_record.operation.name} completado exitosamente.'
         })
 
 
 @login_required
 @require_http_methods(["POST"])
+@json_errors('Error al rechazar proceso')
 def reject_process(request):
     """Reject a process with password validation and send to repair"""
-    try:
-        process_record_id = request.POST.get('process_record_id')
-        password = request.POST.get('password')
-        reject_reason = request.POST.get('reject_reason', '')
+    fields = clean_fields(request.POST.dict(), {
+        'process_record_id': int, 'password': (str, ''), 'reject_reason': (str, '')
+    })
+    process_record_id = fields['process_record_id']
+    password = fields['password']
+    reject_reason = fields['reject_reason']
+    
+    # Validate password
+    if not password:
+        return JsonResponse({
+            'success': False,
+            'message': 'Debes ingresar tu contraseña para rechazar el proceso.'
+        })
+    
+    # Validate reject reason
+    if not reject_reason.strip():
+        return JsonResponse({
+            'success': False,
+            'message': 'Debes especificar el motivo del rechazo.'
+        })
+    
+    # Authenticate user with provided password
+    user = authenticate(username=request.user.username, password=password)
+    if not user:
+        return JsonResponse({
+            'success': False,
+            'message': 'Contraseña incorrecta. No se puede rechazar el proceso.'
+        })
+    
+    from django.db import transaction
+    
+    with transaction.atomic():
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation', 'serial_number'),
+            id=process_record_id
+        )
         
-        # Validate password
-        if not password:
+        # Verify the process is assigned to current user
+        if process_record.assigned_operator_id != request.user.id:
             return JsonResponse({
                 'success': False,
-                'message': 'Debes ingresar tu contraseña para rechazar el proceso.'
+                'message': 'No tienes permisos para rechazar este proceso.'
             })
         
-        # Validate reject reason
-        if not reject_reason.strip():
+        # Verify the process is in progress
+        if process_record.status != 'IN_PROGRESS':
             return JsonResponse({
                 'success': False,
-                'message': 'Debes especificar el motivo del rechazo.'
+                'message': 'Este proceso no está en progreso.'
             })
         
-        # Authenticate user with provided password
-        user = authenticate(username=request.user.username, password=password)
-        if not user:
-            return JsonResponse({
-                'success': False,
-                'message': 'Contraseña incorrecta. No se puede rechazar el proceso.'
-            })
+        # Reject the process
+        now = timezone.now()
+        process_record.status = 'REJECTED'
+        process_record.completed_at = now
+        process_record.processed_by = request.user
+        process_record.notes = f'RECHAZADO: {reject_reason}'
+        process_record.rejection_reason = reject_reason
+        process_record.defect_type = 'OTHER'
+        process_record.save()
         
-        from django.db import transaction
+        # Create defect record
+        Defect.objects.create(
+            serial_number=process_record.serial_number,
+            operation=process_record.operation,
+            defect_type='OTHER',
+            description=f'Proceso rechazado: {reject_reason}',
+            status='OPEN',
+            reported_by=request.user
+        )
+        
+        # Mark serial number as defective, pending repair
+        serial_number = process_record.serial_number
+        serial_number.status = 'DEFECTIVE'
+        serial_number.save(update_fields=['status', 'updated_at'])
         
-        with transaction.atomic():
-            process_record = get_object_or_404(ProcessRecord, id=process_record_id)
-            
-            # Verify the process is assigned to current user
-            if process_record.assigned_operator != request.user:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'No tienes permisos para rechazar este proceso.'
-                })
-            
-            # Verify the process is in progress
-            if process_record.status != 'IN_PROGRESS':
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Este proceso no está en progreso.'
-                })
-            
-            # Reject the process
-            process_record.status = 'REJECTED'
-            process_record.processed_at = timezone.now()
-            process_record.processed_by = request.user
-            process_record.notes = f'RECHAZADO: {reject_reason}'
-            process_record.save()
-            
-            # Create defect record
-            defect = Defect.objects.create(
-                serial_number=process_record.serial_number,
-                operation=process_record.operation,
-                defect_type='PROCESS_FAILURE',
-                description=f'Proceso rechazado: {reject_reason}',
-                severity='MEDIUM',
-                status='OPEN',
-                detected_by=request.user,
-                detected_at=timezone.now()
-            )
-            
-            # Mark serial number as failed and needing repair
-            serial_number = process_record.serial_number
-            serial_number.status = 'FAILED'
-            serial_number.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Proceso {process_record.operation.name} rechazado. El número de serie ha sido enviado a reparación.'
-            })
-            
-    except Exception as e:
         return JsonResponse({
-            'success': False,
-            'message': f'Error al rechazar proceso: {str(e)}'
+            'success': True,
+            'message': f'Proceso {process_record.operation.name} rechazado. El número de serie ha sido enviado a reparación.'
         })
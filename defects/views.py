@@ -1,14 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.db.models import Q, Count
 from django.utils import timezone
+from django.db import transaction
 from .models import Defect
 from serials.models import SerialNumber
 from operations.models import Operation, ProcessRecord
 from operators.models import UserProfile
+from operators.services import AvailableOperationsCache
 from operators.decorators import supervisor_or_admin_required
 import json
 
@@ -26,13 +28,13 @@ def defects_dashboard(request):
         defects = defects.filter(status=status_filter)
     
     # Statistics
-    stats = {
-        'total_defects': defects.count(),
-        'open_defects': defects.filter(status='OPEN').count(),
-        'in_repair': defects.filter(status='IN_REPAIR').count(),
-        'repaired': defects.filter(status='REPAIRED').count(),  # corregido RESOLVED a REPAIRED
-        'scrapped': defects.filter(status='SCRAPPED').count(),
-    }
+    stats = defects.order_by().aggregate(
+        total_defects=Count('id'),
+        open_defects=Count('id', filter=Q(status='OPEN')),
+        in_repair=Count('id', filter=Q(status='IN_REPAIR')),
+        repaired=Count('id', filter=Q(status='REPAIRED')),  # corregido RESOLVED a REPAIRED
+        scrapped=Count('id', filter=Q(status='SCRAPPED')),
+    )
     
     context = {
         'defects': defects[:50],  # Limit to 50 for performance
@@ -44,10 +46,12 @@ def defects_dashboard(request):
 @login_required
 def repairer_dashboard(request):
     """Dashboard for repairers to manage their assigned defects"""
-    user_profile = get_object_or_404(UserProfile, user=request.user)
+    user_profile = request.user_profile
+    if user_profile is None:
+        raise Http404('Perfil de usuario no encontrado')
     
     # Only repairers can access this view
-    if user_profile.role not in ['REPAIRER', 'ADMIN']:
+    if user_profile.role not in UserProfile.REPAIR_ROLES:
         messages.error(request, 'No tienes permisos para acceder a esta página.')
         return redirect('analytics:dashboard')
     
@@ -74,13 +78,14 @@ def repairer_dashboard(request):
 def defect_detail(request, defect_id):
     """Detail view for a specific defect"""
     defect = get_object_or_404(Defect.objects.select_related(
-        'serial_number', 'operation', 'reported_by', 'assigned_repairer'  # corregido assigned_to a assigned_repairer
+        'serial_number__authorized_part', 'operation', 'reported_by',
+        'assigned_repairer', 'resolved_by', 'return_to_operation'  # corregido assigned_to a assigned_repairer
     ), id=defect_id)
     
     # Get defect history for this serial number
     defect_history = Defect.objects.filter(
-        serial_number=defect.serial_number
-    ).exclude(id=defect.id).order_by('-created_at')
+        serial_number_id=defect.serial_number_id
+    ).exclude(id=defect.id).select_related('operation').order_by('-created_at')
     
     context = {
         'defect': defect,
@@ -99,13 +104,18 @@ def assign_defect(request):
         defect_id = data.get('defect_id')
         repairer_id = data.get('repairer_id')
         
-        defect = get_object_or_404(Defect, id=defect_id)
-        repairer = get_object_or_404(UserProfile, id=repairer_id, role='REPAIRER')
+        repairer = get_object_or_404(
+            UserProfile.objects.select_related('user'), id=repairer_id, role='REPAIRER'
+        )
         
-        defect.assigned_repairer = repairer.user  # corregido assigned_to a assigned_repairer
-        defect.status = 'IN_REPAIR'
-        defect.assigned_at = timezone.now()  # agregado timestamp de asignación
-        defect.save()
+        with transaction.atomic():
+            # Lock the defect so concurrent assignments don't interleave
+            defect = get_object_or_404(Defect.objects.select_for_update(), id=defect_id)
+            
+            defect.assigned_repairer = repairer.user  # corregido assigned_to a assigned_repairer
+            defect.status = 'IN_REPAIR'
+            defect.assigned_at = timezone.now()  # agregado timestamp de asignación
+            defect.save(update_fields=['assigned_repairer', 'status', 'assigned_at'])
         
         return JsonResponse({
             'success': True,
@@ -128,48 +138,68 @@ def resolve_defect(request):
         repair_notes = data.get('repair_notes')  # corregido resolution a repair_notes
         return_to_operation = data.get('return_to_operation')
         
-        defect = get_object_or_404(Defect, id=defect_id)
-        user_profile = get_object_or_404(UserProfile, user=request.user)
+        user_profile = request.user_profile
+        if user_profile is None:
+            raise Http404('Perfil de usuario no encontrado')
         
-        # Check permissions
-        if user_profile.role not in ['REPAIRER', 'ADMIN'] and defect.assigned_repairer != request.user:  # corregido assigned_to a assigned_repairer
-            return JsonResponse({
-                'success': False,
-                'message': 'No tienes permisos para resolver este defecto'
-            })
-        
-        # Update defect
-        defect.repair_notes = repair_notes  # corregido resolution a repair_notes
-        defect.resolved_at = timezone.now()
-        defect.resolved_by = request.user  # agregado resolved_by
-        
-        if return_to_operation:
-            defect.status = 'REPAIRED'  # corregido RESOLVED a REPAIRED
-            # Return serial number to specified operation
-            operation = get_object_or_404(Operation, id=return_to_operation)
-            defect.return_to_operation = operation  # agregado return_to_operation
-            
-            # Create or update process record
-            process_record, created = ProcessRecord.objects.get_or_create(
-                serial_number=defect.serial_number,
-                operation=operation,
-                defaults={
-                    'status': 'PENDING',
-                    'assigned_operator': None
-                }
+        with transaction.atomic():
+            # Lock the defect so two resolvers can't resolve it concurrently
+            defect = get_object_or_404(
+                Defect.objects.select_for_update().select_related('serial_number'), id=defect_id
             )
-            if not created:
-                process_record.status = 'PENDING'
-                process_record.assigned_operator = None
-                process_record.save()
+            
+            # Check permissions
+            if user_profile.role not in UserProfile.REPAIR_ROLES and defect.assigned_repairer_id != request.user.id:  # corregido assigned_to a assigned_repairer
+                return JsonResponse({
+                    'success': False,
+                    'message': 'No tienes permisos para resolver este defecto'
+                })
+            
+            # Update defect
+            defect.repair_notes = repair_notes  # corregido resolution a repair_notes
+            now = timezone.now()
+            defect.resolved_at = now
+            defect.resolved_by = request.user  # agregado resolved_by
+            
+            if return_to_operation:
+                defect.status = 'REPAIRED'  # corregido RESOLVED a REPAIRED
+                # Return serial number to specified operation
+                operation = get_object_or_404(Operation, id=return_to_operation)
+                defect.return_to_operation = operation  # agregado return_to_operation
                 
-        else:
-            defect.status = 'SCRAPPED'
-            # Mark serial number as scrapped
-            defect.serial_number.status = 'SCRAPPED'
-            defect.serial_number.save()
-        
-        defect.save()
+                # Reopen the process record with a single UPDATE, creating it if missing
+                serial = defect.serial_number
+                updated = ProcessRecord.objects.filter(
+                    serial_number=serial,
+                    operation=operation
+                ).update(
+                    status='PENDING',
+                    assigned_operator=None,
+                    updated_at=now
+                )
+                AvailableOperationsCache.invalidate()
+                if updated:
+                    # update() skips the post_save signal, so sync the serial status here
+                    has_approved = serial.process_records.filter(status='APPROVED').exists()
+                    serial.status = 'IN_PROCESS' if has_approved else 'CREATED'
+                    serial.save(update_fields=['status', 'updated_at'])
+                else:
+                    ProcessRecord.objects.create(
+                        serial_number=serial,
+                        operation=operation,
+                        status='PENDING',
+                        assigned_operator=None
+                    )
+                    
+            else:
+                defect.status = 'SCRAPPED'
+                # Mark serial number as scrapped
+                defect.serial_number.status = 'SCRAPPED'
+                defect.serial_number.save(update_fields=['status', 'updated_at'])
+            
+            defect.save(update_fields=[
+                'status', 'repair_notes', 'resolved_at', 'resolved_by', 'return_to_operation'
+            ])
         
         return JsonResponse({
             'success': True,
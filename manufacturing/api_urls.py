@@ -13,5 +13,6 @@ urlpatterns = [
     path('process-operation/', api_views.process_operation_api, name='process_operation_api'),
     path('export-excel/', api_views.export_excel, name='export_excel'),
     path('export-pdf/', api_views.export_pdf, name='export_pdf'),
+    path('export-csv/', api_views.export_csv, name='export_csv'),
     path('statistics/', api_views.statistics_api, name='statistics_api'),
 ]
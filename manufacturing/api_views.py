@@ -30,7 +30,7 @@ class SerialNumberViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = SerialNumber.objects.select_related(
             'authorized_part', 'created_by'
-        ).prefetch_related('process_records__operation')
+        ).prefetch_related('process_records__operation').with_completion()
         
         # Filter by status
         status_filter = self.request.query_params.get('status', None)
@@ -55,7 +55,7 @@ class SerialNumberViewSet(viewsets.ModelViewSet):
         serial = self.get_object()
         process_records = ProcessRecord.objects.filter(
             serial_number=serial
-        ).select_related('operation', 'processed_by').order_by('operation__sequence_number')
+        ).select_related('operation', 'processed_by').order_by('operation_sequence')
         
         data = {
             'serial_number': serial.serial_number,
@@ -217,31 +217,32 @@ def process_operation_api(request):
         )
 
 
+def _export_queryset(request):
+    """Filtered SerialNumber queryset shared by the export endpoints"""
+    status_filter = request.GET.get('status', '')
+    part_filter = request.GET.get('part', '')
+    order_filter = request.GET.get('order', '')
+    
+    queryset = SerialNumber.objects.select_related(
+        'authorized_part', 'created_by'
+    ).with_completion()
+    
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    if part_filter:
+        queryset = queryset.filter(authorized_part__part_number__icontains=part_filter)
+    if order_filter:
+        queryset = queryset.filter(order_number__icontains=order_filter)
+    
+    return queryset
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def export_excel(request):
     """Export serial numbers to Excel"""
     try:
-        # Get filter parameters
-        status_filter = request.GET.get('status', '')
-        part_filter = request.GET.get('part', '')
-        order_filter = request.GET.get('order', '')
-        
-        # Build queryset
-        queryset = SerialNumber.objects.select_related(
-            'authorized_part', 'created_by'
-        ).prefetch_related('process_records__operation')
-        
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        if part_filter:
-            queryset = queryset.filter(authorized_part__part_number__icontains=part_filter)
-        if order_filter:
-            queryset = queryset.filter(order_number__icontains=order_filter)
-        
-        # Generate Excel file
-        response = ExportUtils.export_to_excel(queryset)
-        return response
+        return ExportUtils.export_to_excel(_export_queryset(request))
         
     except Exception as e:
         return Response(
@@ -255,26 +256,7 @@ def export_excel(request):
 def export_pdf(request):
     """Export serial numbers to PDF"""
     try:
-        # Get filter parameters
-        status_filter = request.GET.get('status', '')
-        part_filter = request.GET.get('part', '')
-        order_filter = request.GET.get('order', '')
-        
-        # Build queryset
-        queryset = SerialNumber.objects.select_related(
-            'authorized_part', 'created_by'
-        ).prefetch_related('process_records__operation')
-        
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        if part_filter:
-            queryset = queryset.filter(authorized_part__part_number__icontains=part_filter)
-        if order_filter:
-            queryset = queryset.filter(order_number__icontains=order_filter)
-        
-        # Generate PDF file
-        response = ExportUtils.export_to_pdf(queryset)
-        return response
+        return ExportUtils.export_to_pdf(_export_queryset(request))
         
     except Exception as e:
         return Response(
@@ -283,6 +265,20 @@ def export_pdf(request):
         )
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_csv(request):
+    """Export serial numbers to CSV, streamed row by row"""
+    try:
+        return ExportUtils.export_to_csv(_export_queryset(request))
+        
+    except Exception as e:
+        return Response(
+            {'error': f'Error exportando a CSV: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def statistics_api(request):
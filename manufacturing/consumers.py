@@ -2,7 +2,9 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import User
-from .models import SerialNumber, ProcessRecord, ProductionAlert
+from django.utils import timezone
+from serials.models import SerialNumber
+from analytics.models import ProductionAlert
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
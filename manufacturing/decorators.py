@@ -1,6 +1,8 @@
 from django.contrib.auth.decorators import user_passes_test
 from django.core.exceptions import PermissionDenied
 from functools import wraps
+from operators.decorators import get_user_role
+from operators.models import UserProfile
 
 
 def operator_required(view_func):
@@ -11,10 +13,11 @@ def operator_required(view_func):
             from django.contrib.auth.views import redirect_to_login
             return redirect_to_login(request.get_full_path())
         
-        if not hasattr(request.user, 'userprofile'):
+        user_role = get_user_role(request)
+        if user_role is None:
             raise PermissionDenied("Usuario sin perfil asignado")
         
-        if request.user.userprofile.role not in ['OPERATOR', 'SUPERVISOR', 'ADMIN']:
+        if user_role not in UserProfile.FLOOR_ROLES:
             raise PermissionDenied("Acceso restringido a operadores, supervisores y administradores")
         
         return view_func(request, *args, **kwargs)
@@ -30,10 +33,11 @@ def supervisor_or_admin_required(view_func):
             from django.contrib.auth.views import redirect_to_login
             return redirect_to_login(request.get_full_path())
         
-        if not hasattr(request.user, 'userprofile'):
+        user_role = get_user_role(request)
+        if user_role is None:
             raise PermissionDenied("Usuario sin perfil asignado")
         
-        if request.user.userprofile.role not in ['SUPERVISOR', 'ADMIN']:
+        if user_role not in UserProfile.ELEVATED_ROLES:
             raise PermissionDenied("Acceso restringido a supervisores y administradores")
         
         return view_func(request, *args, **kwargs)
@@ -0,0 +1,38 @@
+import os
+
+from django.core.management.base import BaseCommand
+from serials.models import SerialNumber
+from manufacturing.utils import ExportUtils
+
+
+class Command(BaseCommand):
+    help = 'Genera el reporte de números de serie (Excel o PDF) fuera del ciclo de petición HTTP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['excel', 'pdf'], default='excel',
+                            help='Formato del reporte')
+        parser.add_argument('--status', default='', help='Filtrar por estado')
+        parser.add_argument('--part', default='', help='Filtrar por número de parte')
+        parser.add_argument('--order', default='', help='Filtrar por número de orden')
+        parser.add_argument('--output-dir', default='.', help='Directorio de salida')
+
+    def handle(self, *args, **options):
+        queryset = SerialNumber.objects.select_related('authorized_part', 'created_by').with_completion()
+
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+        if options['part']:
+            queryset = queryset.filter(authorized_part__part_number__icontains=options['part'])
+        if options['order']:
+            queryset = queryset.filter(order_number__icontains=options['order'])
+
+        if options['format'] == 'pdf':
+            extension, writer = 'pdf', ExportUtils.write_pdf
+        else:
+            extension, writer = 'xlsx', ExportUtils.write_excel
+
+        path = os.path.join(options['output_dir'], ExportUtils.export_filename(extension))
+        with open(path, 'wb') as output:
+            writer(queryset, output)
+
+        self.stdout.write(self.style.SUCCESS(f'Reporte generado: {path}'))
@@ -76,7 +76,7 @@ class Command(BaseCommand):
                     employee_id=emp_id,
                     can_approve_operations=(role == 'SUPERVISOR'),
                     can_generate_serials=True,
-                    can_view_statistics=(role in ['SUPERVISOR', 'ADMIN'])
+                    can_view_statistics=(role in UserProfile.ELEVATED_ROLES)
                 )
                 self.stdout.write(f'Usuario {username} creado')
 
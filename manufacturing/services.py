@@ -1,12 +1,21 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Q
 from serials.models import SerialNumber, AuthorizedPart
 from operations.models import ProcessRecord, Operation
 from analytics.models import ProductionAlert
 import re
+import functools
 from django.utils import timezone
 
 
+# Precompiled KM###W###R pattern
+_SERIAL_FULL_RE = re.compile(r'^KM\d{3}W\d{3}R$')
+
+# Allowed order number characters (alphanumeric, hyphens, underscores)
+_ORDER_RE = re.compile(r'^[A-Za-z0-9\-_]+$')
+
+
 class SerialNumberGenerator:
     """Service class for generating serial numbers with KM###W###R format"""
     
@@ -14,24 +23,34 @@ class SerialNumberGenerator:
     def get_next_serial_number():
         """Generate the next available serial number in KM###W###R format"""
         
-        # Get the last serial number to determine the next sequence
-        last_serial = SerialNumber.objects.order_by('-serial_number').first()
+        # Get the last KM serial number to determine the next sequence; the
+        # [YEAR][MONTH] serials of the serials app sort above it otherwise
+        last_serial = SerialNumber.objects.filter(
+            serial_number__startswith='KM'
+        ).aggregate(last=Max('serial_number'))['last']
         
         if not last_serial:
             # First serial number
             return "KM001W001R"
         
-        # Extract numbers from the last serial number
-        pattern = r'KM(\d{3})W(\d{3})R'
-        match = re.match(pattern, last_serial.serial_number)
-        
-        if not match:
-            # Fallback if pattern doesn't match
-            return "KM001W001R"
-        
-        first_part = int(match.group(1))
-        second_part = int(match.group(2))
-        
+        return SerialNumberGenerator.increment_serial_number(last_serial)
+    
+    @staticmethod
+    def split_serial_number(serial_number):
+        """(first, second) parts of a KM###W###R serial number, or None.
+
+        The format is fixed-width, so the parts are read by position
+        instead of matching a regex.
+        """
+        if (len(serial_number) == 10 and serial_number.startswith('KM')
+                and serial_number[5] == 'W' and serial_number[9] == 'R'
+                and serial_number[2:5].isdecimal() and serial_number[6:9].isdecimal()):
+            return int(serial_number[2:5]), int(serial_number[6:9])
+        return None
+    
+    @staticmethod
+    def next_parts(first_part, second_part):
+        """Parts of the serial number that follows (first_part, second_part)"""
         # Increment logic: increment second part first, then first part
         second_part += 1
         
@@ -42,11 +61,23 @@ class SerialNumberGenerator:
         if first_part > 999:
             raise ValidationError("Se ha alcanzado el límite máximo de números de serie")
         
+        return first_part, second_part
+    
+    @staticmethod
+    def increment_serial_number(serial_number):
+        """Return the serial number that follows the given one in KM###W###R format"""
+        parts = SerialNumberGenerator.split_serial_number(serial_number)
+        
+        if parts is None:
+            # Fallback if pattern doesn't match
+            return "KM001W001R"
+        
+        first_part, second_part = SerialNumberGenerator.next_parts(*parts)
         return f"KM{first_part:03d}W{second_part:03d}R"
     
     @staticmethod
     @transaction.atomic
-    def generate_serial_number(order_number, part_number, created_by):
+    def generate_serial_number(order_number, part_number, created_by, authorized_part_obj=None):
         """
         Generate a new serial number for the given order and part
         
@@ -54,6 +85,8 @@ class SerialNumberGenerator:
             order_number (str): Order number to associate with the serial
             part_number (str): Part number from authorized parts
             created_by (User): User creating the serial number
+            authorized_part_obj (AuthorizedPart, optional): Already resolved
+                active part; skips the lookup by part_number
             
         Returns:
             SerialNumber: The created serial number instance
@@ -63,70 +96,59 @@ class SerialNumberGenerator:
         """
         
         # Validate authorized part
-        try:
-            authorized_part = AuthorizedPart.objects.get(
-                part_number=part_number,
-                is_active=True
-            )
-        except AuthorizedPart.DoesNotExist:
-            raise ValidationError(f"El número de parte '{part_number}' no está autorizado")
-        
-        # Generate next serial number
-        serial_number = SerialNumberGenerator.get_next_serial_number()
-        
-        # Ensure uniqueness (double-check)
-        max_attempts = 100
-        attempts = 0
+        authorized_part = authorized_part_obj
+        if authorized_part is None:
+            try:
+                authorized_part = AuthorizedPart.objects.get(
+                    part_number=part_number,
+                    is_active=True
+                )
+            except AuthorizedPart.DoesNotExist:
+                raise ValidationError(f"El número de parte '{part_number}' no está autorizado")
         
-        while SerialNumber.objects.filter(serial_number=serial_number).exists():
-            attempts += 1
-            if attempts >= max_attempts:
-                raise ValidationError("No se pudo generar un número de serie único")
-            
-            # Try to get next number
-            last_serial = SerialNumber.objects.order_by('-serial_number').first()
-            pattern = r'KM(\d{3})W(\d{3})R'
-            match = re.match(pattern, last_serial.serial_number)
-            
-            if match:
-                first_part = int(match.group(1))
-                second_part = int(match.group(2)) + attempts
-                
-                if second_part > 999:
-                    second_part = second_part % 1000
-                    first_part += 1
-                
-                serial_number = f"KM{first_part:03d}W{second_part:03d}R"
-        
-        # Create the serial number
-        serial_instance = SerialNumber.objects.create(
-            serial_number=serial_number,
-            order_number=order_number,
-            authorized_part=authorized_part,
-            created_by=created_by,
-            status='CREATED'
-        )
+        # Rely on the UNIQUE index on serial_number: if the number is taken,
+        # the insert fails and we retry past it (or past the new last serial
+        # if a concurrent request went further)
+        max_attempts = 5
         
-        return serial_instance
+        serial_number = SerialNumberGenerator.get_next_serial_number()
+        for attempt in range(max_attempts):
+            if attempt:
+                serial_number = max(
+                    SerialNumberGenerator.get_next_serial_number(),
+                    SerialNumberGenerator.increment_serial_number(serial_number)
+                )
+            try:
+                with transaction.atomic():
+                    return SerialNumber.objects.create(
+                        serial_number=serial_number,
+                        order_number=order_number,
+                        authorized_part=authorized_part,
+                        created_by=created_by,
+                        status='CREATED'
+                    )
+            except IntegrityError:
+                continue
+        
+        raise ValidationError("No se pudo generar un número de serie único")
     
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def validate_serial_format(serial_number):
         """Validate that a serial number follows the KM###W###R format"""
-        pattern = r'^KM\d{3}W\d{3}R$'
-        return bool(re.match(pattern, serial_number))
+        return _SERIAL_FULL_RE.match(serial_number) is not None
     
     @staticmethod
     def get_serial_info(serial_number):
         """Extract information from a serial number"""
-        pattern = r'KM(\d{3})W(\d{3})R'
-        match = re.match(pattern, serial_number)
+        parts = SerialNumberGenerator.split_serial_number(serial_number)
         
-        if not match:
+        if parts is None:
             return None
         
         return {
-            'first_sequence': int(match.group(1)),
-            'second_sequence': int(match.group(2)),
+            'first_sequence': parts[0],
+            'second_sequence': parts[1],
             'full_number': serial_number
         }
 
@@ -144,7 +166,7 @@ class SerialNumberValidator:
             raise ValidationError("El número de orden no puede exceder 50 caracteres")
         
         # Check for valid characters (alphanumeric, hyphens, underscores)
-        if not re.match(r'^[A-Za-z0-9\-_]+$', order_number):
+        if not _ORDER_RE.match(order_number):
             raise ValidationError("El número de orden solo puede contener letras, números, guiones y guiones bajos")
         
         return True
@@ -194,23 +216,34 @@ class SerialNumberBulkGenerator:
             raise ValidationError("La cantidad debe estar entre 1 y 100")
         
         # Validate part
-        SerialNumberValidator.validate_part_availability(part_number)
+        authorized_part = SerialNumberValidator.validate_part_availability(part_number)
         SerialNumberValidator.validate_order_number(order_number)
         
-        created_serials = []
-        
+        # Reserve a consecutive block of serial numbers: parse the first one
+        # once, the rest are plain arithmetic
+        first_part, second_part = SerialNumberGenerator.split_serial_number(
+            SerialNumberGenerator.get_next_serial_number()
+        )
+        serials = []
         for i in range(quantity):
-            try:
-                serial = SerialNumberGenerator.generate_serial_number(
-                    order_number=f"{order_number}-{i+1:03d}",
-                    part_number=part_number,
-                    created_by=created_by
-                )
-                created_serials.append(serial)
-            except ValidationError as e:
-                # If we fail partway through, we need to clean up
-                # The transaction will be rolled back automatically
-                raise ValidationError(f"Error generando serie {i+1}: {str(e)}")
+            if i:
+                first_part, second_part = SerialNumberGenerator.next_parts(first_part, second_part)
+            serials.append(SerialNumber(
+                serial_number=f"KM{first_part:03d}W{second_part:03d}R",
+                order_number=f"{order_number}-{i+1:03d}",
+                authorized_part=authorized_part,
+                created_by=created_by,
+                status='CREATED'
+            ))
+        
+        try:
+            created_serials = SerialNumber.objects.bulk_create(serials)
+        except IntegrityError:
+            raise ValidationError("No se pudo reservar un bloque de números de serie únicos")
+        
+        # bulk_create skips the post_save signal, so create the process
+        # records for every serial/operation pair in a single batch
+        SerialNumber.initialize_process_records([serial.pk for serial in created_serials])
         
         return created_serials
 
@@ -291,14 +324,15 @@ class ManufacturingProcessService:
         
         process_record.save()
         
-        # Send real-time notification
+        # Send real-time notification once the transaction commits
         from .utils import NotificationService
-        NotificationService.send_process_notification(
+        transaction.on_commit(functools.partial(
+            NotificationService.send_process_notification,
             serial_number=serial.serial_number,
             operation=operation.name,
             status=process_record.status,
             user=user.get_full_name()
-        )
+        ))
         
         # Check if all operations are completed and update serial status
         ManufacturingProcessService._update_serial_status(serial)
@@ -336,27 +370,41 @@ class ManufacturingProcessService:
     def _update_serial_status(serial):
         """Update serial number status based on process records"""
         
+        # Counted here rather than through Operation.active_count(): its cache
+        # can lag behind an operation change made by another worker, and this
+        # count decides when a serial is COMPLETED
         total_operations = Operation.objects.filter(is_active=True).count()
-        approved_operations = ProcessRecord.objects.filter(
-            serial_number=serial,
-            status='APPROVED'
-        ).count()
-        rejected_operations = ProcessRecord.objects.filter(
-            serial_number=serial,
-            status='REJECTED'
-        ).count()
+        counts = ProcessRecord.objects.filter(serial_number=serial).aggregate(
+            approved=Count('id', filter=Q(status='APPROVED')),
+            rejected=Count('id', filter=Q(status='REJECTED')),
+        )
+        approved_operations = counts['approved']
+        rejected_operations = counts['rejected']
         
         if rejected_operations > 0:
-            serial.status = 'REJECTED'
+            new_status = 'REJECTED'
         elif approved_operations == total_operations:
-            serial.status = 'COMPLETED'
-            serial.completed_at = timezone.now()
+            new_status = 'COMPLETED'
         elif approved_operations > 0:
-            serial.status = 'IN_PROCESS'
+            new_status = 'IN_PROCESS'
         else:
-            serial.status = 'CREATED'
-        
-        serial.save()
+            new_status = 'CREATED'
+        
+        if new_status == serial.status:
+            return
+        
+        now = timezone.now()
+        serial.status = new_status
+        serial.updated_at = now
+        if new_status == 'COMPLETED':
+            serial.completed_at = now
+        
+        # Targeted UPDATE: skips the save() signal chain and full-row write
+        SerialNumber.objects.filter(pk=serial.pk).update(
+            status=serial.status,
+            completed_at=serial.completed_at,
+            updated_at=serial.updated_at
+        )
     
     @staticmethod
     def get_operation_history(serial):
@@ -366,7 +414,7 @@ class ManufacturingProcessService:
             serial_number=serial
         ).select_related(
             'operation', 'processed_by'
-        ).order_by('operation__sequence_number')
+        ).order_by('operation_sequence')
     
     @staticmethod
     def get_pending_operations(user=None):
@@ -398,12 +446,13 @@ class ManufacturingProcessService:
             created_by=created_by
         )
         
-        # Send real-time notification
+        # Send real-time notification once the transaction commits
         from .utils import NotificationService
-        NotificationService.send_alert_notification(
+        transaction.on_commit(functools.partial(
+            NotificationService.send_alert_notification,
             alert_type=alert_type,
             message=f"{title}: {message}",
             priority=priority
-        )
+        ))
         
         return alert
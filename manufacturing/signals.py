@@ -1,10 +1,15 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
 from operators.models import UserProfile
-from serials.models import SerialNumber
+from operators.services import AssignableOperatorCache, AvailableOperationsCache
+from serials.models import SerialNumber, AuthorizedPart
+from serials.services import AuthorizedPartCache
 from operations.models import ProcessRecord, Operation
+from defects.models import Defect
 
 
 @receiver(post_save, sender=User)
@@ -25,17 +30,57 @@ def save_user_profile(sender, instance, **kwargs):
         instance.userprofile.save()
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_assignable_operators_cache(sender, instance, **kwargs):
+    """Drop the cached operator list when a user or profile changes"""
+    AssignableOperatorCache.invalidate()
+
+
+@receiver(post_save, sender=AuthorizedPart)
+@receiver(post_delete, sender=AuthorizedPart)
+def invalidate_authorized_parts_cache(sender, instance, **kwargs):
+    """Drop the cached active parts list when a part changes"""
+    AuthorizedPartCache.invalidate()
+
+
+@receiver(post_save, sender=Operation)
+@receiver(post_delete, sender=Operation)
+def invalidate_active_operation_count(sender, instance, **kwargs):
+    """Drop the cached active operation count when an operation changes"""
+    cache.delete(Operation.ACTIVE_COUNT_CACHE_KEY)
+
+
+@receiver(post_save, sender=ProcessRecord)
+@receiver(post_delete, sender=ProcessRecord)
+@receiver(post_save, sender=Operation)
+def invalidate_available_operations_cache(sender, instance, **kwargs):
+    """Drop the cached dashboard queues when a record or its sequence changes"""
+    AvailableOperationsCache.invalidate()
+
+
+@receiver(post_save, sender=Operation)
+def sync_process_record_sequence(sender, instance, created, **kwargs):
+    """Propagate sequence_number changes to ProcessRecord.operation_sequence"""
+    if not created:
+        ProcessRecord.objects.filter(operation=instance).exclude(
+            operation_sequence=instance.sequence_number
+        ).update(operation_sequence=instance.sequence_number)
+
+
 @receiver(post_save, sender=SerialNumber)
 def create_process_records(sender, instance, created, **kwargs):
     """Create ProcessRecord entries for all active operations when SerialNumber is created"""
-    if created:
-        operations = Operation.objects.filter(is_active=True).order_by('sequence_number')
-        for operation in operations:
-            ProcessRecord.objects.create(
-                serial_number=instance,
-                operation=operation,
-                status='PENDING'
-            )
+    if created and SerialNumber.initialize_process_records([instance.pk]):
+        # The records are inserted without signals; with no approved
+        # operations, the status update_serial_status would compute is CREATED
+        if instance.status != 'CREATED':
+            now = timezone.now()
+            instance.status = 'CREATED'
+            instance.updated_at = now
+            SerialNumber.refresh_progress([instance.pk], status='CREATED', updated_at=now)
 
 
 @receiver(pre_save, sender=ProcessRecord)
@@ -66,16 +111,30 @@ def update_serial_status(sender, instance, **kwargs):
     """Update SerialNumber status based on ProcessRecord changes"""
     serial = instance.serial_number
     
-    # Check if all operations are approved
-    total_operations = Operation.objects.filter(is_active=True).count()
-    approved_operations = serial.process_records.filter(status='APPROVED').count()
+    # Existence probes instead of counting: are all active operations
+    # approved, and is any record approved at all?
+    state = SerialNumber.objects.filter(pk=serial.pk).annotate(
+        all_done=~Exists(SerialNumber.pending_operations(OuterRef(OuterRef('pk')))),
+        any_approved=Exists(ProcessRecord.objects.filter(serial_number=OuterRef('pk'), status='APPROVED')),
+    ).values('all_done', 'any_approved').get()
     
-    if approved_operations == total_operations:
-        serial.status = 'COMPLETED'
-        serial.completed_at = timezone.now()
-    elif approved_operations > 0:
-        serial.status = 'IN_PROCESS'
+    now = timezone.now()
+    changes = {'updated_at': now}
+    if state['all_done']:
+        changes.update(status='COMPLETED', completed_at=now)
+    elif state['any_approved']:
+        changes['status'] = 'IN_PROCESS'
     else:
-        serial.status = 'CREATED'
+        changes['status'] = 'CREATED'
     
-    serial.save()
+    # Status and progress in a single UPDATE instead of a full-row save
+    for field, value in changes.items():
+        setattr(serial, field, value)
+    SerialNumber.refresh_progress([serial.pk], **changes)
+
+
+@receiver(post_save, sender=Defect)
+@receiver(post_delete, sender=Defect)
+def update_serial_defect_state(sender, instance, **kwargs):
+    """Keep SerialNumber.has_open_defect in sync with its defects"""
+    SerialNumber.refresh_progress([instance.serial_number_id])
@@ -0,0 +1,39 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+
+class OperatorEndpointPayloadTests(TestCase):
+    """Legacy operator JSON endpoints reject malformed bodies with a JSON 400"""
+
+    ENDPOINTS = [
+        'manufacturing:assign_operation',
+        'manufacturing:complete_operation',
+        'manufacturing:release_operation',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('operador1', password='clave-segura')
+        cls.user.userprofile.role = 'OPERATOR'
+        cls.user.userprofile.save()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_invalid_payloads_return_json_400(self):
+        for name in self.ENDPOINTS:
+            for body in [
+                {'process_record_id': 'x', 'serial_number_id': 1},
+                {'process_record_id': '²', 'serial_number_id': 1},
+                {'process_record_id': 2 ** 63, 'serial_number_id': 1},
+                [1],
+            ]:
+                with self.subTest(endpoint=name, body=body):
+                    response = self.client.post(
+                        reverse(name), json.dumps(body), content_type='application/json'
+                    )
+                    self.assertEqual(response.status_code, 400)
+                    self.assertFalse(response.json()['success'])
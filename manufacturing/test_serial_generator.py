@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from manufacturing.services import SerialNumberGenerator
+from serials.models import AuthorizedPart, SerialNumber
+
+
+class KmSerialNumberGeneratorTests(TestCase):
+    """KM###W###R serials alongside the serials app's [YEAR][MONTH] ones"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('supervisor1', password='clave-segura')
+        cls.part = AuthorizedPart.objects.create(part_number='P-100', sku='SKU-P-100', description='Parte')
+
+    def _create(self, serial_number):
+        return SerialNumber.objects.create(
+            serial_number=serial_number,
+            order_number='ORD-1',
+            authorized_part=self.part,
+            created_by=self.user
+        )
+
+    def test_next_serial_ignores_year_month_serials(self):
+        self._create('KM001W001R')
+        self._create('LJ001-001M')
+
+        self.assertEqual(SerialNumberGenerator.get_next_serial_number(), 'KM001W002R')
+
+    def test_consecutive_generation_after_year_month_serial(self):
+        self._create('LJ001-001M')
+
+        first = SerialNumberGenerator.generate_serial_number('ORD-2', 'P-100', self.user)
+        second = SerialNumberGenerator.generate_serial_number('ORD-2', 'P-100', self.user)
+
+        self.assertEqual(first.serial_number, 'KM001W001R')
+        self.assertEqual(second.serial_number, 'KM001W002R')
+
+    def test_retry_advances_past_taken_number(self):
+        self._create('KM001W001R')
+
+        # A stale next number keeps colliding with the existing serial
+        with mock.patch.object(SerialNumberGenerator, 'get_next_serial_number', return_value='KM001W001R'):
+            serial = SerialNumberGenerator.generate_serial_number('ORD-2', 'P-100', self.user)
+
+        self.assertEqual(serial.serial_number, 'KM001W002R')
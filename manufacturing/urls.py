@@ -6,7 +6,7 @@ app_name = 'manufacturing'
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('generate-serial/', views.generate_serial, name='generate_serial'),
-    path('manufacturing-process/<str:serial_number>/', views.manufacturing_process, name='manufacturing_process'),
+    path('manufacturing-process/<serial:serial_number>/', views.manufacturing_process, name='manufacturing_process'),
     path('summary/', views.summary_view, name='summary'),
     path('admin-panel/', views.admin_panel, name='admin_panel'),
     path('statistics/', views.statistics_view, name='statistics'),
@@ -1,13 +1,25 @@
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-import io
+import asyncio
+import csv
+
+
+# Rows fetched per round-trip when streaming large exports
+EXPORT_CHUNK_SIZE = 1000
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer"""
+    def write(self, value):
+        return value
 
 
 class ExportUtils:
@@ -16,6 +28,56 @@ class ExportUtils:
     @staticmethod
     def export_to_excel(queryset):
         """Export SerialNumber queryset to Excel"""
+        response = HttpResponse(
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{ExportUtils.export_filename("xlsx")}"'
+        
+        ExportUtils.write_excel(queryset, response)
+        return response
+    
+    @staticmethod
+    def export_to_pdf(queryset):
+        """Export SerialNumber queryset to PDF"""
+        response = HttpResponse(content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{ExportUtils.export_filename("pdf")}"'
+        
+        ExportUtils.write_pdf(queryset, response)
+        return response
+    
+    @staticmethod
+    def export_to_csv(queryset):
+        """Export SerialNumber queryset to CSV without building it in memory"""
+        writer = csv.writer(_Echo())
+        headers = ['Número de Serie', 'Número de Orden', 'Componente', 'SKU',
+                   'Estado', 'Progreso (%)', 'Fecha Creación', 'Fecha Completado']
+        
+        def stream_rows():
+            yield writer.writerow(headers)
+            for serial in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                yield writer.writerow([
+                    serial.serial_number,
+                    serial.order_number,
+                    serial.authorized_part.part_number,
+                    serial.authorized_part.sku,
+                    serial.get_status_display(),
+                    serial.completion_percentage,
+                    serial.created_at.strftime('%Y-%m-%d %H:%M'),
+                    serial.completed_at.strftime('%Y-%m-%d %H:%M') if serial.completed_at else '',
+                ])
+        
+        response = StreamingHttpResponse(stream_rows(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{ExportUtils.export_filename("csv")}"'
+        return response
+    
+    @staticmethod
+    def export_filename(extension):
+        """Timestamped file name shared by the HTTP and offline exports"""
+        return f'numeros_serie_{timezone.now().strftime("%Y%m%d_%H%M")}.{extension}'
+    
+    @staticmethod
+    def write_excel(queryset, output):
+        """Write the Excel report for a SerialNumber queryset to a file-like object"""
         
         # Create workbook and worksheet
         wb = Workbook()
@@ -35,46 +97,38 @@ class ExportUtils:
             cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
             cell.alignment = Alignment(horizontal="center")
         
+        # Track the widest value per column while writing, instead of
+        # re-scanning every cell afterwards
+        col_max_len = [len(header) for header in headers]
+        
         # Write data
-        for row, serial in enumerate(queryset, 2):
-            ws.cell(row=row, column=1, value=serial.serial_number)
-            ws.cell(row=row, column=2, value=serial.order_number)
-            ws.cell(row=row, column=3, value=serial.authorized_part.part_number)
-            ws.cell(row=row, column=4, value=serial.authorized_part.description)
-            ws.cell(row=row, column=5, value=serial.get_status_display())
-            ws.cell(row=row, column=6, value=f"{serial.completion_percentage}%")
-            ws.cell(row=row, column=7, value=serial.created_by.get_full_name())
-            ws.cell(row=row, column=8, value=serial.created_at.strftime('%Y-%m-%d %H:%M'))
-            ws.cell(row=row, column=9, value=serial.completed_at.strftime('%Y-%m-%d %H:%M') if serial.completed_at else '')
+        for row, serial in enumerate(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE), 2):
+            values = (
+                serial.serial_number,
+                serial.order_number,
+                serial.authorized_part.part_number,
+                serial.authorized_part.description,
+                serial.get_status_display(),
+                f"{serial.completion_percentage}%",
+                serial.created_by.get_full_name(),
+                serial.created_at.strftime('%Y-%m-%d %H:%M'),
+                serial.completed_at.strftime('%Y-%m-%d %H:%M') if serial.completed_at else '',
+            )
+            for col, value in enumerate(values):
+                ws.cell(row=row, column=col + 1, value=value)
+                col_max_len[col] = max(col_max_len[col], len(str(value)))
         
         # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save to response
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="numeros_serie_{timezone.now().strftime("%Y%m%d_%H%M")}.xlsx"'
+        for col, max_length in enumerate(col_max_len, 1):
+            ws.column_dimensions[get_column_letter(col)].width = min(max_length + 2, 50)
         
-        wb.save(response)
-        return response
+        wb.save(output)
     
     @staticmethod
-    def export_to_pdf(queryset):
-        """Export SerialNumber queryset to PDF"""
+    def write_pdf(queryset, output):
+        """Write the PDF report for a SerialNumber queryset to a file-like object"""
         
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        doc = SimpleDocTemplate(output, pagesize=A4)
         elements = []
         
         # Styles
@@ -99,19 +153,20 @@ class ExportUtils:
         elements.append(Spacer(1, 20))
         
         # Table data
-        data = [['Número de Serie', 'Orden', 'Componente', 'Estado', 'Progreso']]
-        
-        for serial in queryset:
-            data.append([
+        headers = ('Número de Serie', 'Orden', 'Componente', 'Estado', 'Progreso')
+        rows = (
+            (
                 serial.serial_number,
                 serial.order_number,
                 serial.authorized_part.part_number,
                 serial.get_status_display(),
                 f"{serial.completion_percentage}%"
-            ])
+            )
+            for serial in queryset.select_related('authorized_part').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
         
-        # Create table
-        table = Table(data)
+        # Create table (LongTable lays out page by page and repeats the header)
+        table = LongTable([headers, *rows], repeatRows=1)
         table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -127,13 +182,6 @@ class ExportUtils:
         
         # Build PDF
         doc.build(elements)
-        
-        # Return response
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="numeros_serie_{timezone.now().strftime("%Y%m%d_%H%M")}.pdf"'
-        
-        return response
 
 
 class NotificationService:
@@ -146,32 +194,36 @@ class NotificationService:
         from asgiref.sync import async_to_sync
         
         channel_layer = get_channel_layer()
-        
-        # Send to notifications group
-        async_to_sync(channel_layer.group_send)(
-            "notifications",
-            {
-                "type": "process_update",
-                "serial_number": serial_number,
-                "operation": operation,
-                "status": status,
-                "user": user,
-                "timestamp": str(timezone.now())
-            }
-        )
-        
-        # Send to dashboard group
-        async_to_sync(channel_layer.group_send)(
-            "dashboard",
-            {
-                "type": "dashboard_update",
-                "data": {
-                    "type": "process_update",
-                    "serial_number": serial_number,
-                    "timestamp": str(timezone.now())
-                }
-            }
-        )
+        timestamp = str(timezone.now())
+        
+        async def broadcast():
+            # Send to notifications and dashboard groups concurrently
+            await asyncio.gather(
+                channel_layer.group_send(
+                    "notifications",
+                    {
+                        "type": "process_update",
+                        "serial_number": serial_number,
+                        "operation": operation,
+                        "status": status,
+                        "user": user,
+                        "timestamp": timestamp
+                    }
+                ),
+                channel_layer.group_send(
+                    "dashboard",
+                    {
+                        "type": "dashboard_update",
+                        "data": {
+                            "type": "process_update",
+                            "serial_number": serial_number,
+                            "timestamp": timestamp
+                        }
+                    }
+                ),
+            )
+        
+        async_to_sync(broadcast)()
     
     @staticmethod
     def send_alert_notification(alert_type, message, priority="MEDIUM"):
@@ -3,34 +3,54 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.http import JsonResponse
-from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.core.cache import cache
+from django.db.models import (
+    Q, Count, Avg, Sum, F, ExpressionWrapper, DurationField, OuterRef, Subquery, Prefetch
+)
 from django.db.models.functions import TruncMonth, TruncDate
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 import json
+from collections import defaultdict
 
 from serials.models import SerialNumber, AuthorizedPart
+from serials.pagination import PkPaginator
+from serials.services import AuthorizedPartCache, SerialNumberFilter
 from operations.models import Operation, ProcessRecord
 from analytics.models import ProductionAlert
 from operators.models import UserProfile
+from operators.utils import load_json_body
 from .services import SerialNumberGenerator, SerialNumberValidator
 from .forms import SerialGenerationForm, LoginForm
 
 
+def _serial_status_counts():
+    """Serial totals per status in a single aggregate query"""
+    return SerialNumber.objects.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='COMPLETED')),
+        in_process=Count('id', filter=Q(status='IN_PROCESS')),
+        pending=Count('id', filter=Q(status='CREATED')),
+    )
+
+
 @login_required
 def dashboard(request):
     """Main dashboard view"""
     # Get recent serial numbers
     recent_serials = SerialNumber.objects.select_related(
-        'authorized_part', 'created_by'
-    ).order_by('-created_at')[:10]
+        'authorized_part'
+    ).only(
+        'serial_number', 'order_number', 'status', 'created_at',
+        'authorized_part__part_number', 'authorized_part__description'
+    ).with_completion().order_by('-created_at')[:10]
     
     # Get statistics
-    total_serials = SerialNumber.objects.count()
-    completed_serials = SerialNumber.objects.filter(status='COMPLETED').count()
-    in_process_serials = SerialNumber.objects.filter(status='IN_PROCESS').count()
-    pending_serials = SerialNumber.objects.filter(status='CREATED').count()
+    status_counts = _serial_status_counts()
+    total_serials = status_counts['total']
+    completed_serials = status_counts['completed']
+    in_process_serials = status_counts['in_process']
+    pending_serials = status_counts['pending']
     
     # Get active alerts
     active_alerts = ProductionAlert.objects.filter(
@@ -59,10 +79,12 @@ def generate_serial(request):
         if form.is_valid():
             try:
                 # Generate serial number
+                authorized_part = form.cleaned_data['authorized_part']
                 serial = SerialNumberGenerator.generate_serial_number(
                     order_number=form.cleaned_data['order_number'],
-                    part_number=form.cleaned_data['authorized_part'].part_number,
-                    created_by=request.user
+                    part_number=authorized_part.part_number,
+                    created_by=request.user,
+                    authorized_part_obj=authorized_part
                 )
                 
                 messages.success(
@@ -78,7 +100,7 @@ def generate_serial(request):
         form = SerialGenerationForm()
     
     # Get authorized parts for autocomplete
-    authorized_parts = AuthorizedPart.objects.filter(is_active=True).order_by('part_number')
+    authorized_parts = AuthorizedPartCache.get_active_parts()
     
     context = {
         'form': form,
@@ -96,7 +118,7 @@ def manufacturing_process(request, serial_number):
     # Get process records with operations
     process_records = ProcessRecord.objects.filter(
         serial_number=serial
-    ).select_related('operation', 'processed_by').order_by('operation__sequence_number')
+    ).select_related('operation', 'processed_by').order_by('operation_sequence')
     
     # Get current operation (next to be processed)
     current_operation = serial.current_operation
@@ -105,7 +127,7 @@ def manufacturing_process(request, serial_number):
         'serial': serial,
         'process_records': process_records,
         'current_operation': current_operation,
-        'can_approve': request.user.userprofile.can_approve_operations if hasattr(request.user, 'userprofile') else False
+        'can_approve': getattr(request.user_profile, 'can_approve_operations', False)
     }
     
     return render(request, 'manufacturing/manufacturing_process.html', context)
@@ -115,8 +137,7 @@ def manufacturing_process(request, serial_number):
 def summary_view(request):
     """Advanced summary view with FPY, cycle times, and detailed metrics - Admin/Supervisor only"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and 
-             request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
+            request.user_role in UserProfile.ELEVATED_ROLES):
         messages.error(request, 'No tienes permisos para acceder al resumen avanzado')
         return redirect('manufacturing:dashboard')
     
@@ -128,14 +149,7 @@ def summary_view(request):
     date_to = request.GET.get('date_to', '')
     
     # Build query
-    serials = SerialNumber.objects.select_related(
-        'authorized_part', 'created_by'
-    ).prefetch_related(
-        'process_records__operation',
-        'process_records__assigned_operator',
-        'process_records__processed_by',
-        'defects'
-    )
+    serials = SerialNumber.objects.all()
     
     if status_filter:
         serials = serials.filter(status=status_filter)
@@ -146,60 +160,97 @@ def summary_view(request):
     if order_filter:
         serials = serials.filter(order_number__icontains=order_filter)
     
-    if date_from:
-        serials = serials.filter(created_at__date__gte=date_from)
-    
-    if date_to:
-        serials = serials.filter(created_at__date__lte=date_to)
+    try:
+        serials = serials.filter(SerialNumberFilter.created_range(date_from, date_to))
+    except ValueError:
+        messages.error(request, 'Formato de fecha inválido, usa AAAA-MM-DD.')
+    
+    # Status breakdown in a single query over the filtered serials
+    status_counts = serials.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='COMPLETED')),
+        in_process=Count('id', filter=Q(status='IN_PROCESS')),
+        pending=Count('id', filter=Q(status='CREATED')),
+        failed=Count('id', filter=Q(status='FAILED')),
+    )
     
-    # Order by creation date (newest first)
-    serials = serials.order_by('-created_at')
+    # Per-serial metrics are annotated so the detail loop below does not
+    # hit the database for every row
+    cycle_time_total = ProcessRecord.objects.filter(
+        serial_number=OuterRef('pk'),
+        status='APPROVED',
+        started_at__isnull=False,
+        completed_at__isnull=False
+    ).order_by().values('serial_number').annotate(
+        total=Sum(ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField()))
+    ).values('total')
+    
+    detailed_queryset = serials.select_related(
+        'authorized_part', 'created_by'
+    ).annotate(
+        completed_ops=Count('process_records', filter=Q(process_records__status='APPROVED'), distinct=True),
+        active_defects=Count('defects', filter=Q(defects__status__in=['OPEN', 'IN_REPAIR']), distinct=True),
+        # Subquery instead of a joined Sum: the defects join would multiply the durations
+        total_cycle=Subquery(cycle_time_total, output_field=DurationField()),
+    ).prefetch_related(
+        Prefetch(
+            'process_records',
+            queryset=ProcessRecord.objects.filter(
+                status__in=['PENDING', 'IN_PROGRESS']
+            ).select_related(
+                'operation', 'assigned_operator__userprofile'
+            ).order_by('operation_sequence'),
+            to_attr='pending_processes'
+        )
+    ).order_by('-created_at')  # Newest first
     
     # Calculate overall FPY (First Pass Yield)
-    total_processes = ProcessRecord.objects.filter(status__in=['APPROVED', 'REJECTED']).count()
-    first_pass_processes = ProcessRecord.objects.filter(status='APPROVED').count()
+    process_counts = ProcessRecord.objects.aggregate(
+        total=Count('id', filter=Q(status__in=['APPROVED', 'REJECTED'])),
+        first_pass=Count('id', filter=Q(status='APPROVED')),
+    )
+    total_processes = process_counts['total']
+    first_pass_processes = process_counts['first_pass']
     overall_fpy = round((first_pass_processes / total_processes * 100) if total_processes > 0 else 0, 1)
     
-    # Calculate FPY by operation
+    # Calculate FPY by operation with a single grouped query
     operations = Operation.objects.all().order_by('sequence_number')
-    operation_metrics = []
+    approved_with_times = Q(
+        status='APPROVED',
+        started_at__isnull=False,
+        completed_at__isnull=False
+    )
+    metrics_by_operation = {
+        row['operation_id']: row
+        for row in ProcessRecord.objects.order_by().values('operation_id').annotate(
+            total=Count('id', filter=Q(status__in=['APPROVED', 'REJECTED'])),
+            first_pass=Count('id', filter=Q(status='APPROVED')),
+            avg_cycle=Avg(
+                ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField()),
+                filter=approved_with_times
+            ),
+            available=Count('id', filter=Q(status='PENDING', assigned_operator__isnull=True)),
+        )
+    }
     
+    # Get current operator assignments for all operations at once
+    assignments_by_operation = defaultdict(list)
+    for assignment in ProcessRecord.objects.filter(
+        status='IN_PROGRESS',
+        assigned_operator__isnull=False
+    ).select_related('assigned_operator', 'serial_number'):
+        assignments_by_operation[assignment.operation_id].append(assignment)
+    
+    operation_metrics = []
     for operation in operations:
-        op_total = ProcessRecord.objects.filter(
-            operation=operation, 
-            status__in=['APPROVED', 'REJECTED']
-        ).count()
-        op_first_pass = ProcessRecord.objects.filter(
-            operation=operation, 
-            status='APPROVED'
-        ).count()
+        metrics = metrics_by_operation.get(operation.id, {})
+        op_total = metrics.get('total', 0)
+        op_first_pass = metrics.get('first_pass', 0)
         op_fpy = round((op_first_pass / op_total * 100) if op_total > 0 else 0, 1)
         
-        # Calculate average cycle time for this operation
-        completed_records = ProcessRecord.objects.filter(
-            operation=operation,
-            status='APPROVED',
-            started_at__isnull=False,
-            completed_at__isnull=False
-        )
-        
-        avg_cycle_time = None
-        if completed_records.exists():
-            cycle_times = []
-            for record in completed_records:
-                if record.started_at and record.completed_at:
-                    cycle_time = (record.completed_at - record.started_at).total_seconds() / 60  # minutes
-                    cycle_times.append(cycle_time)
-            
-            if cycle_times:
-                avg_cycle_time = round(sum(cycle_times) / len(cycle_times), 1)
-        
-        # Get current operator assignments
-        current_assignments = ProcessRecord.objects.filter(
-            operation=operation,
-            status='IN_PROGRESS',
-            assigned_operator__isnull=False
-        ).select_related('assigned_operator', 'serial_number')
+        # Average cycle time in minutes
+        avg_cycle = metrics.get('avg_cycle')
+        avg_cycle_time = round(avg_cycle.total_seconds() / 60, 1) if avg_cycle is not None else None
         
         operation_metrics.append({
             'operation': operation,
@@ -207,65 +258,46 @@ def summary_view(request):
             'first_pass_count': op_first_pass,
             'fpy': op_fpy,
             'avg_cycle_time': avg_cycle_time,
-            'current_assignments': current_assignments,
-            'available_count': ProcessRecord.objects.filter(
-                operation=operation,
-                status='PENDING',
-                assigned_operator__isnull=True
-            ).count()
+            'current_assignments': assignments_by_operation[operation.id],
+            'available_count': metrics.get('available', 0)
         })
     
+    # Pagination first, so detail rows are only built for the visible page:
+    # the OFFSET runs over the plain filtered serials and the annotated
+    # queryset only loads the page's rows. The total is already known from
+    # the status breakdown.
+    paginator = PkPaginator(serials.order_by('-created_at'), 25, row_queryset=detailed_queryset)
+    paginator.count = status_counts['total']
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    total_operations = Operation.active_count()
     detailed_serials = []
-    for serial in serials:
+    for serial in page_obj.object_list:
         # Get current operation (next pending or in progress)
-        current_process = serial.process_records.filter(
-            status__in=['PENDING', 'IN_PROGRESS']
-        ).order_by('operation__sequence_number').first()
+        current_process = serial.pending_processes[0] if serial.pending_processes else None
         
         # Calculate completion percentage
-        total_operations = serial.process_records.count()
-        completed_operations = serial.process_records.filter(status='APPROVED').count()
-        completion_percentage = round((completed_operations / total_operations * 100) if total_operations > 0 else 0, 1)
+        completion_percentage = round((serial.completed_ops / total_operations * 100) if total_operations > 0 else 0, 1)
         
-        # Get defects count
-        defects_count = serial.defects.filter(status__in=['OPEN', 'IN_REPAIR']).count()
-        
-        # Calculate total cycle time for completed operations
-        total_cycle_time = 0
-        completed_processes = serial.process_records.filter(
-            status='APPROVED',
-            started_at__isnull=False,
-            completed_at__isnull=False
-        )
-        
-        for process in completed_processes:
-            if process.started_at and process.completed_at:
-                cycle_time = (process.completed_at - process.started_at).total_seconds() / 60
-                total_cycle_time += cycle_time
+        # Total cycle time for completed operations, in minutes
+        total_cycle_time = serial.total_cycle.total_seconds() / 60 if serial.total_cycle else 0
         
         detailed_serials.append({
             'serial': serial,
             'current_process': current_process,
             'completion_percentage': completion_percentage,
-            'defects_count': defects_count,
+            'defects_count': serial.active_defects,
             'total_cycle_time': round(total_cycle_time, 1) if total_cycle_time > 0 else None,
-            'all_processes': serial.process_records.all().order_by('operation__sequence_number')
+            'all_processes': serial.process_records.all().order_by('operation_sequence')
         })
-    
-    # Pagination
-    paginator = Paginator(detailed_serials, 25)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj.object_list = detailed_serials
     
     # Get filter options
     status_choices = SerialNumber.STATUS_CHOICES
     authorized_parts = AuthorizedPart.objects.filter(is_active=True).order_by('part_number')
     
-    total_serials_count = serials.count()
-    completed_count = serials.filter(status='COMPLETED').count()
-    in_process_count = serials.filter(status='IN_PROCESS').count()
-    pending_count = serials.filter(status='CREATED').count()
-    failed_count = serials.filter(status='FAILED').count()
+    total_serials_count = status_counts['total']
     
     context = {
         'page_obj': page_obj,
@@ -282,11 +314,11 @@ def summary_view(request):
         'operation_metrics': operation_metrics,
         'summary_stats': {
             'total_serials': total_serials_count,
-            'completed': completed_count,
-            'in_process': in_process_count,
-            'pending': pending_count,
-            'failed': failed_count,
-            'completion_rate': round((completed_count / total_serials_count * 100) if total_serials_count > 0 else 0, 1)
+            'completed': status_counts['completed'],
+            'in_process': status_counts['in_process'],
+            'pending': status_counts['pending'],
+            'failed': status_counts['failed'],
+            'completion_rate': round((status_counts['completed'] / total_serials_count * 100) if total_serials_count > 0 else 0, 1)
         }
     }
     
@@ -297,7 +329,7 @@ def summary_view(request):
 def admin_panel(request):
     """Admin panel for managing operations, users, and serial numbers"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.can_manage_users)):
+            getattr(request.user_profile, 'can_manage_users', False)):
         messages.error(request, 'No tienes permisos para acceder al panel de administración')
         return redirect('manufacturing:dashboard')
     
@@ -321,40 +353,36 @@ def admin_panel(request):
 def statistics_view(request):
     """Statistics and charts view"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.can_view_statistics)):
+            getattr(request.user_profile, 'can_view_statistics', False)):
         messages.error(request, 'No tienes permisos para ver las estadísticas')
         return redirect('manufacturing:dashboard')
     
-    from datetime import datetime, timedelta
+    from datetime import timedelta
+    from django.utils import timezone
     
     # Basic statistics
-    total_serials = SerialNumber.objects.count()
-    completed_serials = SerialNumber.objects.filter(status='COMPLETED').count()
-    in_process_serials = SerialNumber.objects.filter(status='IN_PROCESS').count()
-    pending_serials = SerialNumber.objects.filter(status='CREATED').count()
+    status_counts = _serial_status_counts()
+    total_serials = status_counts['total']
+    completed_serials = status_counts['completed']
+    in_process_serials = status_counts['in_process']
+    pending_serials = status_counts['pending']
     completion_rate = round((completed_serials / total_serials * 100) if total_serials > 0 else 0, 1)
     
-    # Operations statistics
-    operations = Operation.objects.all().order_by('sequence_number')
+    # Operations statistics, counted per operation in a single grouped query
+    operations = Operation.objects.only('id', 'name', 'sequence_number').order_by('sequence_number')
+    stats_by_operation = {
+        row['operation_id']: row
+        for row in ProcessRecord.objects.order_by().values('operation_id').annotate(
+            completed=Count('id', filter=Q(status='COMPLETED')),
+            pending=Count('id', filter=Q(status__in=['PENDING', 'IN_PROCESS'])),
+        )
+    }
     operations_labels = [op.name for op in operations]
-    operations_completed = []
-    operations_pending = []
-    
-    for operation in operations:
-        completed_count = ProcessRecord.objects.filter(
-            operation=operation, 
-            status='COMPLETED'
-        ).count()
-        pending_count = ProcessRecord.objects.filter(
-            operation=operation, 
-            status__in=['PENDING', 'IN_PROCESS']
-        ).count()
-        
-        operations_completed.append(completed_count)
-        operations_pending.append(pending_count)
+    operations_completed = [stats_by_operation.get(op.id, {}).get('completed', 0) for op in operations]
+    operations_pending = [stats_by_operation.get(op.id, {}).get('pending', 0) for op in operations]
     
-    # Production by day (last 30 days)
-    end_date = datetime.now().date()
+    # Production by day (last 30 days), in local dates to match TruncDate
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=30)
     
     daily_production = SerialNumber.objects.filter(
@@ -367,15 +395,10 @@ def statistics_view(request):
     ).order_by('date')
     
     # Fill missing dates with 0
-    production_dates = []
-    production_counts = []
-    current_date = start_date
     production_dict = {item['date']: item['count'] for item in daily_production}
-    
-    while current_date <= end_date:
-        production_dates.append(current_date.strftime('%d/%m'))
-        production_counts.append(production_dict.get(current_date, 0))
-        current_date += timedelta(days=1)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    production_dates = [day.strftime('%d/%m') for day in days]
+    production_counts = [production_dict.get(day, 0) for day in days]
     
     # Active alerts
     alerts = ProductionAlert.objects.filter(
@@ -437,22 +460,16 @@ def logout_view(request):
 @require_http_methods(["GET"])
 def get_authorized_parts(request):
     """AJAX endpoint to get authorized parts for autocomplete"""
-    query = request.GET.get('q', '')
+    query = request.GET.get('q', '').strip()
     
-    parts = AuthorizedPart.objects.filter(
-        is_active=True,
-        part_number__icontains=query
-    ).order_by('part_number')[:10]
+    # An empty box would match every part
+    if not query:
+        return JsonResponse({'parts': []})
     
-    data = [
-        {
-            'id': part.id,
-            'part_number': part.part_number,
-            'description': part.description,
-            'revision': part.revision
-        }
-        for part in parts
-    ]
+    data = list(AuthorizedPart.objects.filter(
+        is_active=True,
+        part_number__istartswith=query
+    ).order_by('part_number').values('id', 'part_number', 'description', 'revision')[:10])
     
     return JsonResponse({'parts': data})
 
@@ -461,7 +478,7 @@ def get_authorized_parts(request):
 @require_http_methods(["POST"])
 def validate_order_number(request):
     """AJAX endpoint to validate order number"""
-    data = json.loads(request.body)
+    data = load_json_body(request)
     order_number = data.get('order_number', '')
     
     try:
@@ -484,10 +501,12 @@ def validate_order_number(request):
 @require_http_methods(["GET"])
 def api_statistics(request):
     """API endpoint for statistics data"""
-    total_serials = SerialNumber.objects.count()
-    completed_serials = SerialNumber.objects.filter(status='COMPLETED').count()
-    in_process_serials = SerialNumber.objects.filter(status='IN_PROCESS').count()
-    pending_serials = SerialNumber.objects.filter(status='CREATED').count()
+    # Dashboards poll this endpoint; a short TTL serves repeated polls from cache
+    status_counts = cache.get_or_set('manufacturing:serial_status_counts', _serial_status_counts, 15)
+    total_serials = status_counts['total']
+    completed_serials = status_counts['completed']
+    in_process_serials = status_counts['in_process']
+    pending_serials = status_counts['pending']
     completion_rate = round((completed_serials / total_serials * 100) if total_serials > 0 else 0, 1)
     
     return JsonResponse({
@@ -503,36 +522,47 @@ def api_statistics(request):
 @require_http_methods(["GET"])
 def api_dashboard_data(request):
     """API endpoint for dashboard real-time data"""
-    # Recent serial numbers
-    recent_serials = SerialNumber.objects.select_related(
-        'authorized_part', 'created_by'
+    # Recent serial numbers, with progress counted in the same query
+    recent_serials = SerialNumber.objects.values(
+        'serial_number', 'order_number', 'status', 'created_at',
+        'authorized_part__part_number'
+    ).annotate(
+        done_ops=Count('process_records', filter=Q(process_records__status='APPROVED')),
     ).order_by('-created_at')[:10]
     
     # Active alerts
     active_alerts = ProductionAlert.objects.filter(
         is_active=True, 
         is_resolved=False
+    ).values(
+        'alert_type', 'message', 'priority', 'created_at'
     ).order_by('-priority', '-created_at')[:5]
     
-    serials_data = []
-    for serial in recent_serials:
-        serials_data.append({
-            'serial_number': serial.serial_number,
-            'order_number': serial.order_number,
-            'part_number': serial.authorized_part.part_number,
-            'status': serial.get_status_display(),
-            'created_at': serial.created_at.strftime('%d/%m/%Y %H:%M'),
-            'progress': serial.get_completion_percentage(),
-        })
+    status_display = dict(SerialNumber.STATUS_CHOICES)
+    total_operations = Operation.active_count()
+    serials_data = [
+        {
+            'serial_number': serial['serial_number'],
+            'order_number': serial['order_number'],
+            'part_number': serial['authorized_part__part_number'],
+            'status': status_display.get(serial['status'], serial['status']),
+            'created_at': serial['created_at'].strftime('%d/%m/%Y %H:%M'),
+            'progress': round(serial['done_ops'] / total_operations * 100, 2) if total_operations else 0,
+        }
+        for serial in recent_serials
+    ]
     
-    alerts_data = []
-    for alert in active_alerts:
-        alerts_data.append({
-            'type': alert.get_alert_type_display(),
-            'message': alert.message,
-            'priority': alert.get_priority_display(),
-            'created_at': alert.created_at.strftime('%d/%m/%Y %H:%M'),
-        })
+    alert_type_display = dict(ProductionAlert.ALERT_TYPES)
+    priority_display = dict(ProductionAlert.PRIORITY_CHOICES)
+    alerts_data = [
+        {
+            'type': alert_type_display.get(alert['alert_type'], alert['alert_type']),
+            'message': alert['message'],
+            'priority': priority_display.get(alert['priority'], alert['priority']),
+            'created_at': alert['created_at'].strftime('%d/%m/%Y %H:%M'),
+        }
+        for alert in active_alerts
+    ]
     
     return JsonResponse({
         'recent_serials': serials_data,
@@ -3,8 +3,13 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Q, Count
-from .models import Defect, SerialNumber, Operation, ProcessRecord
+from django.db.models import Q, Count, Exists, OuterRef, Prefetch, Value
+from django.db.models.functions import Concat
+from defects.models import Defect
+from serials.models import SerialNumber
+from operations.models import Operation, ProcessRecord
+from operators.models import UserProfile
+from operators.services import AvailableOperationsCache
 from .decorators import supervisor_or_admin_required
 from django.views.decorators.http import require_http_methods
 import json
@@ -16,25 +21,45 @@ def defects_dashboard(request):
     """Dashboard principal de defectos para supervisores y administradores"""
     
     # Estadísticas generales
-    total_defects = Defect.objects.count()
-    open_defects = Defect.objects.filter(status='OPEN').count()
-    in_repair_defects = Defect.objects.filter(status='IN_REPAIR').count()
-    resolved_defects = Defect.objects.filter(status__in=['REPAIRED', 'SCRAPPED']).count()
+    base = Defect.objects.order_by()
+    stats = base.aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q(status='OPEN')),
+        in_repair=Count('id', filter=Q(status='IN_REPAIR')),
+        resolved=Count('id', filter=Q(status__in=['REPAIRED', 'SCRAPPED'])),
+    )
+    total_defects = stats['total']
+    open_defects = stats['open']
+    in_repair_defects = stats['in_repair']
+    resolved_defects = stats['resolved']
     
     # Defectos por tipo
-    defects_by_type = Defect.objects.values('defect_type').annotate(
+    defects_by_type = list(base.values('defect_type').annotate(
         count=Count('id')
-    ).order_by('-count')
+    ).order_by('-count'))
     
     # Defectos recientes
-    recent_defects = Defect.objects.select_related(
-        'serial_number', 'operation', 'reported_by'
+    recent_defects = base.select_related(
+        'serial_number__authorized_part', 'operation', 'reported_by'
     ).order_by('-created_at')[:10]
     
     # Números de serie con defectos activos
+    # Exists en lugar de JOIN + DISTINCT sobre la tabla de defectos
+    open_defect = Defect.objects.filter(
+        serial_number=OuterRef('pk'),
+        status__in=['OPEN', 'IN_REPAIR']
+    )
     defective_serials = SerialNumber.objects.filter(
-        defects__status__in=['OPEN', 'IN_REPAIR']
-    ).distinct().select_related('authorized_part')
+        Exists(open_defect)
+    ).select_related('authorized_part').prefetch_related(
+        Prefetch(
+            'defects',
+            queryset=Defect.objects.filter(
+                status__in=['OPEN', 'IN_REPAIR']
+            ).select_related('operation', 'assigned_repairer'),
+            to_attr='active_defects'
+        )
+    )
     
     context = {
         'total_defects': total_defects,
@@ -54,7 +79,7 @@ def repairer_dashboard(request):
     """Dashboard específico para reparadores"""
     
     # Verificar que el usuario sea reparador
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.role != 'REPAIRER':
+    if request.user_role != 'REPAIRER':
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('manufacturing:dashboard')
     
@@ -89,7 +114,7 @@ def repairer_dashboard(request):
 def assign_defect(request):
     """Asignar defecto a reparador"""
     
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.role != 'REPAIRER':
+    if request.user_role != 'REPAIRER':
         return JsonResponse({'success': False, 'error': 'Sin permisos'})
     
     try:
@@ -119,7 +144,7 @@ def assign_defect(request):
 def resolve_defect(request):
     """Resolver defecto (reparar o desechar)"""
     
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.role != 'REPAIRER':
+    if request.user_role != 'REPAIRER':
         return JsonResponse({'success': False, 'error': 'Sin permisos'})
     
     try:
@@ -135,31 +160,41 @@ def resolve_defect(request):
         defect.status = resolution
         defect.repair_notes = repair_notes
         defect.resolved_by = request.user
-        defect.resolved_at = timezone.now()
+        now = timezone.now()
+        defect.resolved_at = now
         
         if resolution == 'REPAIRED' and return_to_operation_id:
             operation = get_object_or_404(Operation, id=return_to_operation_id)
             defect.return_to_operation = operation
             
-            # Actualizar estado del número de serie
             serial = defect.serial_number
-            serial.status = 'IN_PROCESS'
-            serial.save()
             
-            # Crear o actualizar ProcessRecord para la operación de retorno
-            process_record, created = ProcessRecord.objects.get_or_create(
+            # Reabrir el ProcessRecord de la operación de retorno con un solo
+            # UPDATE, creándolo si no existe
+            updated = ProcessRecord.objects.filter(
                 serial_number=serial,
-                operation=operation,
-                defaults={
-                    'status': 'PENDING',
-                    'notes': f'Regresado después de reparación de defecto: {defect.description}'
-                }
+                operation=operation
+            ).update(
+                status='PENDING',
+                notes=Concat('notes', Value(f'\nRegresado después de reparación: {defect.description}')),
+                updated_at=now
             )
+            AvailableOperationsCache.invalidate()
             
-            if not created:
-                process_record.status = 'PENDING'
-                process_record.notes += f'\nRegresado después de reparación: {defect.description}'
-                process_record.save()
+            if updated:
+                # update() omite la señal post_save: sincronizar el estado del número de serie aquí
+                has_approved = serial.process_records.filter(status='APPROVED').exists()
+                serial.status = 'IN_PROCESS' if has_approved else 'CREATED'
+                serial.save(update_fields=['status', 'updated_at'])
+            else:
+                serial.status = 'IN_PROCESS'
+                serial.save()
+                ProcessRecord.objects.create(
+                    serial_number=serial,
+                    operation=operation,
+                    status='PENDING',
+                    notes=f'Regresado después de reparación de defecto: {defect.description}'
+                )
                 
         elif resolution == 'SCRAPPED':
             # Marcar número de serie como desechado
@@ -182,9 +217,9 @@ def defect_detail(request, defect_id):
     defect = get_object_or_404(Defect, id=defect_id)
     
     # Verificar permisos
-    user_role = getattr(request.user.userprofile, 'role', None) if hasattr(request.user, 'userprofile') else None
+    user_role = request.user_role
     
-    if user_role not in ['SUPERVISOR', 'ADMIN', 'REPAIRER']:
+    if user_role not in UserProfile.DEFECT_ROLES:
         messages.error(request, 'No tienes permisos para ver este defecto.')
         return redirect('manufacturing:dashboard')
     
@@ -1,16 +1,19 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery, Window
 from django.views.decorators.http import require_POST
 from django.contrib.auth.models import User
 from operations.models import ProcessRecord, Operation
 from serials.models import SerialNumber
 from defects.models import Defect
+from operators.models import UserProfile
+from operators.decorators import json_body, json_errors
+from operators.services import AvailableOperationsCache
 from .decorators import operator_required, supervisor_or_admin_required
-import json
 
 
 @login_required
@@ -18,7 +21,7 @@ import json
 def operator_dashboard(request):
     """Dashboard principal para operadores"""
     user = request.user
-    user_role = user.userprofile.role
+    user_role = request.user_role
     
     # Operación actualmente asignada
     current_assignment = ProcessRecord.objects.filter(
@@ -31,27 +34,29 @@ def operator_dashboard(request):
             status='PENDING',
             assigned_operator__isnull=True
         ).select_related('serial_number', 'operation', 'serial_number__authorized_part').order_by(
-            'operation__sequence_number', 'created_at'
+            'operation_sequence', 'created_at'
         )[:10]
     else:
         # Supervisores y admin ven todas las operaciones
         available_operations = ProcessRecord.objects.filter(
             status__in=['PENDING', 'IN_PROGRESS']
         ).select_related('serial_number', 'operation', 'serial_number__authorized_part', 'assigned_operator').order_by(
-            'operation__sequence_number', 'created_at'
+            'operation_sequence', 'created_at'
         )[:10]
     
     # Historial de operaciones completadas por el operador
-    completed_operations = ProcessRecord.objects.filter(
-        processed_by=user,
-        status='APPROVED'
-    ).select_related('serial_number', 'operation').order_by('-completed_at')[:5]
+    # (el total se calcula en la misma consulta con una ventana sobre todas las filas)
+    completed_operations = list(
+        ProcessRecord.objects.filter(
+            processed_by=user,
+            status='APPROVED'
+        ).annotate(
+            total_completed=Window(Count('id'))
+        ).select_related('serial_number', 'operation').order_by('-completed_at')[:5]
+    )
     
     # Estadísticas del operador
-    total_completed = ProcessRecord.objects.filter(
-        processed_by=user,
-        status='APPROVED'
-    ).count()
+    total_completed = completed_operations[0].total_completed if completed_operations else 0
     
     context = {
         'current_assignment': current_assignment,
@@ -69,7 +74,7 @@ def operator_dashboard(request):
 def operation_work_view(request, process_record_id):
     """Vista de trabajo para una operación específica con selección de números de serie"""
     process_record = get_object_or_404(
-        ProcessRecord, 
+        ProcessRecord.objects.select_related('operation'),
         id=process_record_id,
         assigned_operator=request.user,
         status='IN_PROGRESS'
@@ -79,28 +84,28 @@ def operation_work_view(request, process_record_id):
     # Solo números de serie que están en la operación correcta según la secuencia
     operation = process_record.operation
     
-    # Números de serie que están listos para esta operación
-    available_serials = SerialNumber.objects.filter(
-        status__in=['IN_PROCESS', 'CREATED'],
-        process_records__operation__sequence_number__lt=operation.sequence_number,
-        process_records__status='APPROVED'
-    ).exclude(
-        # Excluir los que ya tienen esta operación completada
-        process_records__operation=operation,
-        process_records__status__in=['APPROVED', 'IN_PROGRESS']
-    ).exclude(
-        # Excluir los que tienen defectos abiertos
-        defects__status__in=['OPEN', 'IN_REPAIR']
-    ).distinct().select_related('authorized_part')
+    # Excluir los que ya tienen esta operación completada o en progreso
+    already_here = ProcessRecord.objects.filter(
+        serial_number=OuterRef('pk'),
+        operation=operation,
+        status__in=['APPROVED', 'IN_PROGRESS']
+    )
     
-    # Si es la primera operación, incluir números de serie recién creados
+    # Números de serie que están listos para esta operación (la operación
+    # aprobada más alta es anterior) y sin defectos abiertos
     if operation.sequence_number == 1:
-        first_op_serials = SerialNumber.objects.filter(
-            status='CREATED'
-        ).exclude(
-            defects__status__in=['OPEN', 'IN_REPAIR']
-        ).select_related('authorized_part')
-        available_serials = available_serials.union(first_op_serials)
+        # Ninguna operación es anterior a la primera: solo aplica la rama de recién creados
+        available_q = Q(status='CREATED')
+    else:
+        available_q = Q(
+            status__in=['IN_PROCESS', 'CREATED'],
+            current_sequence_completed__gt=0,
+            current_sequence_completed__lt=operation.sequence_number
+        )
+    
+    available_serials = SerialNumber.objects.filter(
+        available_q, ~Exists(already_here), has_open_defect=False
+    ).select_related('authorized_part').order_by('serial_number')
     
     context = {
         'process_record': process_record,
@@ -114,316 +119,314 @@ def operation_work_view(request, process_record_id):
 @login_required
 @operator_required
 @require_POST
+@json_errors('Error al asignar operación')
+@json_body(process_record_id=int, target_user_id=(int, None))
 def assign_operation(request):
     """Asignar una operación al operador actual o a otro operador (solo supervisores/admin)"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        target_user_id = data.get('target_user_id')  # Para supervisores/admin
+    process_record_id = request.json['process_record_id']
+    target_user_id = request.json['target_user_id']  # Para supervisores/admin
+    
+    user_role = request.user_role
+    
+    with transaction.atomic():
+        # Bloquear la fila: una asignación concurrente espera a que
+        # esta transacción termine y luego ve el operador asignado
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_for_update(), id=process_record_id
+        )
         
-        user_role = request.user.userprofile.role
+        if process_record.assigned_operator_id is not None:
+            return JsonResponse({
+                'success': False,
+                'message': 'Esta operación ya está asignada a otro operador.'
+            })
         
-        with transaction.atomic():
-            process_record = get_object_or_404(ProcessRecord, id=process_record_id)
-            
-            if process_record.assigned_operator is not None:
+        if target_user_id and user_role in UserProfile.ELEVATED_ROLES:
+            # Supervisores/admin pueden asignar a cualquier operador
+            target_user = get_object_or_404(User.objects.select_related('userprofile'), id=target_user_id)
+            # userprofile comes from the select_related JOIN (None if missing)
+            target_user_profile = getattr(target_user, 'userprofile', None)
+            if target_user_profile is None or target_user_profile.role not in UserProfile.FLOOR_ROLES:
                 return JsonResponse({
                     'success': False,
-                    'message': 'Esta operación ya está asignada a otro operador.'
+                    'message': 'El usuario seleccionado no es un operador válido.'
                 })
-            
-            if target_user_id and user_role in ['SUPERVISOR', 'ADMIN']:
-                # Supervisores/admin pueden asignar a cualquier operador
-                target_user = get_object_or_404(User, id=target_user_id)
-                if not hasattr(target_user, 'userprofile') or target_user.userprofile.role not in ['OPERATOR', 'SUPERVISOR', 'ADMIN']:
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'El usuario seleccionado no es un operador válido.'
-                    })
-            else:
-                # Operadores solo se pueden asignar a sí mismos
-                target_user = request.user
-            
-            existing_assignment = ProcessRecord.objects.filter(
-                assigned_operator=target_user, 
-                status='IN_PROGRESS'
-            ).first()
-            
-            if existing_assignment:
-                operator_name = target_user.get_full_name() or target_user.username
-                return JsonResponse({
-                    'success': False,
-                    'message': f'{operator_name} ya tiene una operación en progreso: {existing_assignment.operation.name}. Debe completarla o liberarla primero.'
-                })
-            
-            process_record.refresh_from_db()
-            if process_record.assigned_operator is not None:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Esta operación fue asignada a otro operador mientras procesabas la solicitud.'
-                })
-            
-            # Asignar la operación
-            process_record.assigned_operator = target_user
-            process_record.status = 'IN_PROGRESS'
-            process_record.started_at = timezone.now()
-            process_record.assigned_at = timezone.now()
-            process_record.save()
-            
-            # Actualizar estado del número de serie
-            if process_record.serial_number.status == 'CREATED':
-                process_record.serial_number.status = 'IN_PROCESS'
-                process_record.serial_number.save()
-            
+        else:
+            # Operadores solo se pueden asignar a sí mismos
+            target_user = request.user
+        
+        conflict_qs = ProcessRecord.objects.filter(
+            assigned_operator=target_user, 
+            status='IN_PROGRESS'
+        )
+        
+        existing_assignment = conflict_qs.select_related('operation').only('operation__name').first()
+        if existing_assignment is not None:
             operator_name = target_user.get_full_name() or target_user.username
             return JsonResponse({
-                'success': True,
-                'message': f'Operación {process_record.operation.name} asignada exitosamente a {operator_name}.'
+                'success': False,
+                'message': f'{operator_name} ya tiene una operación en progreso: {existing_assignment.operation.name}. Debe completarla o liberarla primero.'
             })
-            
-    except Exception as e:
+        
+        # Asignar la operación
+        now = timezone.now()
+        ProcessRecord.objects.filter(pk=process_record.pk).update(
+            assigned_operator=target_user,
+            status='IN_PROGRESS',
+            started_at=now,
+            assigned_at=now,
+            updated_at=now
+        )
+        AvailableOperationsCache.invalidate()
+        
+        # Actualizar estado del número de serie
+        serial_number = process_record.serial_number
+        if serial_number.status == 'CREATED':
+            serial_number.status = 'IN_PROCESS'
+            serial_number.save(update_fields=['status', 'updated_at'])
+        
+        operator_name = target_user.get_full_name() or target_user.username
         return JsonResponse({
-            'success': False,
-            'message': f'Error al asignar operación: {str(e)}'
+            'success': True,
+            'message': f'Operación {process_record.operation.name} asignada exitosamente a {operator_name}.'
         })
 
 
 @login_required
 @supervisor_or_admin_required
 @require_POST
+@json_errors('Error al reasignar operación')
+@json_body(process_record_id=int, new_operator_id=(int, None))
 def reassign_operation(request):
     """Reasignar una operación a otro operador (solo supervisores/admin)"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        new_operator_id = data.get('new_operator_id')
+    process_record_id = request.json['process_record_id']
+    new_operator_id = request.json['new_operator_id']
+    
+    with transaction.atomic():
+        process_record = get_object_or_404(ProcessRecord, id=process_record_id)
         
-        with transaction.atomic():
-            process_record = get_object_or_404(ProcessRecord, id=process_record_id)
-            
-            if new_operator_id:
-                new_operator = get_object_or_404(User, id=new_operator_id)
-                if not hasattr(new_operator, 'userprofile') or new_operator.userprofile.role not in ['OPERATOR', 'SUPERVISOR', 'ADMIN']:
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'El usuario seleccionado no es un operador válido.'
-                    })
-                
-                existing_assignment = ProcessRecord.objects.filter(
-                    assigned_operator=new_operator, 
-                    status='IN_PROGRESS'
-                ).exclude(id=process_record_id).first()
-                
-                if existing_assignment:
-                    operator_name = new_operator.get_full_name() or new_operator.username
-                    return JsonResponse({
-                        'success': False,
-                        'message': f'{operator_name} ya tiene una operación en progreso: {existing_assignment.operation.name}.'
-                    })
-                
-                process_record.assigned_operator = new_operator
-                process_record.assigned_at = timezone.now()
-                operator_name = new_operator.get_full_name() or new_operator.username
-                message = f'Operación reasignada exitosamente a {operator_name}.'
-            else:
-                # Liberar la operación
-                process_record.assigned_operator = None
-                process_record.status = 'PENDING'
-                process_record.started_at = None
-                process_record.assigned_at = None
-                message = 'Operación liberada correctamente.'
+        now = timezone.now()
+        if new_operator_id:
+            new_operator = get_object_or_404(User.objects.select_related('userprofile'), id=new_operator_id)
+            # userprofile comes from the select_related JOIN (None if missing)
+            new_operator_profile = getattr(new_operator, 'userprofile', None)
+            if new_operator_profile is None or new_operator_profile.role not in UserProfile.FLOOR_ROLES:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'El usuario seleccionado no es un operador válido.'
+                })
             
-            process_record.save()
+            conflict_qs = ProcessRecord.objects.filter(
+                assigned_operator=new_operator, 
+                status='IN_PROGRESS'
+            ).exclude(id=process_record_id)
             
-            return JsonResponse({
-                'success': True,
-                'message': message
-            })
+            existing_assignment = conflict_qs.select_related('operation').only('operation__name').first()
+            if existing_assignment is not None:
+                operator_name = new_operator.get_full_name() or new_operator.username
+                return JsonResponse({
+                    'success': False,
+                    'message': f'{operator_name} ya tiene una operación en progreso: {existing_assignment.operation.name}.'
+                })
             
-    except Exception as e:
+            changes = {
+                'assigned_operator': new_operator,
+                'assigned_at': now,
+            }
+            operator_name = new_operator.get_full_name() or new_operator.username
+            message = f'Operación reasignada exitosamente a {operator_name}.'
+        else:
+            # Liberar la operación
+            changes = {
+                'assigned_operator': None,
+                'status': 'PENDING',
+                'started_at': None,
+                'assigned_at': None,
+            }
+            message = 'Operación liberada correctamente.'
+        
+        ProcessRecord.objects.filter(pk=process_record.pk).update(updated_at=now, **changes)
+        AvailableOperationsCache.invalidate()
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al reasignar operación: {str(e)}'
+            'success': True,
+            'message': message
         })
 
 
 @login_required
 @operator_required
 @require_POST
+@json_errors('Error al completar operación')
+@json_body(process_record_id=int, serial_number_id=int, notes=(str, ''), quality_passed=(bool, False))
 def complete_operation(request):
     """Completar la operación para un número de serie específico"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        serial_number_id = data.get('serial_number_id')
-        notes = data.get('notes', '')
-        quality_passed = data.get('quality_passed', False)
+    process_record_id = request.json['process_record_id']
+    serial_number_id = request.json['serial_number_id']
+    notes = request.json['notes']
+    quality_passed = request.json['quality_passed']
+    
+    with transaction.atomic():
+        # El registro asignado y el número de serie destino en una sola consulta
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation').annotate(
+                target_serial=Subquery(
+                    SerialNumber.objects.filter(pk=serial_number_id).values('serial_number')[:1]
+                )
+            ),
+            id=process_record_id,
+            assigned_operator=request.user,
+            status='IN_PROGRESS'
+        )
         
-        with transaction.atomic():
-            process_record = get_object_or_404(
-                ProcessRecord, 
-                id=process_record_id,
-                assigned_operator=request.user,
-                status='IN_PROGRESS'
-            )
-            
-            serial_number = get_object_or_404(SerialNumber, id=serial_number_id)
-            
-            # Crear o actualizar el registro de proceso para este número de serie específico
-            specific_record, created = ProcessRecord.objects.get_or_create(
-                serial_number=serial_number,
+        if process_record.target_serial is None:
+            raise Http404('Número de serie no encontrado')
+        
+        # Crear o actualizar el registro de proceso para este número de serie específico
+        now = timezone.now()
+        approved_fields = {
+            'status': 'APPROVED',
+            'processed_by': request.user,
+            'completed_at': now,
+            'notes': notes,
+            'quality_check_passed': quality_passed,
+            'updated_at': now,
+        }
+        updated = ProcessRecord.objects.filter(
+            serial_number_id=serial_number_id,
+            operation=process_record.operation
+        ).update(**approved_fields)
+        AvailableOperationsCache.invalidate()
+        
+        if not updated:
+            ProcessRecord.objects.create(
+                serial_number_id=serial_number_id,
                 operation=process_record.operation,
-                defaults={
-                    'status': 'APPROVED',
-                    'processed_by': request.user,
-                    'assigned_operator': request.user,
-                    'started_at': timezone.now(),
-                    'completed_at': timezone.now(),
-                    'assigned_at': timezone.now(),
-                    'notes': notes,
-                    'quality_check_passed': quality_passed,
-                }
+                assigned_operator=request.user,
+                started_at=now,
+                assigned_at=now,
+                **approved_fields
             )
-            
-            if not created:
-                # Actualizar registro existente
-                specific_record.status = 'APPROVED'
-                specific_record.completed_at = timezone.now()
-                specific_record.processed_by = request.user
-                specific_record.notes = notes
-                specific_record.quality_check_passed = quality_passed
-                specific_record.save()
-            
-            # Verificar si todas las operaciones están completadas para este número de serie
-            total_operations = Operation.objects.filter(is_active=True).count()
-            completed_operations = serial_number.process_records.filter(status='APPROVED').count()
-            
-            if completed_operations >= total_operations:
-                serial_number.status = 'COMPLETED'
-                serial_number.completed_at = timezone.now()
-                serial_number.save()
-            else:
-                serial_number.status = 'IN_PROCESS'
-                serial_number.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Operación {process_record.operation.name} completada para {serial_number.serial_number}.'
-            })
-            
-    except Exception as e:
+        # Estado, fecha de término y progreso del número de serie en un solo
+        # UPDATE (update() omite la señal post_save)
+        SerialNumber.refresh_completion([serial_number_id], now)
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al completar operación: {str(e)}'
+            'success': True,
+            'message': f'Operación {process_record.operation.name} completada para {process_record.target_serial}.'
         })
 
 
 @login_required
 @operator_required
 @require_POST
+@json_errors('Error al rechazar número de serie')
+@json_body(process_record_id=int, serial_number_id=int, defect_type=(str, 'OTHER'), rejection_reason=(str, ''))
 def reject_serial_number(request):
     """Rechazar un número de serie y crear un defecto"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        serial_number_id = data.get('serial_number_id')
-        defect_type = data.get('defect_type', 'OTHER')
-        rejection_reason = data.get('rejection_reason', '')
+    process_record_id = request.json['process_record_id']
+    serial_number_id = request.json['serial_number_id']
+    defect_type = request.json['defect_type']
+    rejection_reason = request.json['rejection_reason']
+    
+    with transaction.atomic():
+        # El registro asignado y el número de serie destino en una sola consulta
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation').annotate(
+                target_serial=Subquery(
+                    SerialNumber.objects.filter(pk=serial_number_id).values('serial_number')[:1]
+                )
+            ),
+            id=process_record_id,
+            assigned_operator=request.user,
+            status='IN_PROGRESS'
+        )
         
-        with transaction.atomic():
-            process_record = get_object_or_404(
-                ProcessRecord, 
-                id=process_record_id,
-                assigned_operator=request.user,
-                status='IN_PROGRESS'
-            )
-            
-            serial_number = get_object_or_404(SerialNumber, id=serial_number_id)
-            
-            # Crear el defecto
-            defect = Defect.objects.create(
-                serial_number=serial_number,
-                operation=process_record.operation,
-                defect_type=defect_type,
-                description=rejection_reason,
-                status='OPEN',
-                reported_by=request.user
-            )
-            
-            # Actualizar el estado del número de serie
-            serial_number.status = 'DEFECTIVE'
-            serial_number.save()
-            
-            # Crear o actualizar el registro de proceso como rechazado
-            specific_record, created = ProcessRecord.objects.get_or_create(
-                serial_number=serial_number,
+        if process_record.target_serial is None:
+            raise Http404('Número de serie no encontrado')
+        
+        # Crear el defecto
+        defect = Defect.objects.create(
+            serial_number_id=serial_number_id,
+            operation=process_record.operation,
+            defect_type=defect_type,
+            description=rejection_reason,
+            status='OPEN',
+            reported_by=request.user
+        )
+        
+        # Actualizar el estado del número de serie
+        now = timezone.now()
+        SerialNumber.objects.filter(pk=serial_number_id).update(
+            status='DEFECTIVE',
+            updated_at=now
+        )
+        
+        # Crear o actualizar el registro de proceso como rechazado
+        rejected_fields = {
+            'status': 'REJECTED',
+            'processed_by': request.user,
+            'completed_at': now,
+            'rejection_reason': rejection_reason,
+            'defect_type': defect_type,
+            'updated_at': now,
+        }
+        updated = ProcessRecord.objects.filter(
+            serial_number_id=serial_number_id,
+            operation=process_record.operation
+        ).update(**rejected_fields)
+        AvailableOperationsCache.invalidate()
+        
+        if not updated:
+            ProcessRecord.objects.create(
+                serial_number_id=serial_number_id,
                 operation=process_record.operation,
-                defaults={
-                    'status': 'REJECTED',
-                    'processed_by': request.user,
-                    'assigned_operator': request.user,
-                    'started_at': timezone.now(),
-                    'completed_at': timezone.now(),
-                    'assigned_at': timezone.now(),
-                    'rejection_reason': rejection_reason,
-                    'defect_type': defect_type,
-                }
+                assigned_operator=request.user,
+                started_at=now,
+                assigned_at=now,
+                **rejected_fields
             )
-            
-            if not created:
-                specific_record.status = 'REJECTED'
-                specific_record.completed_at = timezone.now()
-                specific_record.processed_by = request.user
-                specific_record.rejection_reason = rejection_reason
-                specific_record.defect_type = defect_type
-                specific_record.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Número de serie {serial_number.serial_number} rechazado. Defecto creado: #{defect.id}'
-            })
-            
-    except Exception as e:
+        SerialNumber.refresh_progress([serial_number_id])
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al rechazar número de serie: {str(e)}'
+            'success': True,
+            'message': f'Número de serie {process_record.target_serial} rechazado. Defecto creado: #{defect.id}'
         })
 
 
 @login_required
 @operator_required
 @require_POST
+@json_errors('Error al liberar operación')
+@json_body(process_record_id=int)
 def release_operation(request):
     """Liberar la operación asignada al operador"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        
-        with transaction.atomic():
-            process_record = get_object_or_404(
-                ProcessRecord, 
-                id=process_record_id,
-                assigned_operator=request.user,
-                status='IN_PROGRESS'
-            )
-            
-            # Liberar la operación
-            process_record.assigned_operator = None
-            process_record.status = 'PENDING'
-            process_record.started_at = None
-            process_record.assigned_at = None
-            process_record.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Operación {process_record.operation.name} liberada correctamente.'
-            })
-            
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'message': f'Error al liberar operación: {str(e)}'
-        })
+    process_record_id = request.json['process_record_id']
+    
+    # Liberar la operación con un solo UPDATE condicionado
+    released = ProcessRecord.objects.filter(
+        id=process_record_id,
+        assigned_operator=request.user,
+        status='IN_PROGRESS'
+    ).update(
+        assigned_operator=None,
+        status='PENDING',
+        started_at=None,
+        assigned_at=None,
+        updated_at=timezone.now()
+    )
+    if not released:
+        raise Http404('Operación no encontrada')
+    AvailableOperationsCache.invalidate()
+    
+    operation_name = Operation.objects.filter(
+        processrecord__id=process_record_id
+    ).values_list('name', flat=True).first()
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'Operación {operation_name} liberada correctamente.'
+    })
 
 
 @login_required
@@ -431,7 +434,14 @@ def release_operation(request):
 def operation_detail(request, process_record_id):
     """Vista detallada de una operación específica"""
     process_record = get_object_or_404(
-        ProcessRecord, 
+        ProcessRecord.objects.select_related(
+            'operation', 'serial_number__authorized_part', 'assigned_operator'
+        ).prefetch_related(
+            Prefetch(
+                'serial_number__process_records',
+                queryset=ProcessRecord.objects.select_related('operation')
+            )
+        ),
         id=process_record_id,
         assigned_operator=request.user,
         status='IN_PROGRESS'
@@ -1,17 +1,26 @@
 """
 ASGI config for manufacturing_system project.
+
+Serves both HTTP and WebSocket traffic, so a single ASGI server process
+can handle the whole site, e.g.:
+
+    gunicorn manufacturing_system.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
 from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manufacturing_system.settings')
+
+# Initialize Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 import manufacturing.routing
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manufacturing_system.settings')
-
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             manufacturing.routing.websocket_urlpatterns
@@ -49,6 +49,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'operators.middleware.UserRoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -75,9 +76,47 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        # Wait for concurrent writers instead of failing with "database is locked"
+        'OPTIONS': {
+            'timeout': int(os.environ.get('DB_TIMEOUT', 20)),
+            # Prepared statements kept per persistent connection, so repeated
+            # dashboard queries skip re-parsing and re-planning
+            'cached_statements': int(os.environ.get('DB_CACHED_STATEMENTS', 256)),
+        },
     }
 }
 
+# Cache shared by every worker process. Cached lists and counts are
+# invalidated by signals and the generated-serials CSV is read back by a
+# later request, so a per-process LocMemCache would serve stale or missing
+# entries. Redis when REDIS_URL is set (required for more than one host),
+# otherwise files under CACHE_DIR, shared by the workers of one host
+# without going through SQLite.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / '.cache'),
+        }
+    }
+
+# Authentication backend that loads request.user together with its profile.
+# ModelBackend stays listed so sessions stored with its path remain valid.
+AUTHENTICATION_BACKENDS = [
+    'operators.backends.UserProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
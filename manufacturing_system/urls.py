@@ -1,8 +1,12 @@
 """manufacturing_system URL Configuration"""
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, register_converter
 from django.conf import settings
 from django.conf.urls.static import static
+from serials.converters import SerialNumberConverter
+
+# <serial:...> is used by several apps' urlconfs; registered once, before they are included
+register_converter(SerialNumberConverter, 'serial')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
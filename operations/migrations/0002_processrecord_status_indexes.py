@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(fields=['operation', 'status'], name='pr_operation_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(fields=['status', 'started_at', 'completed_at'], name='pr_status_times_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(condition=models.Q(('status', 'APPROVED')), fields=['operation', 'started_at', 'completed_at'], name='pr_approved_cycle_idx'),
+        ),
+    ]
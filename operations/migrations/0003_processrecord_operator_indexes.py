@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0002_processrecord_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(fields=['assigned_operator', 'status'], name='pr_assigned_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(fields=['processed_by', 'status', '-completed_at'], name='pr_processed_status_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0003_processrecord_operator_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='processrecord',
+            name='pr_assigned_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='processrecord',
+            name='pr_processed_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(condition=models.Q(('assigned_operator__isnull', True), ('status', 'PENDING')), fields=['operation', 'created_at'], name='pr_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(condition=models.Q(('status', 'IN_PROGRESS')), fields=['assigned_operator'], name='pr_inprog_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(condition=models.Q(('status', 'APPROVED')), fields=['processed_by', '-completed_at'], name='pr_approved_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:49
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_operation_sequence(apps, schema_editor):
+    Operation = apps.get_model('operations', 'Operation')
+    ProcessRecord = apps.get_model('operations', 'ProcessRecord')
+    ProcessRecord.objects.update(operation_sequence=Subquery(
+        Operation.objects.filter(pk=OuterRef('operation_id')).values('sequence_number')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0004_processrecord_partial_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='processrecord',
+            options={'ordering': ['serial_number', 'operation_sequence'], 'verbose_name': 'Registro de Proceso', 'verbose_name_plural': 'Registros de Proceso'},
+        ),
+        migrations.AddField(
+            model_name='processrecord',
+            name='operation_sequence',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_operation_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0005_processrecord_operation_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(condition=models.Q(('status', 'IN_PROGRESS')), fields=['operation'], name='pr_inprog_operation_idx'),
+        ),
+    ]
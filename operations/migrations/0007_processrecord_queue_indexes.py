@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0006_processrecord_inprogress_operation_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(condition=models.Q(('assigned_operator__isnull', True), ('status', 'PENDING')), fields=['operation_sequence', 'created_at'], name='pr_pending_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processrecord',
+            index=models.Index(condition=models.Q(('status__in', ['PENDING', 'IN_PROGRESS'])), fields=['operation_sequence', 'created_at'], name='pr_open_queue_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
 
 
 class Operation(models.Model):
@@ -30,6 +31,8 @@ class Operation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    ACTIVE_COUNT_CACHE_KEY = 'operations:active_count'
+
     class Meta:
         verbose_name = "Operación"
         verbose_name_plural = "Operaciones"
@@ -38,6 +41,15 @@ class Operation(models.Model):
     def __str__(self):
         return f"{self.sequence_number}. {self.name}"
 
+    @classmethod
+    def active_count(cls):
+        """Number of active operations, cached until an operation changes"""
+        return cache.get_or_set(
+            cls.ACTIVE_COUNT_CACHE_KEY,
+            lambda: cls.objects.filter(is_active=True).count(),
+            3600
+        )
+
 
 class ProcessRecord(models.Model):
     """Model to track manufacturing process for each serial number"""
@@ -60,6 +72,14 @@ class ProcessRecord(models.Model):
         on_delete=models.PROTECT
     )
     
+    # Copy of operation.sequence_number so records can be filtered and
+    # sorted by sequence without joining Operation
+    operation_sequence = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        editable=False
+    )
+    
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -120,29 +140,99 @@ class ProcessRecord(models.Model):
         verbose_name = "Registro de Proceso"
         verbose_name_plural = "Registros de Proceso"
         unique_together = ['serial_number', 'operation']
-        ordering = ['serial_number', 'operation__sequence_number']
+        ordering = ['serial_number', 'operation_sequence']
+        indexes = [
+            # Per-operation status counts (FPY, statistics)
+            models.Index(fields=['operation', 'status'], name='pr_operation_status_idx'),
+            models.Index(fields=['status', 'started_at', 'completed_at'], name='pr_status_times_idx'),
+            # Cycle-time averages only read approved records
+            models.Index(
+                fields=['operation', 'started_at', 'completed_at'],
+                condition=models.Q(status='APPROVED'),
+                name='pr_approved_cycle_idx'
+            ),
+            # Partial indexes for the hot status filters: only the rows each
+            # lookup can match are indexed
+            models.Index(
+                fields=['operation', 'created_at'],
+                condition=models.Q(status='PENDING', assigned_operator__isnull=True),
+                name='pr_pending_idx'
+            ),
+            models.Index(
+                fields=['assigned_operator'],
+                condition=models.Q(status='IN_PROGRESS'),
+                name='pr_inprog_idx'
+            ),
+            # Current assignments per operation (summary views)
+            models.Index(
+                fields=['operation'],
+                condition=models.Q(status='IN_PROGRESS'),
+                name='pr_inprog_operation_idx'
+            ),
+            models.Index(
+                fields=['processed_by', '-completed_at'],
+                condition=models.Q(status='APPROVED'),
+                name='pr_approved_idx'
+            ),
+            # Dashboard queues, read in (operation_sequence, created_at) order
+            models.Index(
+                fields=['operation_sequence', 'created_at'],
+                condition=models.Q(status='PENDING', assigned_operator__isnull=True),
+                name='pr_pending_queue_idx'
+            ),
+            models.Index(
+                fields=['operation_sequence', 'created_at'],
+                condition=models.Q(status__in=['PENDING', 'IN_PROGRESS']),
+                name='pr_open_queue_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.serial_number} - {self.operation.name} ({self.status})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # operation_id as loaded, so save() notices when the operation changes
+        instance._loaded_operation_id = instance.__dict__.get('operation_id')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        saves_operation = update_fields is None or bool({'operation', 'operation_id'} & set(update_fields))
+        if saves_operation and self.operation_id and (
+            not self.operation_sequence
+            or self.operation_id != getattr(self, '_loaded_operation_id', None)
+        ):
+            self.operation_sequence = self.operation.sequence_number
+            if update_fields is not None and 'operation_sequence' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'operation_sequence']
+        super().save(*args, **kwargs)
+        if saves_operation:
+            self._loaded_operation_id = self.operation_id
+    
     def is_assigned(self):
         """Verifica si la operación está asignada a un operador"""
         return self.assigned_operator is not None and self.status == 'IN_PROGRESS'
     
     def can_be_assigned_to(self, user):
         """Verifica si la operación puede ser asignada al usuario"""
-        # Solo operadores pueden ser asignados
-        if not hasattr(user, 'userprofile') or user.userprofile.role != 'OPERATOR':
+        # La operación debe estar pendiente (verificación en memoria primero)
+        if self.status != 'PENDING':
             return False
         
-        # La operación debe estar pendiente
-        if self.status != 'PENDING':
+        # Solo operadores pueden ser asignados; si el perfil ya viene cargado
+        # con el usuario no se consulta, si no solo se verifica el rol
+        if User.userprofile.is_cached(user):
+            is_operator = user.userprofile.role == 'OPERATOR'
+        else:
+            from operators.models import UserProfile
+            is_operator = UserProfile.objects.filter(user=user, role='OPERATOR').exists()
+        if not is_operator:
             return False
-            
+        
         # El operador no debe tener otra operación asignada
-        active_assignment = ProcessRecord.objects.filter(
+        return not ProcessRecord.objects.filter(
             assigned_operator=user,
             status='IN_PROGRESS'
         ).exists()
-        
-        return not active_assignment
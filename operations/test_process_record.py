@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from operations.models import Operation, ProcessRecord
+from serials.models import AuthorizedPart, SerialNumber
+
+
+class ProcessRecordSequenceTests(TestCase):
+    """ProcessRecord.operation_sequence follows the record's operation"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('operador1', password='clave-segura')
+        cls.first = Operation.objects.create(name='Ensamble', sequence_number=1)
+        part = AuthorizedPart.objects.create(part_number='P-100', sku='SKU-P-100', description='Parte')
+        cls.serial = SerialNumber.objects.create(
+            serial_number='KA001-001M',
+            order_number='ORD-1',
+            authorized_part=part,
+            created_by=user
+        )
+        # Added after the serial, so it has no record yet to collide with
+        cls.second = Operation.objects.create(name='Empaque', sequence_number=2)
+
+    def test_changing_operation_resyncs_sequence(self):
+        record = ProcessRecord.objects.get(serial_number=self.serial, operation=self.first)
+        self.assertEqual(record.operation_sequence, 1)
+
+        record.operation = self.second
+        record.save(update_fields=['operation'])
+
+        record.refresh_from_db()
+        self.assertEqual(record.operation_sequence, 2)
+
+    def test_changing_operation_id_resyncs_sequence(self):
+        record = ProcessRecord.objects.get(serial_number=self.serial, operation=self.first)
+
+        record.operation_id = self.second.pk
+        record.save()
+
+        self.assertEqual(ProcessRecord.objects.get(pk=record.pk).operation_sequence, 2)
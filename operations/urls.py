@@ -4,7 +4,7 @@ from . import views
 app_name = 'operations'
 urlpatterns = [
     # Operations management
-    path('process/<str:serial_number>/', views.manufacturing_process, name='manufacturing_process'),
+    path('process/<serial:serial_number>/', views.manufacturing_process, name='manufacturing_process'),
     path('summary/', views.summary_view, name='summary'),
     path('admin/', views.admin_panel, name='admin_panel'),
     
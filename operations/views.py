@@ -1,36 +1,64 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q, Count
-from django.http import JsonResponse
+from django.db.models import Q, Count, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.core.cache import cache
 from serials.models import SerialNumber, AuthorizedPart
+from serials.pagination import PkPaginator
+from serials.services import SerialNumberFilter
 from analytics.models import ProductionAlert
 from operators.models import UserProfile
+from operators.services import AssignableOperatorCache
+from operators.utils import json_response, load_json_body, stream_json_list
 from .models import ProcessRecord, Operation
-import json
 
 
 @login_required
 def manufacturing_process(request, serial_number):
     """Manufacturing process tracking view"""
-    serial = get_object_or_404(SerialNumber, serial_number=serial_number)
+    # Next operation to be processed (same rule as SerialNumber.current_operation:
+    # first active operation whose sequence has no approved record), resolved
+    # in the same query as the serial
+    next_operation = Operation.objects.filter(is_active=True).exclude(
+        Exists(ProcessRecord.objects.filter(
+            serial_number=OuterRef(OuterRef('pk')),
+            operation_sequence=OuterRef('sequence_number'),
+            status='APPROVED'
+        ))
+    ).order_by('sequence_number').values('pk')[:1]
+    
+    serial = get_object_or_404(
+        SerialNumber.objects.select_related('authorized_part', 'created_by').annotate(
+            current_operation_id=Subquery(next_operation)
+        ),
+        serial_number=serial_number
+    )
     
     # Get process records with operations
-    process_records = ProcessRecord.objects.filter(
+    process_records = list(ProcessRecord.objects.filter(
         serial_number=serial
-    ).select_related('operation', 'processed_by').order_by('operation__sequence_number')
+    ).select_related('operation', 'processed_by').order_by('operation_sequence'))
     
-    # Get current operation (next to be processed)
-    current_operation = serial.current_operation
+    # The current operation normally has a record already loaded above
+    current_operation = next(
+        (record.operation for record in process_records
+         if record.operation_id == serial.current_operation_id),
+        None
+    )
+    if current_operation is None and serial.current_operation_id is not None:
+        current_operation = Operation.objects.get(pk=serial.current_operation_id)
     
     context = {
         'serial': serial,
         'process_records': process_records,
         'current_operation': current_operation,
-        'can_approve': request.user.userprofile.can_approve_operations if hasattr(request.user, 'userprofile') else False
+        'can_approve': getattr(request.user_profile, 'can_approve_operations', False)
     }
     
     return render(request, 'operations/manufacturing_process.html', context)
@@ -47,9 +75,7 @@ def summary_view(request):
     date_to = request.GET.get('date_to', '')
     
     # Build query
-    serials = SerialNumber.objects.select_related(
-        'authorized_part', 'created_by'
-    ).prefetch_related('process_records__operation')
+    serials = SerialNumber.objects.select_related('authorized_part', 'created_by')
     
     if status_filter:
         serials = serials.filter(status=status_filter)
@@ -60,17 +86,16 @@ def summary_view(request):
     if order_filter:
         serials = serials.filter(order_number__icontains=order_filter)
     
-    if date_from:
-        serials = serials.filter(created_at__date__gte=date_from)
-    
-    if date_to:
-        serials = serials.filter(created_at__date__lte=date_to)
+    try:
+        serials = serials.filter(SerialNumberFilter.created_range(date_from, date_to))
+    except ValueError:
+        messages.error(request, 'Formato de fecha inválido, usa AAAA-MM-DD.')
     
     # Order by creation date (newest first)
     serials = serials.order_by('-created_at')
     
-    # Pagination
-    paginator = Paginator(serials, 25)
+    # Pagination (only the page's primary keys go through the OFFSET)
+    paginator = PkPaginator(serials, 25)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -78,55 +103,43 @@ def summary_view(request):
     status_choices = SerialNumber.STATUS_CHOICES
     authorized_parts = AuthorizedPart.objects.filter(is_active=True).order_by('part_number')
     
-    # Get all operations with their current assignments and availability
-    operations = Operation.objects.filter(is_active=True).order_by('sequence_number')
+    # Get all operations with their availability counted in the same query
+    operations = Operation.objects.filter(is_active=True).annotate(
+        free_operations_count=Count(
+            'processrecord',
+            filter=Q(processrecord__status='PENDING', processrecord__assigned_operator__isnull=True)
+        )
+    ).order_by('sequence_number')
+    
+    # Current assignments for all operations at once; the first record per
+    # operation (default ordering) is the one shown
+    current_assignments = {}
+    for assignment in ProcessRecord.objects.filter(
+        operation__is_active=True,
+        status='IN_PROGRESS'
+    ).select_related('assigned_operator', 'serial_number'):
+        current_assignments.setdefault(assignment.operation_id, assignment)
     
     operations_data = []
     for operation in operations:
-        # Get current process records for this operation that are in progress
-        current_assignments = ProcessRecord.objects.filter(
-            operation=operation,
-            status='IN_PROGRESS'
-        ).select_related('assigned_operator', 'serial_number')
-        
-        # Count free operations (pending without assigned operator)
-        free_operations_count = ProcessRecord.objects.filter(
-            operation=operation,
-            status='PENDING',
-            assigned_operator__isnull=True
-        ).count()
-        
-        # Get assigned operator (if any)
-        assigned_operator = None
-        serial_number = None
-        if current_assignments.exists():
-            first_assignment = current_assignments.first()
-            assigned_operator = first_assignment.assigned_operator
-            serial_number = first_assignment.serial_number
-        
-        # Determine if operation is available for assignment
-        is_available = free_operations_count > 0
+        assignment = current_assignments.get(operation.pk)
         
         operations_data.append({
             'operation': operation,
-            'assigned_operator': assigned_operator,
-            'serial_number': serial_number,
-            'free_operations_count': free_operations_count,
-            'is_available': is_available,
+            'assigned_operator': assignment.assigned_operator if assignment else None,
+            'serial_number': assignment.serial_number if assignment else None,
+            'free_operations_count': operation.free_operations_count,
+            'is_available': operation.free_operations_count > 0,
         })
     
     # Check if user can change operators (admin or supervisor)
     user_can_change_operator = (
         request.user.is_superuser or 
-        (hasattr(request.user, 'userprofile') and 
-         request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])
+        request.user_role in UserProfile.ELEVATED_ROLES
     )
     
     # Get available operators for the change operator modal
-    available_operators = UserProfile.objects.filter(
-        role__in=['OPERATOR', 'SUPERVISOR', 'ADMIN'],
-        user__is_active=True
-    ).select_related('user')
+    available_operators = AssignableOperatorCache.get_profiles()
     
     context = {
         'page_obj': page_obj,
@@ -147,26 +160,29 @@ def summary_view(request):
     return render(request, 'operations/summary.html', context)
 
 
+ADMIN_PANEL_COUNTS_CACHE_KEY = 'operations:admin_panel_counts'
+
+
+def _admin_panel_counts():
+    """Totals shown on the admin panel"""
+    return {
+        'total_users': UserProfile.objects.count(),
+        'total_operations': Operation.objects.count(),
+        'total_parts': AuthorizedPart.objects.count(),
+        'active_alerts': ProductionAlert.objects.filter(is_active=True, is_resolved=False).count(),
+    }
+
+
 @login_required
 def admin_panel(request):
     """Admin panel for managing operations, users, and serial numbers"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.can_manage_users)):
+            getattr(request.user_profile, 'can_manage_users', False)):
         messages.error(request, 'No tienes permisos para acceder al panel de administración')
         return redirect('analytics:dashboard')
     
-    # Get counts for dashboard
-    total_users = UserProfile.objects.count()
-    total_operations = Operation.objects.count()
-    total_parts = AuthorizedPart.objects.count()
-    active_alerts = ProductionAlert.objects.filter(is_active=True, is_resolved=False).count()
-    
-    context = {
-        'total_users': total_users,
-        'total_operations': total_operations,
-        'total_parts': total_parts,
-        'active_alerts': active_alerts,
-    }
+    # Counts for the dashboard change slowly; they are cached for a minute
+    context = cache.get_or_set(ADMIN_PANEL_COUNTS_CACHE_KEY, _admin_panel_counts, 60)
     
     return render(request, 'operations/admin_panel.html', context)
 
@@ -176,48 +192,47 @@ def admin_panel(request):
 def manage_users(request):
     """API endpoint for user management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.can_manage_users)):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
+            getattr(request.user_profile, 'can_manage_users', False)):
+        return json_response({'error': 'Sin permisos'}, status=403)
     
     if request.method == 'GET':
-        users = User.objects.select_related('userprofile').all()
-        users_data = []
-        for user in users:
-            profile = getattr(user, 'userprofile', None)
-            users_data.append({
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'is_active': user.is_active,
-                'role': profile.role if profile else 'OPERATOR',
-                'can_approve_operations': profile.can_approve_operations if profile else False,
-                'can_manage_users': profile.can_manage_users if profile else False,
-            })
-        return JsonResponse({'users': users_data})
+        # Only the columns the JSON needs; users without a profile get the
+        # same defaults as before through COALESCE
+        users = User.objects.annotate(
+            role=Coalesce('userprofile__role', Value('OPERATOR')),
+            can_approve_operations=Coalesce('userprofile__can_approve_operations', Value(False)),
+            can_manage_users=Coalesce('userprofile__can_manage_users', Value(False)),
+        ).values(
+            'id', 'username', 'email', 'first_name', 'last_name', 'is_active',
+            'role', 'can_approve_operations', 'can_manage_users'
+        )
+        return StreamingHttpResponse(
+            stream_json_list('users', users.iterator(chunk_size=500)),
+            content_type='application/json'
+        )
     
     elif request.method == 'POST':
         try:
-            data = json.loads(request.body)
-            user = User.objects.create_user(
-                username=data['username'],
-                email=data['email'],
-                first_name=data.get('first_name', ''),
-                last_name=data.get('last_name', ''),
-                password=data.get('password', 'temp123')
-            )
-            
-            # Create or update profile
-            profile, created = UserProfile.objects.get_or_create(user=user)
-            profile.role = data.get('role', 'OPERATOR')
-            profile.can_approve_operations = data.get('can_approve_operations', False)
-            profile.can_manage_users = data.get('can_manage_users', False)
-            profile.save()
+            data = load_json_body(request)
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username=data['username'],
+                    email=data['email'],
+                    first_name=data.get('first_name', ''),
+                    last_name=data.get('last_name', ''),
+                    password=data.get('password', 'temp123')
+                )
+                
+                # Create or update profile
+                UserProfile.objects.update_or_create(user=user, defaults={
+                    'role': data.get('role', 'OPERATOR'),
+                    'can_approve_operations': data.get('can_approve_operations', False),
+                    'can_manage_users': data.get('can_manage_users', False),
+                })
             
-            return JsonResponse({'success': True, 'message': 'Usuario creado exitosamente'})
+            return json_response({'success': True, 'message': 'Usuario creado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
 
 
 @login_required
@@ -225,39 +240,54 @@ def manage_users(request):
 def manage_user(request, user_id):
     """API endpoint for individual user management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.can_manage_users)):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
+            getattr(request.user_profile, 'can_manage_users', False)):
+        return json_response({'error': 'Sin permisos'}, status=403)
     
     user = get_object_or_404(User, id=user_id)
     
     if request.method == 'PUT':
         try:
-            data = json.loads(request.body)
-            user.username = data.get('username', user.username)
-            user.email = data.get('email', user.email)
-            user.first_name = data.get('first_name', user.first_name)
-            user.last_name = data.get('last_name', user.last_name)
-            user.is_active = data.get('is_active', user.is_active)
-            user.save()
+            data = load_json_body(request)
+            user_fields = {
+                field: data[field]
+                for field in ('username', 'email', 'first_name', 'last_name', 'is_active')
+                if field in data
+            }
+            profile_fields = {
+                field: data[field]
+                for field in ('role', 'can_approve_operations', 'can_manage_users')
+                if field in data
+            }
             
-            # Update profile
-            profile, created = UserProfile.objects.get_or_create(user=user)
-            profile.role = data.get('role', profile.role)
-            profile.can_approve_operations = data.get('can_approve_operations', profile.can_approve_operations)
-            profile.can_manage_users = data.get('can_manage_users', profile.can_manage_users)
-            profile.save()
+            # Only the fields sent in the request, as plain UPDATEs
+            with transaction.atomic():
+                if user_fields:
+                    User.objects.filter(pk=user.pk).update(**user_fields)
+                
+                if profile_fields:
+                    updated = UserProfile.objects.filter(user_id=user.pk).update(
+                        updated_at=timezone.now(), **profile_fields
+                    )
+                    if not updated:
+                        UserProfile.objects.create(
+                            user_id=user.pk,
+                            employee_id=f"EMP{user.pk:04d}",
+                            **profile_fields
+                        )
+            # update() omite las señales post_save
+            AssignableOperatorCache.invalidate()
             
-            return JsonResponse({'success': True, 'message': 'Usuario actualizado exitosamente'})
+            return json_response({'success': True, 'message': 'Usuario actualizado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
     
     elif request.method == 'DELETE':
         try:
             user.is_active = False
             user.save()
-            return JsonResponse({'success': True, 'message': 'Usuario desactivado exitosamente'})
+            return json_response({'success': True, 'message': 'Usuario desactivado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
 
 
 @login_required
@@ -265,8 +295,8 @@ def manage_user(request, user_id):
 def manage_operations(request):
     """API endpoint for operations management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
+            request.user_role in UserProfile.ELEVATED_ROLES):
+        return json_response({'error': 'Sin permisos'}, status=403)
     
     if request.method == 'GET':
         operations = Operation.objects.all().order_by('sequence_number')
@@ -281,11 +311,11 @@ def manage_operations(request):
                 'requires_approval': operation.requires_approval,
                 'is_active': operation.is_active,
             })
-        return JsonResponse({'operations': operations_data})
+        return json_response({'operations': operations_data})
     
     elif request.method == 'POST':
         try:
-            data = json.loads(request.body)
+            data = load_json_body(request)
             operation = Operation.objects.create(
                 name=data['name'],
                 description=data.get('description', ''),
@@ -294,9 +324,9 @@ def manage_operations(request):
                 requires_approval=data.get('requires_approval', True),
                 is_active=data.get('is_active', True)
             )
-            return JsonResponse({'success': True, 'message': 'Operación creada exitosamente'})
+            return json_response({'success': True, 'message': 'Operación creada exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
 
 
 @login_required
@@ -304,14 +334,14 @@ def manage_operations(request):
 def manage_operation(request, operation_id):
     """API endpoint for individual operation management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
+            request.user_role in UserProfile.ELEVATED_ROLES):
+        return json_response({'error': 'Sin permisos'}, status=403)
     
     operation = get_object_or_404(Operation, id=operation_id)
     
     if request.method == 'PUT':
         try:
-            data = json.loads(request.body)
+            data = load_json_body(request)
             operation.name = data.get('name', operation.name)
             operation.description = data.get('description', operation.description)
             operation.sequence_number = data.get('sequence_number', operation.sequence_number)
@@ -320,17 +350,17 @@ def manage_operation(request, operation_id):
             operation.is_active = data.get('is_active', operation.is_active)
             operation.save()
             
-            return JsonResponse({'success': True, 'message': 'Operación actualizada exitosamente'})
+            return json_response({'success': True, 'message': 'Operación actualizada exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
     
     elif request.method == 'DELETE':
         try:
             operation.is_active = False
             operation.save()
-            return JsonResponse({'success': True, 'message': 'Operación desactivada exitosamente'})
+            return json_response({'success': True, 'message': 'Operación desactivada exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
 
 
 @login_required
@@ -338,35 +368,28 @@ def manage_operation(request, operation_id):
 def manage_parts(request):
     """API endpoint for parts management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
+            request.user_role in UserProfile.ELEVATED_ROLES):
+        return json_response({'error': 'Sin permisos'}, status=403)
     
     if request.method == 'GET':
-        parts = AuthorizedPart.objects.all().order_by('part_number')
-        parts_data = []
-        for part in parts:
-            parts_data.append({
-                'id': part.id,
-                'part_number': part.part_number,
-                'description': part.description,
-                'revision': part.revision,
-                'is_active': part.is_active,
-                'created_at': part.created_at.isoformat(),
-            })
-        return JsonResponse({'parts': parts_data})
+        # Plain rows; created_at is encoded as ISO 8601 by json_response
+        parts_data = list(AuthorizedPart.objects.order_by('part_number').values(
+            'id', 'part_number', 'description', 'revision', 'is_active', 'created_at'
+        ))
+        return json_response({'parts': parts_data})
     
     elif request.method == 'POST':
         try:
-            data = json.loads(request.body)
+            data = load_json_body(request)
             part = AuthorizedPart.objects.create(
                 part_number=data['part_number'],
                 description=data['description'],
                 revision=data.get('revision', 'A'),
                 is_active=data.get('is_active', True)
             )
-            return JsonResponse({'success': True, 'message': 'Componente creado exitosamente'})
+            return json_response({'success': True, 'message': 'Componente creado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
 
 
 @login_required
@@ -374,31 +397,31 @@ def manage_parts(request):
 def manage_part(request, part_id):
     """API endpoint for individual part management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
+            request.user_role in UserProfile.ELEVATED_ROLES):
+        return json_response({'error': 'Sin permisos'}, status=403)
     
     part = get_object_or_404(AuthorizedPart, id=part_id)
     
     if request.method == 'PUT':
         try:
-            data = json.loads(request.body)
+            data = load_json_body(request)
             part.part_number = data.get('part_number', part.part_number)
             part.description = data.get('description', part.description)
             part.revision = data.get('revision', part.revision)
             part.is_active = data.get('is_active', part.is_active)
             part.save()
             
-            return JsonResponse({'success': True, 'message': 'Componente actualizado exitosamente'})
+            return json_response({'success': True, 'message': 'Componente actualizado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
     
     elif request.method == 'DELETE':
         try:
             part.is_active = False
             part.save()
-            return JsonResponse({'success': True, 'message': 'Componente desactivado exitosamente'})
+            return json_response({'success': True, 'message': 'Componente desactivado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
 
 
 @login_required
@@ -406,23 +429,37 @@ def manage_part(request, part_id):
 def manage_serials(request):
     """API endpoint for serial numbers management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
-    
-    serials = SerialNumber.objects.select_related('authorized_part', 'created_by').all()
-    serials_data = []
-    for serial in serials:
-        serials_data.append({
-            'id': serial.id,
-            'serial_number': serial.serial_number,
-            'order_number': serial.order_number,
-            'part_number': serial.authorized_part.part_number,
-            'status': serial.status,
-            'completion_percentage': serial.completion_percentage,
-            'created_by': serial.created_by.username,
-            'created_at': serial.created_at.isoformat(),
-        })
-    return JsonResponse({'serials': serials_data})
+            request.user_role in UserProfile.ELEVATED_ROLES):
+        return json_response({'error': 'Sin permisos'}, status=403)
+    
+    # Only the columns needed for the JSON, with the approved operations
+    # counted in the same query (same formula as completion_percentage)
+    total_operations = Operation.active_count()
+    serials = SerialNumber.objects.annotate(
+        done_ops=Count('process_records', filter=Q(process_records__status='APPROVED'))
+    ).values(
+        'id', 'serial_number', 'order_number', 'authorized_part__part_number',
+        'status', 'done_ops', 'created_by__username', 'created_at'
+    ).order_by('-created_at')
+    serials_data = (
+        {
+            'id': serial['id'],
+            'serial_number': serial['serial_number'],
+            'order_number': serial['order_number'],
+            'part_number': serial['authorized_part__part_number'],
+            'status': serial['status'],
+            'completion_percentage': (
+                round((serial['done_ops'] / total_operations) * 100, 2) if total_operations else 0
+            ),
+            'created_by': serial['created_by__username'],
+            'created_at': serial['created_at'],
+        }
+        for serial in serials.iterator(chunk_size=500)
+    )
+    return StreamingHttpResponse(
+        stream_json_list('serials', serials_data),
+        content_type='application/json'
+    )
 
 
 @login_required
@@ -430,25 +467,25 @@ def manage_serials(request):
 def manage_serial(request, serial_id):
     """API endpoint for individual serial management"""
     if not (request.user.is_superuser or 
-            (hasattr(request.user, 'userprofile') and request.user.userprofile.role in ['ADMIN', 'SUPERVISOR'])):
-        return JsonResponse({'error': 'Sin permisos'}, status=403)
+            request.user_role in UserProfile.ELEVATED_ROLES):
+        return json_response({'error': 'Sin permisos'}, status=403)
     
     serial = get_object_or_404(SerialNumber, id=serial_id)
     
     if request.method == 'PUT':
         try:
-            data = json.loads(request.body)
+            data = load_json_body(request)
             serial.order_number = data.get('order_number', serial.order_number)
             serial.status = data.get('status', serial.status)
             serial.save()
             
-            return JsonResponse({'success': True, 'message': 'Número de serie actualizado exitosamente'})
+            return json_response({'success': True, 'message': 'Número de serie actualizado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
     
     elif request.method == 'DELETE':
         try:
             serial.delete()
-            return JsonResponse({'success': True, 'message': 'Número de serie eliminado exitosamente'})
+            return json_response({'success': True, 'message': 'Número de serie eliminado exitosamente'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
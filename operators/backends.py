@@ -0,0 +1,15 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth import get_user_model
+
+
+class UserProfileBackend(ModelBackend):
+    """ModelBackend that loads the user's profile together with the user"""
+
+    def get_user(self, user_id):
+        """Resolve the session user with its UserProfile in a single query"""
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('userprofile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -1,6 +1,26 @@
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.http import Http404, JsonResponse
+from django.db import IntegrityError
 from functools import wraps
+import json
+import logging
+from .models import UserProfile
+from .utils import load_json_body
+
+logger = logging.getLogger(__name__)
+
+
+def get_user_role(request):
+    """Role of the request's user, memoized on the request.
+
+    UserRoleMiddleware normally sets request.user_role; this only resolves
+    it when the view is reached without the middleware (e.g. RequestFactory).
+    """
+    if not hasattr(request, 'user_role'):
+        profile = getattr(request.user, 'userprofile', None)
+        request.user_role = profile.role if profile is not None else None
+    return request.user_role
 
 
 def operator_required(view_func):
@@ -10,12 +30,12 @@ def operator_required(view_func):
         if not request.user.is_authenticated:
             return redirect('operators:login')
         
-        if not hasattr(request.user, 'userprofile'):
+        user_role = get_user_role(request)
+        if user_role is None:
             messages.error(request, 'Tu cuenta no tiene un perfil asignado. Contacta al administrador.')
             return redirect('operators:login')
         
-        user_role = request.user.userprofile.role
-        if user_role not in ['OPERATOR', 'SUPERVISOR', 'ADMIN']:
+        if user_role not in UserProfile.FLOOR_ROLES:
             messages.error(request, 'No tienes permisos para acceder a esta sección.')
             return redirect('statistics:dashboard')
         
@@ -30,14 +50,110 @@ def supervisor_or_admin_required(view_func):
         if not request.user.is_authenticated:
             return redirect('operators:login')
         
-        if not hasattr(request.user, 'userprofile'):
+        user_role = get_user_role(request)
+        if user_role is None:
             messages.error(request, 'Tu cuenta no tiene un perfil asignado. Contacta al administrador.')
             return redirect('operators:login')
         
-        user_role = request.user.userprofile.role
-        if user_role not in ['SUPERVISOR', 'ADMIN']:
+        if user_role not in UserProfile.ELEVATED_ROLES:
             messages.error(request, 'No tienes permisos para acceder a esta sección.')
             return redirect('statistics:dashboard')
         
         return view_func(request, *args, **kwargs)
     return wrapper
+
+
+def json_errors(error_message):
+    """Turn the expected failures of AJAX POST views into JSON responses.
+
+    Only malformed bodies, missing records and integrity conflicts are
+    handled; anything else propagates to Django's error handling.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return view_func(request, *args, **kwargs)
+            except json.JSONDecodeError:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'{error_message}: solicitud inválida.'
+                }, status=400)
+            except InvalidPayload as exc:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'{error_message}: {exc}'
+                }, status=400)
+            except Http404:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'{error_message}: el registro no existe o ya no está disponible.'
+                }, status=404)
+            except IntegrityError:
+                logger.exception(error_message)
+                return JsonResponse({
+                    'success': False,
+                    'message': f'{error_message}: conflicto con otra operación, intenta de nuevo.'
+                }, status=409)
+        return wrapper
+    return decorator
+
+
+class InvalidPayload(ValueError):
+    """A JSON body field is missing or has the wrong type"""
+
+
+_REQUIRED = object()
+
+# Range of a 64-bit INTEGER column; larger ids overflow in the query
+_INT_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+def _coerce(name, value, expected):
+    if expected is bool:
+        if isinstance(value, bool):
+            return value
+    elif expected is int:
+        # isdecimal() rather than isdigit(): int() rejects digits such as '²'
+        if isinstance(value, str) and value.strip().isdecimal():
+            value = int(value)
+        if isinstance(value, int) and not isinstance(value, bool) and value in _INT_RANGE:
+            return value
+    elif isinstance(value, expected):
+        return value
+    raise InvalidPayload(f'el campo {name} no es válido.')
+
+
+def clean_fields(data, fields):
+    """Check a JSON object against a field spec (see json_body) and return the cleaned dict"""
+    if not isinstance(data, dict):
+        raise InvalidPayload('se esperaba un objeto JSON.')
+    
+    cleaned = {}
+    for name, spec in fields.items():
+        expected, default = spec if isinstance(spec, tuple) else (spec, _REQUIRED)
+        value = data.get(name)
+        if value is None or value == '':
+            if default is _REQUIRED:
+                raise InvalidPayload(f'falta el campo {name}.')
+            cleaned[name] = default
+        else:
+            cleaned[name] = _coerce(name, value, expected)
+    return cleaned
+
+
+def json_body(**fields):
+    """Parse the JSON body into request.json, checking the listed fields.
+
+    Each field maps to a type (required) or to a (type, default) pair
+    (optional; null or "" also take the default). Use below json_errors so
+    malformed bodies and invalid fields become 400 responses before the
+    view opens its transaction.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            request.json = clean_fields(load_json_body(request), fields)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
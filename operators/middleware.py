@@ -0,0 +1,13 @@
+class UserRoleMiddleware:
+    """Expose the authenticated user's profile and role as request.user_profile
+    and request.user_role (both None without a profile)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = request.user
+        profile = getattr(user, 'userprofile', None) if user.is_authenticated else None
+        request.user_profile = profile
+        request.user_role = profile.role if profile is not None else None
+        return self.get_response(request)
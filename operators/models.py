@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Exists, OuterRef
 from django.contrib.auth.models import User
 
 
@@ -13,6 +14,12 @@ class UserProfile(models.Model):
         ('REPAIRER', 'Reparador'),
     ]
     
+    # Role groups used by the permission checks (set membership is O(1))
+    ELEVATED_ROLES = frozenset({'SUPERVISOR', 'ADMIN'})
+    FLOOR_ROLES = frozenset({'OPERATOR', 'SUPERVISOR', 'ADMIN'})
+    REPAIR_ROLES = frozenset({'REPAIRER', 'ADMIN'})
+    DEFECT_ROLES = frozenset({'REPAIRER', 'SUPERVISOR', 'ADMIN'})
+    
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     employee_id = models.CharField(max_length=20, unique=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
@@ -35,3 +42,23 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.employee_id})"
+
+    @classmethod
+    def has_operation_in_progress(cls, user, exclude_record_id=None):
+        """Lock the user's profile row and tell whether they already have an operation in progress.
+
+        Call inside transaction.atomic(): concurrent assignments to the same
+        operator wait on the lock, so the check and the assignment that
+        follows cannot interleave. exclude_record_id skips the record being
+        reassigned.
+        """
+        from operations.models import ProcessRecord
+        in_progress = ProcessRecord.objects.filter(
+            assigned_operator=OuterRef('user'),
+            status='IN_PROGRESS'
+        ).exclude(pk=exclude_record_id)
+        return bool(
+            cls.objects.select_for_update().filter(user=user).annotate(
+                busy=Exists(in_progress)
+            ).values_list('busy', flat=True).first()
+        )
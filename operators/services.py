@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.db import transaction
+from operations.models import ProcessRecord
+from .models import UserProfile
+
+
+class AssignableOperatorCache:
+    """Cached list of active users that operations can be assigned to, as plain dicts"""
+    CACHE_KEY = 'operators:assignable_profiles:v2'
+    CACHE_TIMEOUT = 300
+
+    @staticmethod
+    def _load_profiles():
+        role_labels = dict(UserProfile.ROLE_CHOICES)
+        profiles = UserProfile.objects.filter(
+            role__in=UserProfile.FLOOR_ROLES,
+            user__is_active=True
+        ).values('user_id', 'user__username', 'user__first_name', 'user__last_name', 'role')
+        return [
+            {
+                'user_id': profile['user_id'],
+                'username': profile['user__username'],
+                'full_name': f"{profile['user__first_name']} {profile['user__last_name']}".strip(),
+                'role': profile['role'],
+                'role_display': role_labels.get(profile['role'], profile['role']),
+            }
+            for profile in profiles
+        ]
+
+    @staticmethod
+    def get_profiles():
+        """Return the assignable users, cached until a user or profile changes"""
+        return cache.get_or_set(
+            AssignableOperatorCache.CACHE_KEY,
+            AssignableOperatorCache._load_profiles,
+            AssignableOperatorCache.CACHE_TIMEOUT
+        )
+
+    @staticmethod
+    def invalidate():
+        cache.delete(AssignableOperatorCache.CACHE_KEY)
+
+
+class AvailableOperationsCache:
+    """Ids of the operations listed on the operator dashboard, cached per queue.
+
+    Operators see the unassigned pending queue; supervisors and admins see
+    every open record. Writes that change a queue call invalidate(); the
+    short timeout bounds staleness from any write that does not.
+    """
+    CACHE_KEYS = {
+        'unassigned': 'operators:available_operations:unassigned',
+        'open': 'operators:available_operations:open',
+    }
+    CACHE_TIMEOUT = 30
+    LIMIT = 10
+
+    @staticmethod
+    def queryset(user_role):
+        """Operaciones visibles en el tablero según el rol"""
+        if user_role == 'OPERATOR':
+            # Operadores solo ven operaciones sin asignar
+            queryset = ProcessRecord.objects.filter(
+                status='PENDING',
+                assigned_operator__isnull=True
+            )
+        else:
+            # Supervisores y admin ven todas las operaciones
+            queryset = ProcessRecord.objects.filter(
+                status__in=['PENDING', 'IN_PROGRESS']
+            )
+        return queryset.order_by('operation_sequence', 'created_at')
+
+    @staticmethod
+    def get_ids(user_role):
+        """Return the ids of the first LIMIT records of the role's queue, in order"""
+        queue = 'unassigned' if user_role == 'OPERATOR' else 'open'
+        return cache.get_or_set(
+            AvailableOperationsCache.CACHE_KEYS[queue],
+            lambda: list(
+                AvailableOperationsCache.queryset(user_role).values_list('id', flat=True)[:AvailableOperationsCache.LIMIT]
+            ),
+            AvailableOperationsCache.CACHE_TIMEOUT
+        )
+
+    @staticmethod
+    def invalidate():
+        """Drop both queues once the current transaction commits (right away outside one)"""
+        transaction.on_commit(
+            lambda: cache.delete_many(list(AvailableOperationsCache.CACHE_KEYS.values()))
+        )
@@ -0,0 +1,90 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from operations.models import Operation, ProcessRecord
+from operators.services import AvailableOperationsCache
+from serials.models import AuthorizedPart, SerialNumber
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CompleteOperationsBatchTests(TestCase):
+    """complete_operations_batch approves records without per-record signals"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('operador1', password='clave-segura')
+        cls.user.userprofile.role = 'OPERATOR'
+        cls.user.userprofile.save()
+        cls.first = Operation.objects.create(name='Ensamble', sequence_number=1)
+        cls.second = Operation.objects.create(name='Prueba', sequence_number=2)
+        part = AuthorizedPart.objects.create(part_number='P-100', sku='SKU-P-100', description='Parte')
+        cls.serials = [
+            SerialNumber.objects.create(
+                serial_number=f'KA001-00{n}M',
+                order_number='ORD-1',
+                authorized_part=part,
+                created_by=cls.user
+            )
+            for n in (1, 2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.assigned = ProcessRecord.objects.get(serial_number=self.serials[0], operation=self.first)
+        ProcessRecord.objects.filter(pk=self.assigned.pk).update(
+            status='IN_PROGRESS', assigned_operator=self.user
+        )
+
+    def _complete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('operators:complete_operations_batch'),
+                json.dumps({
+                    'process_record_id': self.assigned.pk,
+                    'items': [
+                        {'serial_number_id': serial.pk, 'notes': 'ok', 'quality_passed': True}
+                        for serial in self.serials
+                    ],
+                }),
+                content_type='application/json'
+            )
+
+    def test_batch_approves_records_and_refreshes_serials(self):
+        response = self._complete()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['completed'], 2)
+        records = ProcessRecord.objects.filter(serial_number__in=self.serials, operation=self.first)
+        self.assertEqual({record.status for record in records}, {'APPROVED'})
+        self.assertTrue(all(record.quality_check_passed for record in records))
+        for serial in self.serials:
+            serial.refresh_from_db()
+            self.assertEqual(serial.status, 'IN_PROCESS')
+            self.assertEqual(serial.current_sequence_completed, 1)
+            self.assertIsNone(serial.completed_at)
+
+    def test_batch_completes_serials_on_last_operation(self):
+        Operation.objects.filter(pk=self.second.pk).update(is_active=False)
+
+        self._complete()
+
+        for serial in self.serials:
+            serial.refresh_from_db()
+            self.assertEqual(serial.status, 'COMPLETED')
+            self.assertIsNotNone(serial.completed_at)
+
+    def test_batch_invalidates_dashboard_queues(self):
+        approved_ids = set(
+            ProcessRecord.objects.filter(serial_number=self.serials[1], operation=self.first)
+            .values_list('id', flat=True)
+        )
+        self.assertTrue(approved_ids & set(AvailableOperationsCache.get_ids('OPERATOR')))
+
+        self._complete()
+
+        self.assertFalse(approved_ids & set(AvailableOperationsCache.get_ids('OPERATOR')))
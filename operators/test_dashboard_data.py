@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+
+class OperatorDashboardDataTests(TestCase):
+    """JSON operator dashboard answers in JSON for every role"""
+
+    def _login(self, role):
+        user = User.objects.create_user(f'usuario_{role.lower()}', password='clave-segura')
+        user.userprofile.role = role
+        user.userprofile.save()
+        self.client.force_login(user)
+
+    def test_operator_gets_dashboard_data(self):
+        self._login('OPERATOR')
+
+        response = self.client.get(reverse('operators:operator_dashboard_data'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user_role'], 'OPERATOR')
+
+    def test_non_floor_roles_get_json_403(self):
+        for role in ['REPAIRER', 'QUALITY']:
+            with self.subTest(role=role):
+                self._login(role)
+
+                response = self.client.get(reverse('operators:operator_dashboard_data'))
+
+                self.assertEqual(response.status_code, 403)
+                self.assertFalse(response.json()['success'])
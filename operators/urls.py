@@ -9,12 +9,14 @@ urlpatterns = [
     
     # Operator dashboard and operations
     path('', views.operator_dashboard, name='operator_dashboard'),
+    path('api/dashboard/', views.operator_dashboard_data, name='operator_dashboard_data'),
     path('operation/<int:process_record_id>/', views.operation_work_view, name='operation_work_view'),
     path('operation/<int:process_record_id>/detail/', views.operation_detail, name='operation_detail'),
     
     # API endpoints
     path('api/assign/', views.assign_operation, name='assign_operation'),
     path('api/complete/', views.complete_operation, name='complete_operation'),
+    path('api/complete-batch/', views.complete_operations_batch, name='complete_operations_batch'),
     path('api/reject/', views.reject_serial_number, name='reject_serial_number'),
     path('api/release/', views.release_operation, name='release_operation'),
     path('api/reassign/', views.reassign_operation, name='reassign_operation'),
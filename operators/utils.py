@@ -0,0 +1,57 @@
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON when installed
+    orjson = None
+
+
+def load_json_body(request):
+    """Parse a JSON request body, using orjson when it is available.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    handle malformed bodies the same way with either parser.
+    """
+    if orjson is not None:
+        return orjson.loads(request.body)
+    return json.loads(request.body)
+
+
+class _FullPrecisionJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that writes datetimes exactly like orjson (full isoformat)"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dumps_json(value):
+    """Serialize a value to JSON bytes, using orjson when it is available.
+
+    Datetimes are written in ISO 8601 with microseconds by either encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, cls=_FullPrecisionJSONEncoder).encode()
+
+
+def json_response(data, status=200):
+    """JSON HttpResponse encoded with dumps_json (orjson when available)"""
+    return HttpResponse(dumps_json(data), status=status, content_type='application/json')
+
+
+def stream_json_list(key, rows):
+    """Yield the document {"<key>": [rows...]} one row at a time.
+
+    Meant for StreamingHttpResponse, so large listings are encoded as the
+    rows come out of a queryset iterator instead of being built in memory.
+    """
+    yield b'{' + dumps_json(key) + b': ['
+    for index, row in enumerate(rows):
+        yield (b', ' if index else b'') + dumps_json(row)
+    yield b']}'
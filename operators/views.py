@@ -1,23 +1,33 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery, Window
 from django.views.decorators.http import require_POST
 from django.contrib.auth.models import User
 from operations.models import ProcessRecord, Operation
 from serials.models import SerialNumber
 from defects.models import Defect
 from .models import UserProfile
-from .decorators import operator_required, supervisor_or_admin_required
+from .decorators import (
+    operator_required, supervisor_or_admin_required, json_errors, json_body, clean_fields, InvalidPayload
+)
 from .forms import LoginForm
-import json
+from .services import AvailableOperationsCache
 
 
-def login_view(request):
-    """Login view"""
+async def login_view(request):
+    """Login view.
+
+    Async so the password hash check runs in a worker thread instead of
+    holding the event loop (under ASGI); database and session access go
+    through sync_to_async.
+    """
+    # UserRoleMiddleware (sync) already resolved request.user
     if request.user.is_authenticated:
         return redirect('analytics:dashboard')
     
@@ -27,9 +37,12 @@ def login_view(request):
             username = form.cleaned_data['username']
             password = form.cleaned_data['password']
             
-            user = authenticate(request, username=username, password=password)
+            # thread_sensitive=False: concurrent logins hash in parallel
+            user = await sync_to_async(authenticate, thread_sensitive=False)(
+                request, username=username, password=password
+            )
             if user is not None:
-                login(request, user)
+                await sync_to_async(login)(request, user)
                 next_url = request.GET.get('next', 'analytics:dashboard')
                 return redirect(next_url)
             else:
@@ -37,7 +50,7 @@ def login_view(request):
     else:
         form = LoginForm()
     
-    return render(request, 'operators/login.html', {'form': form})
+    return await sync_to_async(render)(request, 'operators/login.html', {'form': form})
 
 
 @login_required
@@ -48,12 +61,23 @@ def logout_view(request):
     return redirect('operators:login')
 
 
+def _completed_operations(user):
+    """Historial de operaciones completadas por el operador; el total se
+    calcula en la misma consulta con una ventana sobre todas las filas"""
+    return ProcessRecord.objects.filter(
+        processed_by=user,
+        status='APPROVED'
+    ).annotate(
+        total_completed=Window(Count('id'))
+    ).order_by('-completed_at')
+
+
 @login_required
 @operator_required
 def operator_dashboard(request):
     """Dashboard principal para operadores"""
     user = request.user
-    user_role = user.userprofile.role
+    user_role = request.user_role
     
     # Operación actualmente asignada
     current_assignment = ProcessRecord.objects.filter(
@@ -61,33 +85,27 @@ def operator_dashboard(request):
         status='IN_PROGRESS'
     ).select_related('serial_number', 'operation', 'serial_number__authorized_part').first()
     
-    if user_role == 'OPERATOR':
-        # Operadores solo ven operaciones sin asignar
-        available_operations = ProcessRecord.objects.filter(
-            status='PENDING',
-            assigned_operator__isnull=True
-        ).select_related('serial_number', 'operation', 'serial_number__authorized_part').order_by(
-            'operation__sequence_number', 'created_at'
-        )[:10]
-    else:
-        # Supervisores y admin ven todas las operaciones
-        available_operations = ProcessRecord.objects.filter(
-            status__in=['PENDING', 'IN_PROGRESS']
-        ).select_related('serial_number', 'operation', 'serial_number__authorized_part', 'assigned_operator').order_by(
-            'operation__sequence_number', 'created_at'
-        )[:10]
+    # Ids de la cola en caché; las filas se cargan por pk con solo las
+    # columnas que muestra la plantilla (sin notas ni motivos de rechazo)
+    available_ids = AvailableOperationsCache.get_ids(user_role)
+    available_records = ProcessRecord.objects.select_related(
+        'serial_number', 'operation', 'serial_number__authorized_part', 'assigned_operator'
+    ).only(
+        'id', 'status',
+        'operation__name', 'operation__description',
+        'serial_number__serial_number', 'serial_number__authorized_part__part_number',
+        'assigned_operator__username', 'assigned_operator__first_name', 'assigned_operator__last_name'
+    ).in_bulk(available_ids)
+    available_operations = [available_records[pk] for pk in available_ids if pk in available_records]
     
-    # Historial de operaciones completadas por el operador
-    completed_operations = ProcessRecord.objects.filter(
-        processed_by=user,
-        status='APPROVED'
-    ).select_related('serial_number', 'operation').order_by('-completed_at')[:5]
+    completed_operations = list(
+        _completed_operations(user).select_related('serial_number', 'operation').only(
+            'id', 'completed_at', 'operation__name', 'serial_number__serial_number'
+        )[:5]
+    )
     
     # Estadísticas del operador
-    total_completed = ProcessRecord.objects.filter(
-        processed_by=user,
-        status='APPROVED'
-    ).count()
+    total_completed = completed_operations[0].total_completed if completed_operations else 0
     
     context = {
         'current_assignment': current_assignment,
@@ -100,12 +118,54 @@ def operator_dashboard(request):
     return render(request, 'operators/operator_dashboard.html', context)
 
 
+@login_required
+def operator_dashboard_data(request):
+    """Datos del tablero del operador en JSON, sin renderizar la plantilla"""
+    # Respuesta JSON en lugar de la redirección HTML de operator_required
+    if request.user_role not in UserProfile.FLOOR_ROLES:
+        return JsonResponse({
+            'success': False,
+            'message': 'No tienes permisos para acceder a esta sección.'
+        }, status=403)
+    
+    user = request.user
+    
+    current_assignment = ProcessRecord.objects.filter(
+        assigned_operator=user,
+        status='IN_PROGRESS'
+    ).values(
+        'id', 'status', 'serial_number__serial_number', 'operation__name', 'operation_sequence'
+    ).first()
+    
+    available_ids = AvailableOperationsCache.get_ids(request.user_role)
+    available_rows = {
+        row['id']: row
+        for row in ProcessRecord.objects.filter(id__in=available_ids).values(
+            'id', 'status', 'serial_number__serial_number', 'operation__name',
+            'operation_sequence', 'assigned_operator__username'
+        )
+    }
+    available_operations = [available_rows[pk] for pk in available_ids if pk in available_rows]
+    
+    completed_operations = list(_completed_operations(user).values(
+        'id', 'serial_number__serial_number', 'operation__name', 'completed_at', 'total_completed'
+    )[:5])
+    
+    return JsonResponse({
+        'current_assignment': current_assignment,
+        'available_operations': available_operations,
+        'completed_operations': completed_operations,
+        'total_completed': completed_operations[0]['total_completed'] if completed_operations else 0,
+        'user_role': request.user_role,
+    })
+
+
 @login_required
 @operator_required
 def operation_work_view(request, process_record_id):
     """Vista de trabajo para una operación específica con selección de números de serie"""
     process_record = get_object_or_404(
-        ProcessRecord, 
+        ProcessRecord.objects.select_related('operation'),
         id=process_record_id,
         assigned_operator=request.user,
         status='IN_PROGRESS'
@@ -113,27 +173,32 @@ def operation_work_view(request, process_record_id):
     
     operation = process_record.operation
     
-    available_serials = SerialNumber.objects.filter(
-        status__in=['IN_PROCESS', 'CREATED'],
-        process_records__operation__sequence_number__lt=operation.sequence_number,
-        process_records__status='APPROVED'
-    ).exclude(
-        process_records__operation=operation,
-        process_records__status__in=['APPROVED', 'IN_PROGRESS']
-    ).exclude(
-        defects__status__in=['OPEN', 'IN_REPAIR']
-    ).distinct().select_related('authorized_part').order_by()  # Clear any default ordering
+    # Excluir los que ya están aprobados o en progreso en esta operación
+    already_here = ProcessRecord.objects.filter(
+        serial_number=OuterRef('pk'),
+        operation=operation,
+        status__in=['APPROVED', 'IN_PROGRESS']
+    )
     
+    # Números de serie cuya operación aprobada más alta es anterior a esta
+    # (columnas desnormalizadas en SerialNumber); la primera operación
+    # también acepta números de serie recién creados
     if operation.sequence_number == 1:
-        first_op_serials = SerialNumber.objects.filter(
-            status='CREATED'
-        ).exclude(
-            defects__status__in=['OPEN', 'IN_REPAIR']
-        ).select_related('authorized_part').order_by()  # Clear any default ordering
-        
-        available_serials = available_serials.union(first_op_serials).order_by('serial_number')
+        # Ninguna operación es anterior a la primera: solo aplica la rama de recién creados
+        available_q = Q(status='CREATED')
     else:
-        available_serials = available_serials.order_by('serial_number')
+        available_q = Q(
+            status__in=['IN_PROCESS', 'CREATED'],
+            current_sequence_completed__gt=0,
+            current_sequence_completed__lt=operation.sequence_number
+        )
+    
+    available_serials = SerialNumber.objects.filter(
+        available_q, ~Exists(already_here), has_open_defect=False
+    ).select_related('authorized_part').only(
+        'id', 'serial_number', 'status',
+        'authorized_part__part_number', 'authorized_part__sku', 'authorized_part__description'
+    ).order_by('serial_number')
     
     context = {
         'process_record': process_record,
@@ -147,292 +212,393 @@ def operation_work_view(request, process_record_id):
 @login_required
 @operator_required
 @require_POST
+@json_errors('Error al asignar operación')
+@json_body(process_record_id=int, target_user_id=(int, None))
 def assign_operation(request):
     """Asignar una operación al operador actual o a otro operador (solo supervisores/admin)"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        target_user_id = data.get('target_user_id')
+    process_record_id = request.json['process_record_id']
+    target_user_id = request.json['target_user_id']
+    
+    user_role = request.user_role
+    
+    with transaction.atomic():
+        # Lock the row so concurrent assigners serialize on it
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_for_update(of=('self',)).select_related('operation', 'serial_number'),
+            id=process_record_id
+        )
         
-        user_role = request.user.userprofile.role
+        if target_user_id and user_role in UserProfile.ELEVATED_ROLES:
+            target_user = get_object_or_404(User.objects.select_related('userprofile'), id=target_user_id)
+            # userprofile comes from the select_related JOIN (None if missing)
+            target_user_profile = getattr(target_user, 'userprofile', None)
+            if target_user_profile is None or target_user_profile.role not in UserProfile.FLOOR_ROLES:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'El usuario seleccionado no es un operador válido.'
+                })
+        else:
+            target_user = request.user
         
-        with transaction.atomic():
-            process_record = get_object_or_404(ProcessRecord, id=process_record_id)
-            
-            if target_user_id and user_role in ['SUPERVISOR', 'ADMIN']:
-                target_user = get_object_or_404(User, id=target_user_id)
-                if not hasattr(target_user, 'userprofile') or target_user.userprofile.role not in ['OPERATOR', 'SUPERVISOR', 'ADMIN']:
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'El usuario seleccionado no es un operador válido.'
-                    })
-            else:
-                target_user = request.user
+        if user_role == 'OPERATOR':
+            if process_record.assigned_operator_id is not None:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Esta operación ya está asignada a otro operador.'
+                })
             
-            if user_role == 'OPERATOR':
-                if process_record.assigned_operator is not None:
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'Esta operación ya está asignada a otro operador.'
-                    })
-                
-                if ProcessRecord.objects.filter(assigned_operator=target_user, status='IN_PROGRESS').exists():
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'Ya tienes una operación en progreso. Complétala o libérala primero.'
-                    })
-            
-            process_record.assigned_operator = target_user
-            process_record.status = 'IN_PROGRESS'
-            process_record.started_at = timezone.now()
-            process_record.assigned_at = timezone.now()
-            process_record.save()
-            
-            if process_record.serial_number.status == 'CREATED':
-                process_record.serial_number.status = 'IN_PROCESS'
-                process_record.serial_number.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Operación {process_record.operation.name} asignada a {target_user.get_full_name() or target_user.username}.'
-            })
-            
-    except Exception as e:
+            if UserProfile.has_operation_in_progress(target_user):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Ya tienes una operación en progreso. Complétala o libérala primero.'
+                })
+        
+        now = timezone.now()
+        ProcessRecord.objects.filter(pk=process_record.pk).update(
+            assigned_operator=target_user,
+            status='IN_PROGRESS',
+            started_at=now,
+            assigned_at=now,
+            updated_at=now
+        )
+        AvailableOperationsCache.invalidate()
+        
+        serial_number = process_record.serial_number
+        if serial_number.status == 'CREATED':
+            serial_number.status = 'IN_PROCESS'
+            serial_number.save(update_fields=['status', 'updated_at'])
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al asignar operación: {str(e)}'
+            'success': True,
+            'message': f'Operación {process_record.operation.name} asignada a {target_user.get_full_name() or target_user.username}.'
         })
 
 
 @login_required
 @supervisor_or_admin_required
 @require_POST
+@json_errors('Error al reasignar operación')
+@json_body(process_record_id=int, new_operator_id=(int, None))
 def reassign_operation(request):
     """Reasignar una operación a otro operador (solo supervisores/admin)"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        new_operator_id = data.get('new_operator_id')
+    process_record_id = request.json['process_record_id']
+    new_operator_id = request.json['new_operator_id']
+    
+    with transaction.atomic():
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_for_update(of=('self',)).select_related('operation'),
+            id=process_record_id
+        )
         
-        with transaction.atomic():
-            process_record = get_object_or_404(ProcessRecord, id=process_record_id)
-            
-            if new_operator_id:
-                new_operator = get_object_or_404(User, id=new_operator_id)
-                if not hasattr(new_operator, 'userprofile') or new_operator.userprofile.role not in ['OPERATOR', 'SUPERVISOR', 'ADMIN']:
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'El usuario seleccionado no es un operador válido.'
-                    })
-                
-                if new_operator.userprofile.role == 'OPERATOR' and ProcessRecord.objects.filter(assigned_operator=new_operator, status='IN_PROGRESS').exists():
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'El operador seleccionado ya tiene una operación en progreso.'
-                    })
-                
-                process_record.assigned_operator = new_operator
-                process_record.assigned_at = timezone.now()
-                message = f'Operación reasignada a {new_operator.get_full_name() or new_operator.username}.'
-            else:
-                process_record.assigned_operator = None
-                process_record.status = 'PENDING'
-                process_record.started_at = None
-                process_record.assigned_at = None
-                message = 'Operación liberada correctamente.'
+        now = timezone.now()
+        if new_operator_id:
+            new_operator = get_object_or_404(User.objects.select_related('userprofile'), id=new_operator_id)
+            # userprofile comes from the select_related JOIN (None if missing)
+            new_operator_profile = getattr(new_operator, 'userprofile', None)
+            if new_operator_profile is None or new_operator_profile.role not in UserProfile.FLOOR_ROLES:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'El usuario seleccionado no es un operador válido.'
+                })
             
-            process_record.save()
+            if new_operator_profile.role == 'OPERATOR' and UserProfile.has_operation_in_progress(new_operator, exclude_record_id=process_record.pk):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'El operador seleccionado ya tiene una operación en progreso.'
+                })
             
-            return JsonResponse({
-                'success': True,
-                'message': message
-            })
-            
-    except Exception as e:
+            changes = {
+                'assigned_operator': new_operator,
+                'assigned_at': now,
+            }
+            message = f'Operación reasignada a {new_operator.get_full_name() or new_operator.username}.'
+        else:
+            changes = {
+                'assigned_operator': None,
+                'status': 'PENDING',
+                'started_at': None,
+                'assigned_at': None,
+            }
+            message = 'Operación liberada correctamente.'
+        
+        ProcessRecord.objects.filter(pk=process_record.pk).update(updated_at=now, **changes)
+        AvailableOperationsCache.invalidate()
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al reasignar operación: {str(e)}'
+            'success': True,
+            'message': message
         })
 
 
 @login_required
 @operator_required
 @require_POST
+@json_errors('Error al completar operación')
+@json_body(process_record_id=int, serial_number_id=int, notes=(str, ''), quality_passed=(bool, False))
 def complete_operation(request):
     """Completar la operación para un número de serie específico"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        serial_number_id = data.get('serial_number_id')
-        notes = data.get('notes', '')
-        quality_passed = data.get('quality_passed', False)
+    process_record_id = request.json['process_record_id']
+    serial_number_id = request.json['serial_number_id']
+    notes = request.json['notes']
+    quality_passed = request.json['quality_passed']
+    
+    with transaction.atomic():
+        # El registro asignado y el número de serie destino en una sola consulta
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation').annotate(
+                target_serial=Subquery(
+                    SerialNumber.objects.filter(pk=serial_number_id).values('serial_number')[:1]
+                )
+            ),
+            id=process_record_id,
+            assigned_operator=request.user,
+            status='IN_PROGRESS'
+        )
         
-        with transaction.atomic():
-            process_record = get_object_or_404(
-                ProcessRecord, 
-                id=process_record_id,
-                assigned_operator=request.user,
-                status='IN_PROGRESS'
-            )
-            
-            serial_number = get_object_or_404(SerialNumber, id=serial_number_id)
-            
-            specific_record, created = ProcessRecord.objects.get_or_create(
-                serial_number=serial_number,
+        if process_record.target_serial is None:
+            raise Http404('Número de serie no encontrado')
+        
+        now = timezone.now()
+        approved_fields = {
+            'status': 'APPROVED',
+            'processed_by': request.user,
+            'completed_at': now,
+            'notes': notes,
+            'quality_check_passed': quality_passed,
+            'updated_at': now,
+        }
+        updated = ProcessRecord.objects.filter(
+            serial_number_id=serial_number_id,
+            operation=process_record.operation
+        ).update(**approved_fields)
+        AvailableOperationsCache.invalidate()
+        
+        if not updated:
+            ProcessRecord.objects.create(
+                serial_number_id=serial_number_id,
                 operation=process_record.operation,
-                defaults={
-                    'status': 'APPROVED',
-                    'processed_by': request.user,
-                    'assigned_operator': request.user,
-                    'started_at': timezone.now(),
-                    'completed_at': timezone.now(),
-                    'assigned_at': timezone.now(),
-                    'notes': notes,
-                    'quality_check_passed': quality_passed,
-                }
+                assigned_operator=request.user,
+                started_at=now,
+                assigned_at=now,
+                **approved_fields
             )
-            
-            if not created:
-                specific_record.status = 'APPROVED'
-                specific_record.completed_at = timezone.now()
-                specific_record.processed_by = request.user
-                specific_record.notes = notes
-                specific_record.quality_check_passed = quality_passed
-                specific_record.save()
-            
-            total_operations = Operation.objects.filter(is_active=True).count()
-            completed_operations = serial_number.process_records.filter(status='APPROVED').count()
-            
-            if completed_operations >= total_operations:
-                serial_number.status = 'COMPLETED'
-                serial_number.completed_at = timezone.now()
-                serial_number.save()
-            else:
-                serial_number.status = 'IN_PROCESS'
-                serial_number.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Operación {process_record.operation.name} completada para {serial_number.serial_number}.'
-            })
-            
-    except Exception as e:
+        # Estado, fecha de término y progreso del número de serie en un solo
+        # UPDATE (update() omite la señal post_save)
+        SerialNumber.refresh_completion([serial_number_id], now)
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al completar operación: {str(e)}'
+            'success': True,
+            'message': f'Operación {process_record.operation.name} completada para {process_record.target_serial}.'
         })
 
 
+# Campos de cada número de serie en complete_operations_batch
+BATCH_ITEM_FIELDS = {'serial_number_id': int, 'notes': (str, ''), 'quality_passed': (bool, False)}
+BATCH_LIMIT = 100
+
+
 @login_required
 @operator_required
 @require_POST
-def reject_serial_number(request):
-    """Rechazar un número de serie y crear un defecto"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
-        serial_number_id = data.get('serial_number_id')
-        defect_type = data.get('defect_type', 'OTHER')
-        rejection_reason = data.get('rejection_reason', '')
+@json_errors('Error al completar operaciones')
+@json_body(process_record_id=int, items=list)
+def complete_operations_batch(request):
+    """Completar la operación asignada para varios números de serie en una sola transacción"""
+    process_record_id = request.json['process_record_id']
+    items = [clean_fields(item, BATCH_ITEM_FIELDS) for item in request.json['items']]
+    if not items or len(items) > BATCH_LIMIT:
+        raise InvalidPayload(f'se esperaban entre 1 y {BATCH_LIMIT} números de serie.')
+    
+    items_by_serial = {item['serial_number_id']: item for item in items}
+    if len(items_by_serial) != len(items):
+        raise InvalidPayload('hay números de serie repetidos.')
+    serial_ids = list(items_by_serial)
+    
+    with transaction.atomic():
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation'),
+            id=process_record_id,
+            assigned_operator=request.user,
+            status='IN_PROGRESS'
+        )
+        operation = process_record.operation
+        
+        if SerialNumber.objects.filter(pk__in=serial_ids).count() != len(serial_ids):
+            raise Http404('Número de serie no encontrado')
         
-        with transaction.atomic():
-            process_record = get_object_or_404(
-                ProcessRecord, 
-                id=process_record_id,
+        now = timezone.now()
+        existing = ProcessRecord.objects.select_for_update().filter(
+            serial_number_id__in=serial_ids,
+            operation=operation
+        )
+        to_update = []
+        for record in existing:
+            item = items_by_serial[record.serial_number_id]
+            record.status = 'APPROVED'
+            record.processed_by = request.user
+            record.completed_at = now
+            record.notes = item['notes']
+            record.quality_check_passed = item['quality_passed']
+            record.updated_at = now
+            to_update.append(record)
+        
+        updated_serials = {record.serial_number_id for record in to_update}
+        to_create = [
+            ProcessRecord(
+                serial_number_id=serial_id,
+                operation=operation,
+                operation_sequence=operation.sequence_number,
+                status='APPROVED',
                 assigned_operator=request.user,
-                status='IN_PROGRESS'
-            )
-            
-            serial_number = get_object_or_404(SerialNumber, id=serial_number_id)
-            
-            defect = Defect.objects.create(
-                serial_number=serial_number,
-                operation=process_record.operation,
-                defect_type=defect_type,
-                description=rejection_reason,
-                status='OPEN',
-                reported_by=request.user
+                processed_by=request.user,
+                started_at=now,
+                assigned_at=now,
+                completed_at=now,
+                notes=item['notes'],
+                quality_check_passed=item['quality_passed']
             )
-            
-            serial_number.status = 'DEFECTIVE'
-            serial_number.save()
-            
-            specific_record, created = ProcessRecord.objects.get_or_create(
-                serial_number=serial_number,
-                operation=process_record.operation,
-                defaults={
-                    'status': 'REJECTED',
-                    'processed_by': request.user,
-                    'assigned_operator': request.user,
-                    'started_at': timezone.now(),
-                    'completed_at': timezone.now(),
-                    'assigned_at': timezone.now(),
-                    'rejection_reason': rejection_reason,
-                    'defect_type': defect_type,
-                }
-            )
-            
-            if not created:
-                specific_record.status = 'REJECTED'
-                specific_record.completed_at = timezone.now()
-                specific_record.processed_by = request.user
-                specific_record.rejection_reason = rejection_reason
-                specific_record.defect_type = defect_type
-                specific_record.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Número de serie {serial_number.serial_number} rechazado. Defecto creado: #{defect.id}'
-            })
-            
-    except Exception as e:
+            for serial_id, item in items_by_serial.items()
+            if serial_id not in updated_serials
+        ]
+        
+        ProcessRecord.objects.bulk_update(
+            to_update,
+            ['status', 'processed_by', 'completed_at', 'notes', 'quality_check_passed', 'updated_at']
+        )
+        ProcessRecord.objects.bulk_create(to_create)
+        # bulk_update/bulk_create omiten las señales: estado y progreso en un solo UPDATE
+        SerialNumber.refresh_completion(serial_ids, now)
+        AvailableOperationsCache.invalidate()
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al rechazar número de serie: {str(e)}'
+            'success': True,
+            'completed': len(serial_ids),
+            'message': f'Operación {operation.name} completada para {len(serial_ids)} números de serie.'
         })
 
 
 @login_required
 @operator_required
 @require_POST
-def release_operation(request):
-    """Liberar la operación asignada al operador"""
-    try:
-        data = json.loads(request.body)
-        process_record_id = data.get('process_record_id')
+@json_errors('Error al rechazar número de serie')
+@json_body(process_record_id=int, serial_number_id=int, defect_type=(str, 'OTHER'), rejection_reason=(str, ''))
+def reject_serial_number(request):
+    """Rechazar un número de serie y crear un defecto"""
+    process_record_id = request.json['process_record_id']
+    serial_number_id = request.json['serial_number_id']
+    defect_type = request.json['defect_type']
+    rejection_reason = request.json['rejection_reason']
+    
+    with transaction.atomic():
+        # El registro asignado y el número de serie destino en una sola consulta
+        process_record = get_object_or_404(
+            ProcessRecord.objects.select_related('operation').annotate(
+                target_serial=Subquery(
+                    SerialNumber.objects.filter(pk=serial_number_id).values('serial_number')[:1]
+                )
+            ),
+            id=process_record_id,
+            assigned_operator=request.user,
+            status='IN_PROGRESS'
+        )
+        
+        if process_record.target_serial is None:
+            raise Http404('Número de serie no encontrado')
+        
+        defect = Defect.objects.create(
+            serial_number_id=serial_number_id,
+            operation=process_record.operation,
+            defect_type=defect_type,
+            description=rejection_reason,
+            status='OPEN',
+            reported_by=request.user
+        )
+        
+        now = timezone.now()
+        SerialNumber.objects.filter(pk=serial_number_id).update(
+            status='DEFECTIVE',
+            updated_at=now
+        )
         
-        with transaction.atomic():
-            process_record = get_object_or_404(
-                ProcessRecord, 
-                id=process_record_id,
+        rejected_fields = {
+            'status': 'REJECTED',
+            'processed_by': request.user,
+            'completed_at': now,
+            'rejection_reason': rejection_reason,
+            'defect_type': defect_type,
+            'updated_at': now,
+        }
+        updated = ProcessRecord.objects.filter(
+            serial_number_id=serial_number_id,
+            operation=process_record.operation
+        ).update(**rejected_fields)
+        AvailableOperationsCache.invalidate()
+        
+        if not updated:
+            ProcessRecord.objects.create(
+                serial_number_id=serial_number_id,
+                operation=process_record.operation,
                 assigned_operator=request.user,
-                status='IN_PROGRESS'
+                started_at=now,
+                assigned_at=now,
+                **rejected_fields
             )
-            
-            process_record.assigned_operator = None
-            process_record.status = 'PENDING'
-            process_record.started_at = None
-            process_record.assigned_at = None
-            process_record.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Operación {process_record.operation.name} liberada correctamente.'
-            })
-            
-    except Exception as e:
+        SerialNumber.refresh_progress([serial_number_id])
+        
         return JsonResponse({
-            'success': False,
-            'message': f'Error al liberar operación: {str(e)}'
+            'success': True,
+            'message': f'Número de serie {process_record.target_serial} rechazado. Defecto creado: #{defect.id}'
         })
 
 
+@login_required
+@operator_required
+@require_POST
+@json_errors('Error al liberar operación')
+@json_body(process_record_id=int)
+def release_operation(request):
+    """Liberar la operación asignada al operador"""
+    process_record_id = request.json['process_record_id']
+    
+    # Un solo UPDATE condicionado: solo libera si sigue asignada a este operador
+    released = ProcessRecord.objects.filter(
+        id=process_record_id,
+        assigned_operator=request.user,
+        status='IN_PROGRESS'
+    ).update(
+        assigned_operator=None,
+        status='PENDING',
+        started_at=None,
+        assigned_at=None,
+        updated_at=timezone.now()
+    )
+    if not released:
+        raise Http404('Operación no encontrada')
+    AvailableOperationsCache.invalidate()
+    
+    operation_name = Operation.objects.filter(
+        processrecord__id=process_record_id
+    ).values_list('name', flat=True).first()
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'Operación {operation_name} liberada correctamente.'
+    })
+
+
 @login_required
 @operator_required
 def operation_detail(request, process_record_id):
     """Vista detallada de una operación específica"""
     process_record = get_object_or_404(
-        ProcessRecord, 
+        ProcessRecord.objects.select_related(
+            'operation', 'serial_number__authorized_part', 'assigned_operator'
+        ).prefetch_related(
+            Prefetch(
+                'serial_number__process_records',
+                queryset=ProcessRecord.objects.select_related('operation')
+            )
+        ),
         id=process_record_id,
         assigned_operator=request.user,
         status='IN_PROGRESS'
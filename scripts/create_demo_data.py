@@ -11,7 +11,7 @@ python scripts/create_demo_data.py
 import os
 import sys
 import django
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.utils import timezone
 
 # Configurar Django
@@ -19,12 +19,22 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manufacturing_system.settings')
 django.setup()
 
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractHour, ExtractMinute
 from django.contrib.auth.models import User
 from operators.models import UserProfile
+from operators.services import AssignableOperatorCache
 from serials.models import AuthorizedPart, SerialNumber
+from serials.services import AuthorizedPartCache
 from operations.models import Operation, ProcessRecord
 from defects.models import Defect
 
+# Filas por INSERT/UPDATE en las operaciones masivas; ajustable por entorno
+BATCH_SIZE = int(os.environ.get('DEMO_BULK_BATCH_SIZE', 500))
+
 
 def create_users():
     """Crear usuarios con diferentes roles"""
@@ -134,42 +144,60 @@ def create_users():
         }
     ]
     
-    created_users = {}
+    usernames = [user_data['username'] for user_data in users_data]
+    existing = set(
+        User.objects.filter(username__in=usernames).values_list('username', flat=True)
+    )
     
-    for user_data in users_data:
-        # Crear o actualizar usuario
-        user, created = User.objects.get_or_create(
+    # Crear los usuarios faltantes en un solo INSERT. Cada contraseña
+    # distinta se hashea una sola vez y el hash se reutiliza
+    missing = [user_data for user_data in users_data if user_data['username'] not in existing]
+    password_hashes = {
+        password: make_password(password)
+        for password in {user_data['password'] for user_data in missing}
+    }
+    new_users = [
+        User(
             username=user_data['username'],
-            defaults={
-                'first_name': user_data['first_name'],
-                'last_name': user_data['last_name'],
-                'email': user_data['email'],
-                'is_staff': user_data.get('is_staff', False),
-                'is_superuser': user_data.get('is_superuser', False),
-            }
+            password=password_hashes[user_data['password']],
+            first_name=user_data['first_name'],
+            last_name=user_data['last_name'],
+            email=user_data['email'],
+            is_staff=user_data.get('is_staff', False),
+            is_superuser=user_data.get('is_superuser', False),
         )
-        
-        if created:
-            user.set_password(user_data['password'])
-            user.save()
-            print(f"  ✅ Usuario creado: {user.username}")
+        for user_data in missing
+    ]
+    User.objects.bulk_create(new_users, batch_size=BATCH_SIZE)
+    
+    users_by_name = User.objects.in_bulk(usernames, field_name='username')
+    created_users = {}
+    for username in usernames:
+        if username in existing:
+            print(f"  ℹ️  Usuario existente: {username}")
         else:
-            print(f"  ℹ️  Usuario existente: {user.username}")
-        
-        # Crear o actualizar perfil
-        profile_data = user_data['profile']
-        profile, profile_created = UserProfile.objects.get_or_create(
-            user=user,
-            defaults=profile_data
-        )
-        
-        if not profile_created:
-            # Actualizar perfil existente
-            for key, value in profile_data.items():
-                setattr(profile, key, value)
-            profile.save()
-        
-        created_users[user_data['username']] = user
+            print(f"  ✅ Usuario creado: {username}")
+        created_users[username] = users_by_name[username]
+    
+    # bulk_create no dispara la señal que crea el perfil: crear o
+    # actualizar todos los perfiles en un solo upsert
+    profiles = [
+        UserProfile(user_id=created_users[user_data['username']].id, **user_data['profile'])
+        for user_data in users_data
+    ]
+    UserProfile.objects.bulk_create(
+        profiles,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=[
+            'employee_id', 'role', 'department', 'phone',
+            'can_approve_operations', 'can_generate_serials',
+            'can_view_statistics', 'can_manage_users', 'updated_at',
+        ]
+    )
+    # Tampoco se disparan las señales que invalidan la lista de operadores
+    AssignableOperatorCache.invalidate()
     
     return created_users
 
@@ -211,30 +239,32 @@ def create_authorized_parts():
         }
     ]
     
-    created_parts = {}
+    part_numbers = [part_data['part_number'] for part_data in parts_data]
+    existing = set(
+        AuthorizedPart.objects.filter(part_number__in=part_numbers).values_list('part_number', flat=True)
+    )
     
-    for part_data in parts_data:
-        part, created = AuthorizedPart.objects.get_or_create(
-            part_number=part_data['part_number'],
-            defaults={
-                'sku': part_data['sku'],
-                'description': part_data['description'],
-                'revision': part_data['revision'],
-                'is_active': True
-            }
-        )
-        
-        if not created and not hasattr(part, 'sku') or not part.sku:
-            part.sku = part_data['sku']
-            part.save()
-            print(f"  🔄 SKU actualizado para: {part.part_number}")
-        
-        if created:
-            print(f"  ✅ Componente creado: {part.part_number} (SKU: {part.sku})")
-        else:
+    # Un solo upsert: crea los componentes faltantes y actualiza SKU,
+    # descripción y revisión de los existentes
+    AuthorizedPart.objects.bulk_create(
+        [AuthorizedPart(is_active=True, **part_data) for part_data in parts_data],
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['part_number'],
+        update_fields=['sku', 'description', 'revision', 'is_active', 'updated_at']
+    )
+    # bulk_create no dispara la señal que invalida la lista de componentes
+    AuthorizedPartCache.invalidate()
+    
+    parts_by_number = AuthorizedPart.objects.in_bulk(part_numbers, field_name='part_number')
+    created_parts = {}
+    for part_number in part_numbers:
+        part = parts_by_number[part_number]
+        if part_number in existing:
             print(f"  ℹ️  Componente existente: {part.part_number} (SKU: {part.sku})")
-        
-        created_parts[part_data['part_number']] = part
+        else:
+            print(f"  ✅ Componente creado: {part.part_number} (SKU: {part.sku})")
+        created_parts[part_number] = part
     
     return created_parts
 
@@ -288,32 +318,38 @@ def create_operations():
         }
     ]
     
-    created_operations = {}
+    sequences = [op_data['sequence_number'] for op_data in operations_data]
+    existing = set(
+        Operation.objects.filter(sequence_number__in=sequences).values_list('sequence_number', flat=True)
+    )
     
-    for op_data in operations_data:
-        operation, created = Operation.objects.get_or_create(
-            sequence_number=op_data['sequence_number'],
-            defaults={
-                'name': op_data['name'],
-                'description': op_data['description'],
-                'estimated_time_minutes': op_data['estimated_time_minutes'],
-                'requires_approval': True,
-                'is_active': True
-            }
-        )
-        
-        if created:
-            print(f"  ✅ Operación creada: {operation.sequence_number}. {operation.name}")
-        else:
+    # Insertar solo las operaciones faltantes en un solo INSERT
+    Operation.objects.bulk_create(
+        [
+            Operation(requires_approval=True, is_active=True, **op_data)
+            for op_data in operations_data
+            if op_data['sequence_number'] not in existing
+        ],
+        batch_size=BATCH_SIZE
+    )
+    # bulk_create no dispara la señal que invalida el conteo de operaciones activas
+    cache.delete(Operation.ACTIVE_COUNT_CACHE_KEY)
+    
+    operations_by_sequence = Operation.objects.in_bulk(sequences, field_name='sequence_number')
+    created_operations = {}
+    for sequence in sequences:
+        operation = operations_by_sequence[sequence]
+        if sequence in existing:
             print(f"  ℹ️  Operación existente: {operation.sequence_number}. {operation.name}")
-        
-        created_operations[op_data['sequence_number']] = operation
+        else:
+            print(f"  ✅ Operación creada: {operation.sequence_number}. {operation.name}")
+        created_operations[sequence] = operation
     
     return created_operations
 
 
 def create_serial_numbers(users, parts):
-    """Crear números de serie que generarán ProcessRecord automáticamente"""
+    """Crear números de serie junto con sus ProcessRecord pendientes"""
     print("🏷️  Creando números de serie...")
     
     # Obtener el usuario admin para crear los seriales
@@ -357,25 +393,46 @@ def create_serial_numbers(users, parts):
         }
     ]
     
-    created_serials = []
+    serial_values = [serial_data['serial_number'] for serial_data in serial_numbers_data]
+    existing = set(
+        SerialNumber.objects.filter(serial_number__in=serial_values).values_list('serial_number', flat=True)
+    )
     
-    for serial_data in serial_numbers_data:
-        serial, created = SerialNumber.objects.get_or_create(
-            serial_number=serial_data['serial_number'],
-            defaults={
-                'order_number': serial_data['order_number'],
-                'authorized_part': main_part,
-                'status': 'IN_PROCESS',
-                'created_by': admin_user,
-            }
+    # Insertar los números de serie faltantes en un solo INSERT. Sin
+    # operaciones aprobadas el estado que calcularía la señal es CREATED
+    new_serials = SerialNumber.objects.bulk_create(
+        [
+            SerialNumber(
+                serial_number=serial_data['serial_number'],
+                order_number=serial_data['order_number'],
+                authorized_part_id=main_part.id,
+                status='CREATED',
+                created_by_id=admin_user.id,
+            )
+            for serial_data in serial_numbers_data
+            if serial_data['serial_number'] not in existing
+        ],
+        batch_size=BATCH_SIZE
+    )
+    
+    # bulk_create no dispara la señal post_save que crea los ProcessRecord:
+    # crearlos aquí, serie × operación activa, en un solo INSERT
+    if new_serials:
+        SerialNumber.initialize_process_records(
+            SerialNumber.objects.filter(
+                serial_number__in=[serial.serial_number for serial in new_serials]
+            ).values_list('id', flat=True),
+            batch_size=BATCH_SIZE
         )
-        
-        if created:
-            print(f"  ✅ Número de serie creado: {serial.serial_number}")
-            created_serials.append(serial)
+    
+    serials_by_value = SerialNumber.objects.in_bulk(serial_values, field_name='serial_number')
+    created_serials = []
+    for serial_value in serial_values:
+        if serial_value in existing:
+            print(f"  ℹ️  Número de serie existente: {serial_value}")
         else:
-            print(f"  ℹ️  Número de serie existente: {serial.serial_number}")
-            created_serials.append(serial)
+            print(f"  ✅ Número de serie creado: {serial_value}")
+        created_serials.append(serials_by_value[serial_value])
     
     return created_serials
 
@@ -387,6 +444,7 @@ def assign_some_operators(users, serials):
     # Obtener operadores
     operador1 = users['operador1']
     operador2 = users['operador2']
+    now = timezone.now()
     
     # Asignar operador1 a la primera operación del primer serial
     if serials:
@@ -399,8 +457,11 @@ def assign_some_operators(users, serials):
         if first_process and first_process.status == 'PENDING':
             first_process.assigned_operator = operador1
             first_process.status = 'IN_PROGRESS'
-            first_process.assigned_at = timezone.now()
-            first_process.save()
+            first_process.assigned_at = now
+            # started_at lo asigna la señal pre_save al pasar a IN_PROGRESS
+            first_process.save(update_fields=[
+                'assigned_operator', 'status', 'assigned_at', 'started_at', 'updated_at'
+            ])
             print(f"  ✅ {operador1.get_full_name()} asignado a {first_process}")
         
         # Asignar operador2 a la segunda operación del segundo serial
@@ -414,8 +475,10 @@ def assign_some_operators(users, serials):
             if second_process and second_process.status == 'PENDING':
                 second_process.assigned_operator = operador2
                 second_process.status = 'IN_PROGRESS'
-                second_process.assigned_at = timezone.now()
-                second_process.save()
+                second_process.assigned_at = now
+                second_process.save(update_fields=[
+                    'assigned_operator', 'status', 'assigned_at', 'started_at', 'updated_at'
+                ])
                 print(f"  ✅ {operador2.get_full_name()} asignado a {second_process}")
 
 
@@ -430,62 +493,72 @@ def create_sample_defects_by_shift(users, serials):
     calidad_user = users['calidad1']
     reparador_user = users['reparador1']
     
-    now = timezone.now()
+    hour_start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    first_shift_time = hour_start.replace(hour=8)
+    second_shift_time = hour_start.replace(hour=16)
+    late_second_shift_time = hour_start.replace(hour=18)
     
-    # Defecto en primer turno (8:00 AM)
-    first_shift_time = now.replace(hour=8, minute=0, second=0, microsecond=0)
-    defect1, created = Defect.objects.get_or_create(
-        serial_number=serials[0],
-        operation_id=3,  # Soldadura
-        defect_type='VISUAL',
-        defaults={
+    # (índice del número de serie, secuencia de la operación, tipo, mensaje, campos)
+    defects_data = [
+        (0, 3, 'VISUAL', 'Defecto primer turno creado', {  # Soldadura, 8:00 AM
             'description': 'Soldadura fría detectada en conector principal - Primer Turno',
             'status': 'OPEN',
             'reported_by': calidad_user,
             'created_at': first_shift_time,
-        }
+        }),
+        (1, 4, 'DIMENSIONAL', 'Defecto segundo turno creado', {  # Inspección Visual, 4:00 PM
+            'description': 'Dimensiones fuera de tolerancia en carcasa - Segundo Turno',
+            'status': 'IN_REPAIR',
+            'reported_by': calidad_user,
+            'assigned_repairer': reparador_user,
+            'assigned_at': second_shift_time,
+            'created_at': second_shift_time,
+        }),
+        (2, 5, 'FUNCTIONAL', 'Defecto segundo turno (tarde) creado', {  # Pruebas Eléctricas, 6:00 PM
+            'description': 'Falla en prueba de conectividad - Segundo Turno',
+            'status': 'OPEN',
+            'reported_by': calidad_user,
+            'created_at': late_second_shift_time,
+        }),
+    ]
+    
+    # Operaciones por número de secuencia en una sola consulta, en lugar de
+    # depender de sus ids
+    operation_ids = dict(
+        Operation.objects.filter(sequence_number__in=[3, 4, 5]).values_list('sequence_number', 'id')
+    )
+    existing = set(
+        Defect.objects.filter(
+            serial_number__in=serials[:3],
+            operation_id__in=operation_ids.values()
+        ).values_list('serial_number_id', 'operation_id', 'defect_type')
     )
     
-    if created:
-        print(f"  ✅ Defecto primer turno creado: {defect1}")
-    
-    # Defecto en segundo turno (4:00 PM)
-    if len(serials) > 1:
-        second_shift_time = now.replace(hour=16, minute=0, second=0, microsecond=0)
-        defect2, created = Defect.objects.get_or_create(
-            serial_number=serials[1],
-            operation_id=4,  # Inspección Visual
-            defect_type='DIMENSIONAL',
-            defaults={
-                'description': 'Dimensiones fuera de tolerancia en carcasa - Segundo Turno',
-                'status': 'IN_REPAIR',
-                'reported_by': calidad_user,
-                'assigned_repairer': reparador_user,
-                'assigned_at': second_shift_time,
-                'created_at': second_shift_time,
-            }
-        )
-        
-        if created:
-            print(f"  ✅ Defecto segundo turno creado: {defect2}")
-    
-    # Defecto adicional en segundo turno (6:00 PM)
-    if len(serials) > 2:
-        late_second_shift_time = now.replace(hour=18, minute=0, second=0, microsecond=0)
-        defect3, created = Defect.objects.get_or_create(
-            serial_number=serials[2],
-            operation_id=5,  # Pruebas Eléctricas
-            defect_type='FUNCTIONAL',
-            defaults={
-                'description': 'Falla en prueba de conectividad - Segundo Turno',
-                'status': 'OPEN',
-                'reported_by': calidad_user,
-                'created_at': late_second_shift_time,
-            }
-        )
-        
-        if created:
-            print(f"  ✅ Defecto segundo turno (tarde) creado: {defect3}")
+    new_defects = []
+    messages = []
+    for index, sequence, defect_type, message, fields in defects_data:
+        if index >= len(serials):
+            continue
+        serial = serials[index]
+        operation_id = operation_ids.get(sequence)
+        if operation_id is None or (serial.pk, operation_id, defect_type) in existing:
+            continue
+        new_defects.append(Defect(
+            serial_number=serial,
+            operation_id=operation_id,
+            defect_type=defect_type,
+            **fields
+        ))
+        messages.append(message)
+    
+    # Todos los defectos nuevos en un solo INSERT
+    Defect.objects.bulk_create(new_defects, batch_size=BATCH_SIZE)
+    for defect, message in zip(new_defects, messages):
+        print(f"  ✅ {message}: {defect}")
+    
+    # bulk_create no dispara la señal que marca has_open_defect
+    if new_defects:
+        SerialNumber.refresh_progress([defect.serial_number_id for defect in new_defects])
 
 
 def print_summary(users, parts, operations, serials):
@@ -494,10 +567,25 @@ def print_summary(users, parts, operations, serials):
     print("📊 RESUMEN DE DATOS CREADOS")
     print("="*60)
     
+    # Nombre y rol de cada usuario en una sola consulta con LEFT JOIN al
+    # perfil, como filas planas en lugar de instancias del ORM
+    user_rows = {
+        row['pk']: row
+        for row in User.objects.filter(pk__in=[user.pk for user in users.values()]).values(
+            'pk', 'first_name', 'last_name', 'userprofile__role'
+        )
+    }
+    # Números de serie con su componente en una consulta
+    serials_by_id = SerialNumber.objects.select_related('authorized_part').in_bulk(
+        [serial.pk for serial in serials]
+    )
+    serials = [serials_by_id[serial.pk] for serial in serials]
+    
     print(f"👥 Usuarios creados: {len(users)}")
     for username, user in users.items():
-        role = user.userprofile.role if hasattr(user, 'userprofile') else 'N/A'
-        print(f"   • {username} ({user.get_full_name()}) - {role}")
+        row = user_rows[user.pk]
+        full_name = f"{row['first_name']} {row['last_name']}".strip()
+        print(f"   • {username} ({full_name}) - {row['userprofile__role'] or 'N/A'}")
     
     print(f"\n📦 Componentes autorizados: {len(parts)}")
     for part in parts.values():
@@ -511,9 +599,13 @@ def print_summary(users, parts, operations, serials):
     for serial in serials:
         print(f"   • {serial.serial_number} ({serial.order_number}) - SKU: {serial.authorized_part.sku}")
     
-    # Contar ProcessRecord pendientes
-    pending_records = ProcessRecord.objects.filter(status='PENDING').count()
-    assigned_records = ProcessRecord.objects.filter(status='IN_PROGRESS').count()
+    # Contar ProcessRecord pendientes y asignados en una sola consulta
+    record_counts = ProcessRecord.objects.aggregate(
+        pending=Count('pk', filter=Q(status='PENDING')),
+        assigned=Count('pk', filter=Q(status='IN_PROGRESS')),
+    )
+    pending_records = record_counts['pending']
+    assigned_records = record_counts['assigned']
     
     print(f"\n📋 Registros de proceso:")
     print(f"   • Pendientes: {pending_records}")
@@ -521,17 +613,21 @@ def print_summary(users, parts, operations, serials):
     
     total_defects = Defect.objects.count()
     today = timezone.now().date()
-    today_defects = Defect.objects.filter(created_at__date=today)
-    
-    shift_1_count = 0
-    shift_2_count = 0
     
-    for defect in today_defects:
-        hour = defect.created_at.hour
-        if 6 <= hour < 15.5:  # 6:00 AM to 3:30 PM
-            shift_1_count += 1
-        elif 15.5 <= hour < 24:  # 3:30 PM to 12:00 AM
-            shift_2_count += 1
+    # Conteo por turno en la base de datos, comparando minutos del día para
+    # respetar el corte de las 3:30 PM (horas en UTC, igual que antes)
+    minute_of_day = (
+        ExtractHour('created_at', tzinfo=dt_timezone.utc) * 60
+        + ExtractMinute('created_at', tzinfo=dt_timezone.utc)
+    )
+    shift_counts = Defect.objects.filter(created_at__date=today).annotate(
+        minute_of_day=minute_of_day
+    ).aggregate(
+        shift_1=Count('pk', filter=Q(minute_of_day__gte=6 * 60, minute_of_day__lt=15 * 60 + 30)),  # 6:00 AM to 3:30 PM
+        shift_2=Count('pk', filter=Q(minute_of_day__gte=15 * 60 + 30)),  # 3:30 PM to 12:00 AM
+    )
+    shift_1_count = shift_counts['shift_1']
+    shift_2_count = shift_counts['shift_2']
     
     print(f"\n🔍 Defectos: {total_defects}")
     print(f"   • Primer Turno (6:00 AM - 3:30 PM): {shift_1_count}")
@@ -563,17 +659,20 @@ def main():
     print("="*60)
     
     try:
-        # Crear todos los datos necesarios
-        users = create_users()
-        parts = create_authorized_parts()
-        operations = create_operations()
-        serials = create_serial_numbers(users, parts)
-        
-        # Asignar algunos operadores para demostrar funcionalidad
-        assign_some_operators(users, serials)
-        
-        # Crear defectos de ejemplo distribuidos por turnos
-        create_sample_defects_by_shift(users, serials)
+        # Todo en una sola transacción: un solo commit en lugar de uno por
+        # INSERT, y si un paso falla no quedan datos a medias
+        with transaction.atomic():
+            # Crear todos los datos necesarios
+            users = create_users()
+            parts = create_authorized_parts()
+            operations = create_operations()
+            serials = create_serial_numbers(users, parts)
+            
+            # Asignar algunos operadores para demostrar funcionalidad
+            assign_some_operators(users, serials)
+            
+            # Crear defectos de ejemplo distribuidos por turnos
+            create_sample_defects_by_shift(users, serials)
         
         # Mostrar resumen
         print_summary(users, parts, operations, serials)
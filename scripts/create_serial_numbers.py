@@ -7,7 +7,7 @@ y distribución por turnos para testing de funcionalidades mejoradas
 import os
 import sys
 import django
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.utils import timezone
 
 # Setup Django
@@ -16,6 +16,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manufacturing_system.settings')
 django.setup()
 
 from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractHour, ExtractMinute
 from serials.models import SerialNumber, AuthorizedPart
 from operations.models import Operation, ProcessRecord
 from defects.models import Defect
@@ -38,9 +40,9 @@ def create_test_serial_numbers():
         print(f"✓ Creada parte autorizada: {authorized_part.part_number} (SKU: {authorized_part.sku})")
     else:
         # Update existing part with SKU if missing
-        if not hasattr(authorized_part, 'sku') or not authorized_part.sku:
+        if not authorized_part.sku:
             authorized_part.sku = 'SKU-TEST-PCB-001-V1'
-            authorized_part.save()
+            authorized_part.save(update_fields=['sku', 'updated_at'])
             print(f"✓ SKU actualizado para parte: {authorized_part.part_number}")
         print(f"✓ Usando parte autorizada existente: {authorized_part.part_number} (SKU: {authorized_part.sku})")
     
@@ -69,24 +71,34 @@ def create_test_serial_numbers():
     
     serial_numbers = []
     now = timezone.now()
+    # Bases de cada turno calculadas una vez; en el ciclo solo cambia la hora
+    first_shift_base = now.replace(minute=30, second=0, microsecond=0)
+    second_shift_base = now.replace(minute=15, second=0, microsecond=0)
+    
+    # Números de serie ya existentes en una sola consulta, en lugar de
+    # exists() + get() por cada uno
+    existing_serials = SerialNumber.objects.in_bulk(
+        [serial_data['serial_number'] for serial_data in serial_numbers_data],
+        field_name='serial_number'
+    )
     
     for i, serial_data in enumerate(serial_numbers_data):
         serial_number = serial_data['serial_number']
         
         # Verificar si ya existe
-        if SerialNumber.objects.filter(serial_number=serial_number).exists():
+        existing_serial = existing_serials.get(serial_number)
+        if existing_serial:
             print(f"⚠️  El número de serie {serial_number} ya existe")
-            existing_serial = SerialNumber.objects.get(serial_number=serial_number)
             serial_numbers.append(existing_serial)
             continue
         
         # Distribute creation times across both shifts
         if i % 2 == 0:
             # First shift: 6:00 AM - 3:30 PM
-            creation_time = now.replace(hour=8 + (i % 6), minute=30, second=0, microsecond=0)
+            creation_time = first_shift_base.replace(hour=8 + (i % 6))
         else:
             # Second shift: 3:30 PM - 12:00 AM
-            creation_time = now.replace(hour=16 + (i % 6), minute=15, second=0, microsecond=0)
+            creation_time = second_shift_base.replace(hour=16 + (i % 6))
         
         # Crear el número de serie
         serial = SerialNumber.objects.create(
@@ -99,7 +111,7 @@ def create_test_serial_numbers():
         
         # Update creation time to simulate shift distribution
         serial.created_at = creation_time
-        serial.save()
+        serial.save(update_fields=['created_at'])
         
         serial_numbers.append(serial)
         shift_name = "Primer Turno" if i % 2 == 0 else "Segundo Turno"
@@ -107,41 +119,57 @@ def create_test_serial_numbers():
     
     # Verificar que se crearon los ProcessRecord automáticamente
     print("\n--- Verificando ProcessRecord creados ---")
+    # Conteos y registros de todos los números de serie en dos consultas,
+    # en lugar de dos por número de serie
+    records = ProcessRecord.objects.filter(serial_number__in=serial_numbers)
+    record_counts = dict(
+        records.order_by().values_list('serial_number_id').annotate(total=Count('pk'))
+    )
+    records_by_serial = {}
+    for record in records.select_related('operation').order_by('serial_number_id', 'operation_sequence'):
+        records_by_serial.setdefault(record.serial_number_id, []).append(record)
+    
     for serial in serial_numbers:
-        process_records = ProcessRecord.objects.filter(serial_number=serial)
-        print(f"Serial {serial.serial_number}: {process_records.count()} ProcessRecord creados")
+        print(f"Serial {serial.serial_number}: {record_counts.get(serial.pk, 0)} ProcessRecord creados")
         
         # Mostrar detalles de los primeros 3
-        for record in process_records[:3]:
+        for record in records_by_serial.get(serial.pk, [])[:3]:
             print(f"  - {record.operation.name}: {record.status}")
     
     create_shift_distributed_defects(serial_numbers, user)
     
     # Mostrar resumen de operaciones disponibles
     print("\n--- Resumen de operaciones disponibles ---")
-    operations = Operation.objects.filter(is_active=True).order_by('sequence_number')
+    operations = Operation.objects.filter(is_active=True).only('id', 'name', 'sequence_number').order_by('sequence_number')
     
-    for operation in operations:
-        free_count = ProcessRecord.objects.filter(
-            operation=operation,
+    # Operaciones libres de todas las operaciones en una sola consulta agrupada
+    free_counts = dict(
+        ProcessRecord.objects.filter(
             status='PENDING',
             assigned_operator__isnull=True
-        ).count()
-        print(f"{operation.name}: {free_count} operaciones libres")
+        ).order_by().values_list('operation_id').annotate(total=Count('pk'))
+    )
     
-    print("\n--- Resumen por turnos ---")
-    today = timezone.now().date()
-    today_serials = SerialNumber.objects.filter(created_at__date=today)
+    for operation in operations:
+        print(f"{operation.name}: {free_counts.get(operation.id, 0)} operaciones libres")
     
-    shift_1_count = 0
-    shift_2_count = 0
+    print("\n--- Resumen por turnos ---")
+    today = now.date()
     
-    for serial in today_serials:
-        hour = serial.created_at.hour
-        if 6 <= hour < 15.5:  # 6:00 AM to 3:30 PM
-            shift_1_count += 1
-        elif 15.5 <= hour < 24:  # 3:30 PM to 12:00 AM
-            shift_2_count += 1
+    # Conteo por turno en la base de datos, comparando minutos del día para
+    # respetar el corte de las 3:30 PM (horas en UTC, igual que antes)
+    minute_of_day = (
+        ExtractHour('created_at', tzinfo=dt_timezone.utc) * 60
+        + ExtractMinute('created_at', tzinfo=dt_timezone.utc)
+    )
+    shift_counts = SerialNumber.objects.filter(created_at__date=today).annotate(
+        minute_of_day=minute_of_day
+    ).aggregate(
+        shift_1=Count('pk', filter=Q(minute_of_day__gte=6 * 60, minute_of_day__lt=15 * 60 + 30)),  # 6:00 AM to 3:30 PM
+        shift_2=Count('pk', filter=Q(minute_of_day__gte=15 * 60 + 30)),  # 3:30 PM to 12:00 AM
+    )
+    shift_1_count = shift_counts['shift_1']
+    shift_2_count = shift_counts['shift_2']
     
     print(f"Números de serie creados hoy:")
     print(f"  • Primer Turno (6:00 AM - 3:30 PM): {shift_1_count}")
@@ -163,7 +191,7 @@ def create_shift_distributed_defects(serial_numbers, user):
         print("⚠️  No hay suficientes números de serie para crear defectos")
         return
     
-    now = timezone.now()
+    hour_start = timezone.now().replace(minute=0, second=0, microsecond=0)
     
     # Get first operation for defects
     first_operation = Operation.objects.filter(is_active=True).first()
@@ -172,7 +200,7 @@ def create_shift_distributed_defects(serial_numbers, user):
         return
     
     # Defect in first shift (9:00 AM)
-    first_shift_time = now.replace(hour=9, minute=0, second=0, microsecond=0)
+    first_shift_time = hour_start.replace(hour=9)
     defect1, created = Defect.objects.get_or_create(
         serial_number=serial_numbers[0],
         operation=first_operation,
@@ -189,7 +217,7 @@ def create_shift_distributed_defects(serial_numbers, user):
         print(f"✓ Defecto primer turno creado: {defect1.serial_number.serial_number}")
     
     # Defect in second shift (5:00 PM)
-    second_shift_time = now.replace(hour=17, minute=0, second=0, microsecond=0)
+    second_shift_time = hour_start.replace(hour=17)
     defect2, created = Defect.objects.get_or_create(
         serial_number=serial_numbers[1],
         operation=first_operation,
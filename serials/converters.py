@@ -0,0 +1,10 @@
+class SerialNumberConverter:
+    """Path converter for serial numbers: [YEAR][MONTH]###-###M, or the
+    legacy KM###W###R format still issued by manufacturing.services"""
+    regex = r'(?:[K-Z][A-L]\d{3}-\d{3}M|KM\d{3}W\d{3}R)'
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
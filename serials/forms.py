@@ -1,5 +1,6 @@
 from django import forms
 from .models import AuthorizedPart
+from .services import AuthorizedPartCache
 
 
 class SerialGenerationForm(forms.Form):
@@ -25,9 +26,22 @@ class SerialGenerationForm(forms.Form):
         min_value=1,
         max_value=200,
         initial=1,
-        widget=forms.Select(
-            choices=[(i, f'{i} número{"s" if i > 1 else ""} de serie') for i in range(1, 201)],
-            attrs={'class': 'form-select'}
-        ),
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'min': '1',
+            'max': '200'
+        }),
         label='Cantidad a Generar'
     )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Las opciones del select salen de la lista cacheada de componentes
+        # activos, sin consultar la base al renderizar; el queryset solo se
+        # usa para validar el componente enviado
+        field = self.fields['authorized_part']
+        field.queryset = field.queryset.only('id', 'part_number', 'sku', 'description')
+        field.choices = [('', field.empty_label)] + [
+            (part['id'], f"{part['part_number']} - {part['description']}")
+            for part in AuthorizedPartCache.get_active_parts()
+        ]
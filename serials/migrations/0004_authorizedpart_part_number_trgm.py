@@ -0,0 +1,31 @@
+# Trigram index so the part-number autocomplete (icontains) can use an index.
+# Only PostgreSQL supports pg_trgm; on other databases this is a no-op.
+
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS authorizedpart_part_number_trgm '
+        'ON serials_authorizedpart USING GIN (UPPER(part_number) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS authorizedpart_part_number_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('serials', '0003_alter_serialnumber_serial_number'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:45
+
+from django.db import migrations, models
+from django.db.models import Exists, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_progress_state(apps, schema_editor):
+    SerialNumber = apps.get_model('serials', 'SerialNumber')
+    ProcessRecord = apps.get_model('operations', 'ProcessRecord')
+    Defect = apps.get_model('defects', 'Defect')
+    max_approved = ProcessRecord.objects.filter(
+        serial_number=OuterRef('pk'),
+        status='APPROVED'
+    ).order_by().values('serial_number').annotate(
+        max_sequence=Max('operation__sequence_number')
+    ).values('max_sequence')
+    SerialNumber.objects.update(
+        current_sequence_completed=Coalesce(Subquery(max_approved), Value(0)),
+        has_open_defect=Exists(Defect.objects.filter(
+            serial_number=OuterRef('pk'),
+            status__in=['OPEN', 'IN_REPAIR']
+        )),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('serials', '0004_authorizedpart_part_number_trgm'),
+        ('operations', '0003_processrecord_operator_indexes'),
+        ('defects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serialnumber',
+            name='current_sequence_completed',
+            field=models.PositiveIntegerField(db_index=True, default=0, help_text='Secuencia más alta aprobada'),
+        ),
+        migrations.AddField(
+            model_name='serialnumber',
+            name='has_open_defect',
+            field=models.BooleanField(db_index=True, default=False, help_text='Tiene defectos abiertos o en reparación'),
+        ),
+        migrations.RunPython(backfill_progress_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-15 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('serials', '0005_serialnumber_progress_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serialnumber',
+            index=models.Index(fields=['-created_at'], name='sn_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serialnumber',
+            index=models.Index(fields=['status', '-created_at'], name='sn_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serialnumber',
+            index=models.Index(fields=['authorized_part', '-created_at'], name='sn_part_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serialnumber',
+            index=models.Index(fields=['order_number'], name='sn_order_number_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-15 15:40
+#
+# B-tree index for exact SKU lookups, plus (PostgreSQL only) a trigram index
+# so the serial search's sku icontains filter can use an index too.
+
+from django.db import migrations, models
+
+
+def create_sku_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS authorizedpart_sku_trgm '
+        'ON serials_authorizedpart USING GIN (UPPER(sku) gin_trgm_ops)'
+    )
+
+
+def drop_sku_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS authorizedpart_sku_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('serials', '0006_serialnumber_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='authorizedpart',
+            index=models.Index(fields=['sku'], name='authpart_sku_idx'),
+        ),
+        migrations.RunPython(create_sku_trigram_index, drop_sku_trigram_index),
+    ]
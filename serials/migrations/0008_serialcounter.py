@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-15 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('serials', '0007_authorizedpart_sku_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerialCounter',
+            fields=[
+                ('prefix', models.CharField(max_length=2, primary_key=True, serialize=False)),
+                ('first_num', models.PositiveIntegerField(default=1)),
+                ('second_num', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador de Números de Serie',
+                'verbose_name_plural': 'Contadores de Números de Serie',
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# PostgreSQL-only indexes for the serial number lookups:
+# - varchar_pattern_ops on serial_number so prefix LIKE 'KA%' scans (counter
+#   seeding, last-serial lookups) can use a B-tree under any collation
+# - trigram GIN indexes for the serial search's icontains filters
+# On other databases this is a no-op: the unique index already covers
+# serial_number and sn_order_number_idx covers exact order lookups.
+
+from django.db import migrations
+
+
+INDEXES = [
+    ('serialnumber_serial_prefix_idx',
+     'ON serials_serialnumber (serial_number varchar_pattern_ops)'),
+    ('serialnumber_serial_trgm',
+     'ON serials_serialnumber USING GIN (UPPER(serial_number) gin_trgm_ops)'),
+    ('serialnumber_order_trgm',
+     'ON serials_serialnumber USING GIN (UPPER(order_number) gin_trgm_ops)'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, definition in INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} {definition}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('serials', '0008_serialcounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,57 @@
+# PostgreSQL-only CHECK constraint for the serial number format, so it is
+# enforced inside every INSERT/UPDATE (bulk_create included) instead of only
+# by the model validator on full_clean.
+# Both formats issued by the generators are accepted:
+# - serials:       [YEAR][MONTH]###-###M (e.g. KA001-001M)
+# - manufacturing: KM###W###R
+# Added NOT VALID and validated afterwards, so existing rows are checked
+# without holding the exclusive lock for the whole scan. The migration is
+# not atomic so the two steps commit separately; otherwise ADD CONSTRAINT's
+# ACCESS EXCLUSIVE lock would be held until the end of the transaction.
+# On other databases this is a no-op: SQLite has no native regex operator.
+
+from django.db import migrations
+
+
+CONSTRAINT_NAME = 'serial_format_check'
+CHECK = (
+    r"serial_number ~ '^[K-Z][A-L][0-9]{3}-[0-9]{3}M$' "
+    r"OR serial_number ~ '^KM[0-9]{3}W[0-9]{3}R$'"
+)
+
+
+def add_format_check(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE serials_serialnumber ADD CONSTRAINT {CONSTRAINT_NAME} CHECK ({CHECK}) NOT VALID'
+    )
+
+
+def validate_format_check(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE serials_serialnumber VALIDATE CONSTRAINT {CONSTRAINT_NAME}'
+    )
+
+
+def drop_format_check(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE serials_serialnumber DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}'
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('serials', '0009_serialnumber_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_format_check, drop_format_check),
+        migrations.RunPython(validate_format_check, migrations.RunPython.noop),
+    ]
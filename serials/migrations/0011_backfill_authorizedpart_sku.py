@@ -0,0 +1,33 @@
+# Backfills SKU-<part_number> for parts left with the empty SKU that
+# 0002_add_sku_field gave existing rows, one batch per UPDATE so a large
+# table is not rewritten in a single statement.
+
+from django.db import migrations
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Left
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_sku(apps, schema_editor):
+    """Derive SKU-<part_number> for parts without a SKU, one batch per UPDATE"""
+    AuthorizedPart = apps.get_model('serials', 'AuthorizedPart')
+    pending = AuthorizedPart.objects.filter(sku='').order_by('pk')
+    while True:
+        ids = list(pending.values_list('pk', flat=True)[:BACKFILL_BATCH_SIZE])
+        if not ids:
+            break
+        AuthorizedPart.objects.filter(pk__in=ids).update(
+            sku=Left(Concat(Value('SKU-'), F('part_number')), 50)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('serials', '0010_serialnumber_format_check'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sku, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
+from django.db.models import Case, Count, Exists, F, Max, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 
 
 class AuthorizedPart(models.Model):
@@ -31,11 +33,60 @@ class AuthorizedPart(models.Model):
         verbose_name = "Componente Autorizado"
         verbose_name_plural = "Componentes Autorizados"
         ordering = ['part_number']
+        indexes = [
+            # SKU lookups (exports, exact search)
+            models.Index(fields=['sku'], name='authpart_sku_idx'),
+        ]
 
     def __str__(self):
         return f"{self.part_number} - {self.description}"
 
 
+def _active_operations_count():
+    """Uncorrelated subquery counting the active operations, evaluated once per query"""
+    from operations.models import Operation
+    active = Operation.objects.filter(is_active=True).order_by().values('is_active').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(active), Value(0))
+
+
+class SerialNumberQuerySet(models.QuerySet):
+    def with_completion(self):
+        """Annotate what completion_percentage reads (done_ops, active_ops),
+        so listing it costs no query per serial."""
+        return self.annotate(
+            done_ops=Count('process_records', filter=Q(process_records__status='APPROVED')),
+            active_ops=_active_operations_count(),
+        )
+
+    def with_progress(self):
+        """Prefetch what completion_percentage, current_operation, has_open_defects
+        and first_pass_yield read, so listing them costs a fixed number of queries.
+
+        To walk large sets, use .iterator(chunk_size=...): the related rows
+        are then prefetched per chunk instead of all up front.
+        """
+        from operations.models import ProcessRecord
+        from defects.models import Defect
+        return self.select_related('authorized_part', 'created_by').annotate(
+            active_ops=_active_operations_count()
+        ).prefetch_related(
+            Prefetch(
+                'process_records',
+                queryset=ProcessRecord.objects.filter(status='APPROVED').only(
+                    'id', 'serial_number_id', 'operation_sequence'
+                ),
+                to_attr='approved_records'
+            ),
+            Prefetch(
+                'defects',
+                queryset=Defect.objects.only('id', 'serial_number_id', 'status'),
+                to_attr='prefetched_defects'
+            )
+        )
+
+
 class SerialNumber(models.Model):
     """Model for serial numbers with [YEAR][MONTH]###-###M format"""
     
@@ -79,6 +130,18 @@ class SerialNumber(models.Model):
         default='CREATED'
     )
     
+    # Denormalized progress, kept in sync by refresh_progress()
+    current_sequence_completed = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        help_text="Secuencia más alta aprobada"
+    )
+    has_open_defect = models.BooleanField(
+        default=False,
+        db_index=True,
+        help_text="Tiene defectos abiertos o en reparación"
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -91,25 +154,126 @@ class SerialNumber(models.Model):
         related_name='created_serials'
     )
 
+    objects = SerialNumberQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Número de Serie"
         verbose_name_plural = "Números de Serie"
         ordering = ['-created_at']
+        indexes = [
+            # Listing filters of the summary views, newest first
+            models.Index(fields=['-created_at'], name='sn_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='sn_status_created_idx'),
+            models.Index(fields=['authorized_part', '-created_at'], name='sn_part_created_idx'),
+            models.Index(fields=['order_number'], name='sn_order_number_idx'),
+        ]
 
     def __str__(self):
         return self.serial_number
 
+    @classmethod
+    def refresh_progress(cls, serial_ids, **changes):
+        """Recompute current_sequence_completed and has_open_defect in one UPDATE.
+
+        Extra keyword arguments are written in the same statement.
+        """
+        from operations.models import ProcessRecord
+        from defects.models import Defect
+        max_approved = ProcessRecord.objects.filter(
+            serial_number=OuterRef('pk'),
+            status='APPROVED'
+        ).order_by().values('serial_number').annotate(
+            max_sequence=Max('operation_sequence')
+        ).values('max_sequence')
+        open_defects = Defect.objects.filter(
+            serial_number=OuterRef('pk'),
+            status__in=['OPEN', 'IN_REPAIR']
+        )
+        cls.objects.filter(pk__in=serial_ids).update(
+            current_sequence_completed=Coalesce(Subquery(max_approved), Value(0)),
+            has_open_defect=Exists(open_defects),
+            **changes
+        )
+
+    @staticmethod
+    def pending_operations(serial_ref):
+        """Active operations with no approved record for the serial at serial_ref (an OuterRef)"""
+        from operations.models import Operation, ProcessRecord
+        return Operation.objects.filter(is_active=True).exclude(
+            Exists(ProcessRecord.objects.filter(
+                serial_number=serial_ref,
+                operation=OuterRef('pk'),
+                status='APPROVED'
+            ))
+        )
+
+    @staticmethod
+    def initialize_process_records(serial_ids, batch_size=1000):
+        """Create the PENDING record of every active operation for each serial, in one INSERT.
+
+        Foreign keys are set by id, so no Operation is fetched per record.
+        Returns the number of records created.
+        """
+        from operations.models import Operation, ProcessRecord
+        from operators.services import AvailableOperationsCache
+        operations = list(Operation.objects.filter(is_active=True).values_list('id', 'sequence_number'))
+        records = ProcessRecord.objects.bulk_create(
+            [
+                ProcessRecord(
+                    serial_number_id=serial_id,
+                    operation_id=operation_id,
+                    operation_sequence=sequence_number,
+                    status='PENDING'
+                )
+                for serial_id in serial_ids
+                for operation_id, sequence_number in operations
+            ],
+            batch_size=batch_size
+        )
+        # bulk_create skips the signals that invalidate the dashboard queues
+        if records:
+            AvailableOperationsCache.invalidate()
+        return len(records)
+
+    @classmethod
+    def refresh_completion(cls, serial_ids, now):
+        """Set IN_PROCESS/COMPLETED, plus progress, in one UPDATE.
+
+        A serial is complete when no active operation lacks an approved
+        record (a NOT EXISTS probe instead of counting approvals).
+        """
+        is_complete = ~Exists(cls.pending_operations(OuterRef(OuterRef('pk'))))
+        cls.refresh_progress(
+            serial_ids,
+            status=Case(When(is_complete, then=Value('COMPLETED')), default=Value('IN_PROCESS')),
+            completed_at=Case(
+                When(is_complete, then=Value(now)),
+                default=F('completed_at'),
+                output_field=models.DateTimeField()
+            ),
+            updated_at=now,
+        )
+
     @property
     def completion_percentage(self):
         """Calculate completion percentage based on approved operations"""
-        from operations.models import Operation
-        total_operations = Operation.objects.filter(is_active=True).count()
+        # Prefer the counts annotated by the queryset (active_ops/done_ops)
+        if hasattr(self, 'active_ops'):
+            total_operations = self.active_ops
+        else:
+            from operations.models import Operation
+            total_operations = Operation.active_count()
         if total_operations == 0:
             return 0
         
-        completed_operations = self.process_records.filter(
-            status='APPROVED'
-        ).count()
+        if hasattr(self, 'done_ops'):
+            completed_operations = self.done_ops
+        elif hasattr(self, 'approved_records'):
+            completed_operations = len(self.approved_records)
+        else:
+            completed_operations = self.process_records.filter(
+                status='APPROVED'
+            ).count()
         
         return round((completed_operations / total_operations) * 100, 2)
 
@@ -117,9 +281,12 @@ class SerialNumber(models.Model):
     def current_operation(self):
         """Get the next operation to be performed"""
         from operations.models import Operation
-        completed_ops = self.process_records.filter(
-            status='APPROVED'
-        ).values_list('operation__sequence_number', flat=True)
+        if hasattr(self, 'approved_records'):
+            completed_ops = [record.operation_sequence for record in self.approved_records]
+        else:
+            completed_ops = self.process_records.filter(
+                status='APPROVED'
+            ).values_list('operation_sequence', flat=True)
         
         next_operation = Operation.objects.filter(
             is_active=True
@@ -132,6 +299,8 @@ class SerialNumber(models.Model):
     @property
     def has_open_defects(self):
         """Check if serial number has open defects"""
+        if hasattr(self, 'prefetched_defects'):
+            return any(defect.status in ('OPEN', 'IN_REPAIR') for defect in self.prefetched_defects)
         return self.defects.filter(status__in=['OPEN', 'IN_REPAIR']).exists()
     
     @property
@@ -142,4 +311,24 @@ class SerialNumber(models.Model):
     @property
     def first_pass_yield(self):
         """Calculate if this serial passed first time (no defects)"""
+        if hasattr(self, 'prefetched_defects'):
+            return not self.prefetched_defects
         return not self.defects.exists()
+
+
+class SerialCounter(models.Model):
+    """Last serial number issued per [YEAR][MONTH] prefix.
+
+    Generators reserve blocks of numbers by locking and advancing this row
+    instead of looking up the highest serial with the prefix.
+    """
+    prefix = models.CharField(max_length=2, primary_key=True)
+    first_num = models.PositiveIntegerField(default=1)
+    second_num = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Contador de Números de Serie"
+        verbose_name_plural = "Contadores de Números de Serie"
+
+    def __str__(self):
+        return f"{self.prefix}{self.first_num:03d}-{self.second_num:03d}M"
@@ -0,0 +1,30 @@
+from django.core.paginator import Paginator
+
+
+class PkPaginator(Paginator):
+    """Paginator that slices primary keys before loading the page rows.
+
+    The COUNT and the OFFSET run over object_list, which should be a light,
+    ordered queryset. The rows of the requested page are then loaded by pk
+    from row_queryset (defaults to object_list), so its joins, annotations
+    and prefetches only apply to those rows.
+    """
+
+    def __init__(self, object_list, per_page, row_queryset=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.row_queryset = row_queryset if row_queryset is not None else object_list
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+
+        page_pks = list(self.object_list.values_list('pk', flat=True)[bottom:top])
+        position = {pk: index for index, pk in enumerate(page_pks)}
+        objects = sorted(
+            self.row_queryset.filter(pk__in=page_pks),
+            key=lambda obj: position[obj.pk]
+        )
+        return self._get_page(objects, number, self)
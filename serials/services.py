@@ -1,8 +1,22 @@
 from django.db import transaction
+from django.core.cache import cache
 from django.contrib.auth.models import User
-from .models import SerialNumber, AuthorizedPart
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import SerialNumber, AuthorizedPart, SerialCounter
 import re
-from datetime import datetime
+import functools
+import hashlib
+from datetime import datetime, time, timedelta
+
+
+# Precompiled [YEAR][MONTH]###-###M pattern, with the parts as named groups
+_SERIAL_FULL_RE = re.compile(r'^(?P<yr>[K-Z])(?P<mo>[A-L])(?P<s1>\d{3})-(?P<s2>\d{3})M$')
+
+# Serial letters by offset: years from 2025 (K, L, ...), months from enero (A-L)
+_YEAR_LETTERS = tuple(chr(ord('K') + i) for i in range(26))
+_MONTH_LETTERS = tuple(chr(ord('A') + i) for i in range(12))
 
 
 class SerialNumberGenerator:
@@ -15,10 +29,10 @@ class SerialNumberGenerator:
             raise ValueError(f"Año {year} no soportado. Año mínimo: {base_year}")
         
         year_offset = year - base_year
-        if year_offset > 25:  # Only support A-Z (26 letters)
+        if year_offset >= len(_YEAR_LETTERS):
             raise ValueError(f"Año {year} excede el rango soportado")
         
-        return chr(ord('K') + year_offset)
+        return _YEAR_LETTERS[year_offset]
     
     @staticmethod
     def get_month_letter(month):
@@ -26,55 +40,87 @@ class SerialNumberGenerator:
         if month < 1 or month > 12:
             raise ValueError(f"Mes {month} inválido")
         
-        return chr(ord('A') + month - 1)
+        return _MONTH_LETTERS[month - 1]
+    
+    @staticmethod
+    def _get_active_part(part_number):
+        try:
+            return AuthorizedPart.objects.get(
+                part_number=part_number,
+                is_active=True
+            )
+        except AuthorizedPart.DoesNotExist:
+            raise ValueError(f"Componente autorizado {part_number} no encontrado o inactivo")
+    
+    @staticmethod
+    def _current_prefix():
+        """[YEAR][MONTH] prefix for the current date"""
+        now = datetime.now()
+        year_letter = SerialNumberGenerator.get_year_letter(now.year)
+        month_letter = SerialNumberGenerator.get_month_letter(now.month)
+        return f"{year_letter}{month_letter}"
+    
+    @staticmethod
+    def _last_numbers(prefix):
+        """(first, second) numbers of the last serial issued with prefix, (1, 0) if none"""
+        # MAX() instead of ORDER BY ... LIMIT 1: an index-only lookup on the
+        # serial_number pattern index, without building a row
+        last = SerialNumber.objects.filter(
+            serial_number__startswith=prefix
+        ).aggregate(last=Max('serial_number'))['last']
+        
+        if last:
+            # Fixed-width [YEAR][MONTH]###-###M: read the numbers by position
+            if len(last) == 10 and last[5] == '-' and last[2:5].isdecimal() and last[6:9].isdecimal():
+                return int(last[2:5]), int(last[6:9])
+        return 1, 0
+    
+    @staticmethod
+    def _reserve_numbers(prefix, quantity):
+        """Reserve quantity consecutive (first, second) numbers for prefix.
+
+        Locks the prefix's SerialCounter row and advances it, so concurrent
+        generators get disjoint blocks. A new counter is seeded from the
+        serials already issued with the prefix. Call inside transaction.atomic().
+        """
+        counter = SerialCounter.objects.select_for_update().filter(prefix=prefix).first()
+        if counter is None:
+            first_num, second_num = SerialNumberGenerator._last_numbers(prefix)
+            SerialCounter.objects.get_or_create(
+                prefix=prefix,
+                defaults={'first_num': first_num, 'second_num': second_num}
+            )
+            counter = SerialCounter.objects.select_for_update().get(prefix=prefix)
+        
+        # Serials run (1, 1)..(1, 999), (2, 1).. so the block is computed from
+        # the counter's position instead of incrementing one serial at a time
+        position = (counter.first_num - 1) * 999 + counter.second_num
+        last_position = position + quantity
+        if last_position > 999 * 999:
+            raise ValueError("Se ha alcanzado el límite máximo de números de serie para este mes")
+        numbers = [
+            (n // 999 + 1, n % 999 + 1)
+            for n in range(position, last_position)
+        ]
+        
+        if numbers:
+            counter.first_num, counter.second_num = numbers[-1]
+            counter.save(update_fields=['first_num', 'second_num'])
+        return numbers
     
     @staticmethod
-    def generate_serial_number(order_number, part_number, created_by):
-        """Generate a new serial number with [YEAR][MONTH]###-###M format"""
+    def generate_serial_number(order_number, part_number, created_by, authorized_part_obj=None):
+        """Generate a new serial number with [YEAR][MONTH]###-###M format.
+
+        authorized_part_obj, if given, is the already resolved active part and
+        skips the lookup by part_number.
+        """
         with transaction.atomic():
-            # Get the authorized part
-            try:
-                authorized_part = AuthorizedPart.objects.get(
-                    part_number=part_number,
-                    is_active=True
-                )
-            except AuthorizedPart.DoesNotExist:
-                raise ValueError(f"Componente autorizado {part_number} no encontrado o inactivo")
-            
-            # Get current date
-            now = datetime.now()
-            year_letter = SerialNumberGenerator.get_year_letter(now.year)
-            month_letter = SerialNumberGenerator.get_month_letter(now.month)
+            authorized_part = authorized_part_obj or SerialNumberGenerator._get_active_part(part_number)
             
             # Find the next available serial number for current year/month
-            prefix = f"{year_letter}{month_letter}"
-            last_serial = SerialNumber.objects.filter(
-                serial_number__startswith=prefix
-            ).order_by('-serial_number').first()
-            
-            if last_serial:
-                # Extract numbers from last serial ([YEAR][MONTH]###-###M)
-                pattern = f'{prefix}(\\d{{3}})-(\\d{{3}})M'
-                match = re.match(pattern, last_serial.serial_number)
-                if match:
-                    first_num = int(match.group(1))
-                    second_num = int(match.group(2))
-                    
-                    # Increment second number, reset to first+1 if second reaches 999
-                    if second_num < 999:
-                        second_num += 1
-                    else:
-                        first_num += 1
-                        second_num = 1
-                        
-                        if first_num > 999:
-                            raise ValueError("Se ha alcanzado el límite máximo de números de serie para este mes")
-                else:
-                    first_num = 1
-                    second_num = 1
-            else:
-                first_num = 1
-                second_num = 1
+            prefix = SerialNumberGenerator._current_prefix()
+            (first_num, second_num), = SerialNumberGenerator._reserve_numbers(prefix, 1)
             
             # Format the serial number: [YEAR][MONTH]###-###M
             serial_number = f"{prefix}{first_num:03d}-{second_num:03d}M"
@@ -89,14 +135,43 @@ class SerialNumberGenerator:
             )
             
             return serial
+    
+    @staticmethod
+    def generate_serial_numbers_bulk(order_number, part_number, created_by, quantity, authorized_part_obj=None):
+        """Generate quantity consecutive serial numbers with one lookup and one INSERT.
+
+        authorized_part_obj works as in generate_serial_number().
+        """
+        with transaction.atomic():
+            authorized_part = authorized_part_obj or SerialNumberGenerator._get_active_part(part_number)
+            
+            # Reserve the whole block from the prefix counter in one step
+            prefix = SerialNumberGenerator._current_prefix()
+            serials = [
+                SerialNumber(
+                    serial_number=f"{prefix}{first_num:03d}-{second_num:03d}M",
+                    order_number=order_number,
+                    authorized_part=authorized_part,
+                    created_by=created_by,
+                    status='CREATED'
+                )
+                for first_num, second_num in SerialNumberGenerator._reserve_numbers(prefix, quantity)
+            ]
+            
+            serials = SerialNumber.objects.bulk_create(serials, batch_size=1000)
+            
+            # bulk_create skips the post_save signal that creates the process records
+            SerialNumber.initialize_process_records([serial.pk for serial in serials])
+            
+            return serials
 
 
 class SerialNumberValidator:
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def validate_serial_format(serial_number):
         """Validate new serial number format [YEAR][MONTH]###-###M"""
-        pattern = r'^[K-Z][A-L]\d{3}-\d{3}M$'
-        return bool(re.match(pattern, serial_number))
+        return _SERIAL_FULL_RE.match(serial_number) is not None
     
     @staticmethod
     def validate_order_number(order_number):
@@ -114,37 +189,103 @@ class SerialNumberValidator:
     def check_order_duplicates(order_number):
         """Check if order number already has serial numbers"""
         return SerialNumber.objects.filter(order_number=order_number).exists()
-    
+
+    @staticmethod
+    def check_order_duplicates_bulk(order_numbers):
+        """Set of the given order numbers that already have serial numbers, in one query"""
+        # order_by() drops the default ordering so DISTINCT applies to order_number alone
+        return set(
+            SerialNumber.objects.filter(order_number__in=order_numbers)
+            .order_by().values_list('order_number', flat=True).distinct()
+        )
+
     @staticmethod
     def decode_serial_info(serial_number):
         """Decode information from serial number"""
-        if not SerialNumberValidator.validate_serial_format(serial_number):
+        # One match validates the format and captures every part
+        match = _SERIAL_FULL_RE.match(serial_number)
+        if not match:
             return None
         
-        year_letter = serial_number[0]
-        month_letter = serial_number[1]
-        
-        # Decode year (K=2025, L=2026, etc.)
-        year = 2025 + (ord(year_letter) - ord('K'))
-        
-        # Decode month (A=1, B=2, etc.)
-        month = ord(month_letter) - ord('A') + 1
-        
-        # Extract sequence numbers
-        pattern = r'^[K-Z][A-L](\d{3})-(\d{3})M$'
-        match = re.match(pattern, serial_number)
-        if match:
-            first_seq = int(match.group(1))
-            second_seq = int(match.group(2))
-        else:
-            first_seq = 0
-            second_seq = 0
+        year_letter = match['yr']
+        month_letter = match['mo']
         
         return {
-            'year': year,
-            'month': month,
-            'first_sequence': first_seq,
-            'second_sequence': second_seq,
+            # K=2025, L=2026, etc.
+            'year': 2025 + (ord(year_letter) - ord('K')),
+            # A=1, B=2, etc.
+            'month': ord(month_letter) - ord('A') + 1,
+            'first_sequence': int(match['s1']),
+            'second_sequence': int(match['s2']),
             'year_letter': year_letter,
             'month_letter': month_letter
         }
+
+
+class SerialNumberFilter:
+    @staticmethod
+    def _local_day_start(value):
+        """Start of a YYYY-MM-DD day in the current time zone"""
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Fecha inválida: {value}")
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def created_range(date_from, date_to):
+        """Q for serials created between two local days (inclusive, either optional).
+
+        Compares the raw created_at column instead of created_at__date, so
+        the created_at index can be used. Raises ValueError for bad dates.
+        """
+        q = Q()
+        if date_from:
+            q &= Q(created_at__gte=SerialNumberFilter._local_day_start(date_from))
+        if date_to:
+            q &= Q(created_at__lt=SerialNumberFilter._local_day_start(date_to) + timedelta(days=1))
+        return q
+
+
+class AuthorizedPartCache:
+    """Cached list of active authorized parts for the generation form"""
+    CACHE_KEY = 'serials:active_parts:v1'
+    CACHE_TIMEOUT = 300
+
+    @staticmethod
+    def _load_active_parts():
+        return list(AuthorizedPart.objects.filter(is_active=True).order_by('part_number').values(
+            'id', 'part_number', 'description', 'revision'
+        ))
+
+    @staticmethod
+    def get_active_parts():
+        """Return active parts as plain dicts, cached until a part changes"""
+        return cache.get_or_set(
+            AuthorizedPartCache.CACHE_KEY,
+            AuthorizedPartCache._load_active_parts,
+            AuthorizedPartCache.CACHE_TIMEOUT
+        )
+
+    @staticmethod
+    def invalidate():
+        cache.delete(AuthorizedPartCache.CACHE_KEY)
+
+
+class AutocompleteCache:
+    """Short-lived cache of AJAX autocomplete results, keyed by endpoint and query.
+
+    Autocomplete fires on every keystroke with the same few prefixes, so
+    results are kept for a few seconds; nothing invalidates them, the
+    timeout bounds staleness.
+    """
+    CACHE_TIMEOUT = 30
+
+    @staticmethod
+    def get_or_set(kind, query, loader):
+        """Return the cached loader() result for (kind, query), computing it on a miss"""
+        digest = hashlib.md5(query.lower().encode()).hexdigest()
+        return cache.get_or_set(
+            f'serials:autocomplete:{kind}:{digest}',
+            loader,
+            AutocompleteCache.CACHE_TIMEOUT
+        )
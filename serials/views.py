@@ -1,17 +1,35 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.cache import cache
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q
+from django.db.models import Count, OuterRef, Q, Subquery
+from operations.models import Operation
+from operators.utils import load_json_body
 from .models import SerialNumber, AuthorizedPart
-from .services import SerialNumberGenerator, SerialNumberValidator
+from .services import SerialNumberGenerator, SerialNumberValidator, AuthorizedPartCache, AutocompleteCache
 from .forms import SerialGenerationForm
-import json
 import csv
+import uuid
 from datetime import datetime
 
 
+# Generated serials wait in the cache (not the session) until downloaded
+GENERATED_SERIALS_CACHE_TIMEOUT = 600
+
+
+def _generated_serials_key(user, token):
+    return f'serials:generated:{user.pk}:{token}'
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer"""
+    def write(self, value):
+        return value
+
+
 @login_required
 def generate_serial(request):
     """Generate new serial number view with bulk generation and CSV export"""
@@ -23,16 +41,16 @@ def generate_serial(request):
                 order_number = form.cleaned_data['order_number']
                 authorized_part = form.cleaned_data['authorized_part']
                 
-                generated_serials = []
-                for i in range(quantity):
-                    serial = SerialNumberGenerator.generate_serial_number(
-                        order_number=order_number,
-                        part_number=authorized_part.part_number,
-                        created_by=request.user
-                    )
-                    generated_serials.append(serial)
+                generated_serials = SerialNumberGenerator.generate_serial_numbers_bulk(
+                    order_number=order_number,
+                    part_number=authorized_part.part_number,
+                    created_by=request.user,
+                    quantity=quantity,
+                    authorized_part_obj=authorized_part
+                )
                 
-                request.session['generated_serials'] = [
+                token = uuid.uuid4().hex
+                cache.set(_generated_serials_key(request.user, token), [
                     {
                         'serial_number': serial.serial_number,
                         'part_number': serial.authorized_part.part_number,
@@ -40,14 +58,14 @@ def generate_serial(request):
                         'order_number': serial.order_number
                     }
                     for serial in generated_serials
-                ]
+                ], GENERATED_SERIALS_CACHE_TIMEOUT)
                 
                 messages.success(
                     request, 
                     f'{quantity} número{"s" if quantity > 1 else ""} de serie generado{"s" if quantity > 1 else ""} exitosamente para la orden {order_number}'
                 )
                 
-                return redirect('serials:download_csv')
+                return redirect(f"{reverse('serials:download_csv')}?token={token}")
                 
             except Exception as e:
                 messages.error(request, f'Error al generar números de serie: {str(e)}')
@@ -55,7 +73,7 @@ def generate_serial(request):
         form = SerialGenerationForm()
     
     # Get authorized parts for autocomplete
-    authorized_parts = AuthorizedPart.objects.filter(is_active=True).order_by('part_number')
+    authorized_parts = AuthorizedPartCache.get_active_parts()
     
     context = {
         'form': form,
@@ -74,25 +92,49 @@ def search_serials(request):
     if len(query) < 3:
         return JsonResponse({'serials': []})
     
-    serials = SerialNumber.objects.filter(
-        Q(serial_number__icontains=query) |
-        Q(order_number__icontains=query) |
-        Q(authorized_part__part_number__icontains=query) |
-        Q(authorized_part__sku__icontains=query)
-    ).select_related('authorized_part').order_by('-created_at')[:10]
-    
-    data = []
-    for serial in serials:
-        data.append({
-            'id': serial.id,
-            'serial_number': serial.serial_number,
-            'order_number': serial.order_number,
-            'part_number': serial.authorized_part.part_number,
-            'sku': serial.authorized_part.sku,
-            'status': serial.get_status_display(),
-            'completion_percentage': serial.completion_percentage,
-            'current_operation': serial.current_operation.name if serial.current_operation else 'Completado'
-        })
+    def load():
+        # Approved operations and the next pending operation resolved in the
+        # same query (same rules as completion_percentage / current_operation)
+        total_operations = Operation.active_count()
+        next_operation = SerialNumber.pending_operations(
+            OuterRef(OuterRef('pk'))
+        ).order_by('sequence_number').values('name')[:1]
+        # Matching parts are resolved first (small table), so the OR below only
+        # covers serial columns and each branch can use its own index
+        part_ids = list(AuthorizedPart.objects.filter(
+            Q(part_number__icontains=query) | Q(sku__icontains=query)
+        ).values_list('id', flat=True))
+        serials = SerialNumber.objects.filter(
+            Q(serial_number__icontains=query) |
+            Q(order_number__icontains=query) |
+            Q(authorized_part_id__in=part_ids)
+        ).annotate(
+            done_ops=Count('process_records', filter=Q(process_records__status='APPROVED')),
+            current_operation_name=Subquery(next_operation)
+        ).values(
+            'id', 'serial_number', 'order_number', 'authorized_part__part_number',
+            'authorized_part__sku', 'status', 'done_ops', 'current_operation_name'
+        ).order_by('-created_at')[:10]
+    
+        status_labels = dict(SerialNumber.STATUS_CHOICES)
+        data = []
+        for serial in serials:
+            data.append({
+                'id': serial['id'],
+                'serial_number': serial['serial_number'],
+                'order_number': serial['order_number'],
+                'part_number': serial['authorized_part__part_number'],
+                'sku': serial['authorized_part__sku'],
+                'status': status_labels.get(serial['status'], serial['status']),
+                'completion_percentage': (
+                    round((serial['done_ops'] / total_operations) * 100, 2) if total_operations else 0
+                ),
+                'current_operation': serial['current_operation_name'] or 'Completado'
+            })
+    
+        return data
+    
+    data = AutocompleteCache.get_or_set('serials', query, load)
     
     return JsonResponse({'serials': data})
 
@@ -101,23 +143,16 @@ def search_serials(request):
 @require_http_methods(["GET"])
 def get_authorized_parts(request):
     """AJAX endpoint to get authorized parts for autocomplete"""
-    query = request.GET.get('q', '')
+    query = request.GET.get('q', '').strip()
+    
+    # An empty box would match every part
+    if not query:
+        return JsonResponse({'parts': []})
     
-    parts = AuthorizedPart.objects.filter(
+    data = AutocompleteCache.get_or_set('parts', query, lambda: list(AuthorizedPart.objects.filter(
         is_active=True,
-        part_number__icontains=query
-    ).order_by('part_number')[:10]
-    
-    data = [
-        {
-            'id': part.id,
-            'part_number': part.part_number,
-            'sku': part.sku,
-            'description': part.description,
-            'revision': part.revision
-        }
-        for part in parts
-    ]
+        part_number__istartswith=query
+    ).order_by('part_number').values('id', 'part_number', 'sku', 'description', 'revision')[:10]))
     
     return JsonResponse({'parts': data})
 
@@ -126,7 +161,7 @@ def get_authorized_parts(request):
 @require_http_methods(["POST"])
 def validate_order_number(request):
     """AJAX endpoint to validate order number"""
-    data = json.loads(request.body)
+    data = load_json_body(request)
     order_number = data.get('order_number', '')
     
     try:
@@ -148,39 +183,38 @@ def validate_order_number(request):
 @login_required
 def download_csv(request):
     """Download CSV with generated serial numbers"""
-    generated_serials = request.session.get('generated_serials', [])
+    cache_key = _generated_serials_key(request.user, request.GET.get('token', ''))
+    generated_serials = cache.get(cache_key)
     
     if not generated_serials:
         messages.error(request, 'No hay números de serie para descargar')
         return redirect('serials:generate_serial')
     
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    response['Content-Disposition'] = f'attachment; filename="numeros_serie_{timestamp}.csv"'
+    # Clear cached data once the download starts
+    cache.delete(cache_key)
     
-    writer = csv.writer(response)
-    # Write header
-    writer.writerow(['PN', 'SKU', 'SERIAL'])
+    writer = csv.writer(_Echo())
     
-    # Write data
-    for serial_data in generated_serials:
-        writer.writerow([
-            serial_data['part_number'],
-            serial_data['sku'],
-            serial_data['serial_number']
-        ])
-    
-    # Clear session data after download
-    del request.session['generated_serials']
+    def stream_rows():
+        yield writer.writerow(['PN', 'SKU', 'SERIAL'])
+        for serial_data in generated_serials:
+            yield writer.writerow([
+                serial_data['part_number'],
+                serial_data['sku'],
+                serial_data['serial_number']
+            ])
     
+    response = StreamingHttpResponse(stream_rows(), content_type='text/csv; charset=utf-8')
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    response['Content-Disposition'] = f'attachment; filename="numeros_serie_{timestamp}.csv"'
     return response
 
 
 @login_required
 def csv_preview(request):
     """Preview page showing generated serials before download"""
-    generated_serials = request.session.get('generated_serials', [])
+    token = request.GET.get('token', '')
+    generated_serials = cache.get(_generated_serials_key(request.user, token))
     
     if not generated_serials:
         messages.error(request, 'No hay números de serie para mostrar')
@@ -188,7 +222,8 @@ def csv_preview(request):
     
     context = {
         'generated_serials': generated_serials,
-        'total_count': len(generated_serials)
+        'total_count': len(generated_serials),
+        'token': token
     }
     
     return render(request, 'serials/csv_preview.html', context)